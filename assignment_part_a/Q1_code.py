@@ -1,22 +1,49 @@
 import cv2
 import os
-import pandas as pd
-from ultralytics import YOLO
+import sys
+import csv
+import time
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.model_registry import lazy_model
+from common.yolo_postprocess import postprocess, bbox_tuples
+from common.result_cache import ResultCache, bytes_digest, fingerprint
+from common.image_loader import ScaledImage
+from common.metrics import metrics
 
 # -----------------------------
-# Load pre-trained YOLOv8 license plate model
+# Pre-trained YOLOv8 license plate model (loaded on first use)
 model_path = os.path.join(os.path.dirname(__file__), "LP-detection.pt")
-model = YOLO(model_path)
+model = lazy_model(model_path)
 
 # -----------------------------
-# Output folder
+# Default input and output folders
+front_folder = os.path.join(os.path.dirname(__file__), 'data', 'front')
+rear_folder = os.path.join(os.path.dirname(__file__), 'data', 'rear')
 output_folder = "output"
-if not os.path.exists(output_folder):
-    os.makedirs(output_folder)
 
-# Initialize report
-report = []
+REPORT_COLUMNS = ["Car Image", "Broken Front", "Broken Rear"]
+
+# -----------------------------
+# Settings that change the results; part of the cache fingerprint
+CONFIG = {
+    "conf": 0.25,
+    "iou": 0.5,
+    "plate_aspect": [2, 6],
+    "plate_min_size": [50, 15],
+    "broken_area": [20, 500],
+    "broken_width": [5, 50],
+    "broken_height": [10, 60],
+    # 2/4/8 decodes stills at reduced size for detection and the stitched
+    # output; plate crops for the broken character check stay full
+    # resolution, which costs a second decode (see bench_reduced_decode.py)
+    "decode_reduce": 1,
+}
 
 # -----------------------------
 # Preprocess image for better detection
@@ -28,38 +55,122 @@ def preprocess_image(img):
 
 # -----------------------------
 # Detect license plates using YOLO
-def detect_license_plate(img):
-    results = model.predict(img, conf=0.25, iou=0.5, verbose=False)
-    boxes = []
-    for r in results:
-        for box in r.boxes.xyxy:
-            x1, y1, x2, y2 = map(int, box)
-            w = x2 - x1
-            h = y2 - y1
-            aspect_ratio = w / h
-            if 2 <= aspect_ratio <= 6 and w > 50 and h > 15:
-                boxes.append((x1, y1, x2, y2))
-    return boxes
+def plate_boxes(result, img_shape, reduce=1):
+    # Plate-shaped boxes only, best confidence first. `reduce` is how much
+    # smaller the image is than the original still, so the minimum plate
+    # size (in original pixels) can be scaled to match.
+    detections = postprocess(result, img_shape=img_shape,
+                             min_aspect=CONFIG["plate_aspect"][0], max_aspect=CONFIG["plate_aspect"][1],
+                             min_width=CONFIG["plate_min_size"][0] / reduce,
+                             min_height=CONFIG["plate_min_size"][1] / reduce)
+    return bbox_tuples(detections)
+
+def detect_license_plates(imgs, reduce=1):
+    # One predict call for a whole list of images; one box list per image
+    if not imgs:
+        return []
+    results = model.predict(imgs, conf=CONFIG["conf"], iou=CONFIG["iou"], verbose=False)
+    return [plate_boxes(r, img.shape, reduce) for r, img in zip(results, imgs)]
+
+def detect_license_plate(img, reduce=1):
+    return detect_license_plates([img], reduce)[0]
 
 # -----------------------------
-# Detect broken characters using contour analysis
-def detect_broken_characters(plate_img):
+# Detect broken characters using connected components
+def plate_threshold(plate_img):
     gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
-    thresh = cv2.adaptiveThreshold(gray, 255,
-                                   cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                   cv2.THRESH_BINARY_INV, 11, 2)
-    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    broken_count = 0
-    annotated_plate = plate_img.copy()
-    
-    for cnt in contours:
-        x, y, w, h = cv2.boundingRect(cnt)
-        area = cv2.contourArea(cnt)
-        if 20 < area < 500 and 5 < w < 50 and 10 < h < 60:
-            broken_count += 1
-            cv2.rectangle(annotated_plate, (x, y), (x + w, y + h), (0, 0, 255), 2)
-    
-    return broken_count, annotated_plate
+    return cv2.adaptiveThreshold(gray, 255,
+                                 cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY_INV, 11, 2)
+
+def outer_components(mask):
+    # The blobs cv2.findContours(RETR_EXTERNAL) would trace, without tracing
+    # them: holes are filled in (so anything nested in a hole joins its
+    # enclosing blob) and each filled blob is labelled once.
+    #
+    # Returns (x, y, w, h) stats per blob and the area cv2.contourArea gives
+    # its outer contour. That contour runs through boundary pixel centres, so
+    # it encloses one unit per 2x2 block fully inside the blob and half a
+    # unit per block with three pixels inside.
+    img = cv2.copyMakeBorder(mask, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+    cv2.floodFill(img, None, (0, 0), 128, flags=4)
+    filled = (img != 128).view(np.uint8)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(filled, connectivity=8)
+
+    # Pixels inside each 2x2 block, indexed by the block's top-left pixel.
+    # A block with three pixels inside has its top-left or bottom-right one
+    # inside, so one of those two gives its label.
+    width = filled.shape[1]
+    corners = np.zeros_like(filled)
+    corners[:-1, :-1] = filled[:-1, :-1] + filled[:-1, 1:] + filled[1:, :-1] + filled[1:, 1:]
+    corners, labels = corners.ravel(), labels.ravel()
+    full = np.flatnonzero(corners == 4)
+    three = np.flatnonzero(corners == 3)
+    three_labels = np.where(labels[three] > 0, labels[three], labels[three + width + 1])
+    areas = np.bincount(labels[full], minlength=n) + np.bincount(three_labels, minlength=n) / 2
+
+    # Drop the background label and undo the padding
+    xywh = stats[1:, :4].copy()
+    xywh[:, :2] -= 1
+    return xywh, areas[1:]
+
+def broken_mask(xywh, areas):
+    w, h = xywh[:, 2], xywh[:, 3]
+    return ((CONFIG["broken_area"][0] < areas) & (areas < CONFIG["broken_area"][1])
+            & (CONFIG["broken_width"][0] < w) & (w < CONFIG["broken_width"][1])
+            & (CONFIG["broken_height"][0] < h) & (h < CONFIG["broken_height"][1]))
+
+def pack_crops(shapes, max_width=4096):
+    # Top-left corner of each crop when laid out in rows of up to max_width
+    # pixels, with a blank pixel between neighbours. Returns the corners and
+    # the canvas shape.
+    width = max(max_width, max(w for _, w in shapes))
+    corners, x, y, row_h, canvas_w = [], 0, 0, 0, 0
+    for h, w in shapes:
+        if x > 0 and x + w > width:
+            x, y, row_h = 0, y + row_h + 1, 0
+        corners.append((x, y))
+        canvas_w = max(canvas_w, x + w)
+        x += w + 1
+        row_h = max(row_h, h)
+    return corners, (y + row_h, canvas_w)
+
+def detect_broken_characters_batch(plate_imgs, annotate=False):
+    # Threshold each crop, pack them onto one canvas with blank pixels
+    # between them and label everything in one pass. Returns one
+    # (broken_count, annotated_plate or None) per crop.
+    threshes = [plate_threshold(img) if img.size else np.zeros(img.shape[:2], np.uint8) for img in plate_imgs]
+    if not threshes:
+        return []
+
+    corners, canvas_shape = pack_crops([t.shape for t in threshes])
+    canvas = np.zeros(canvas_shape, np.uint8)
+    owner = np.full(canvas_shape, -1, np.int32)
+    for i, (t, (x, y)) in enumerate(zip(threshes, corners)):
+        h, w = t.shape
+        canvas[y:y + h, x:x + w] = t
+        owner[y:y + h, x:x + w] = i
+
+    xywh, areas = outer_components(canvas)
+    keep = broken_mask(xywh, areas)
+    # A blob's bounding box lies inside its crop, so its corner says which crop it is in
+    crop_index = owner[xywh[:, 1], xywh[:, 0]]
+    counts = np.bincount(crop_index[keep], minlength=len(plate_imgs))
+
+    results = []
+    for i, img in enumerate(plate_imgs):
+        annotated_plate = None
+        if annotate:
+            annotated_plate = img.copy()
+            x0, y0 = corners[i]
+            for x, y, w, h in xywh[keep & (crop_index == i)].tolist():
+                x, y = x - x0, y - y0
+                cv2.rectangle(annotated_plate, (x, y), (x + w, y + h), (0, 0, 255), 2)
+        results.append((int(counts[i]), annotated_plate))
+    return results
+
+def detect_broken_characters(plate_img, annotate=False):
+    return detect_broken_characters_batch([plate_img], annotate)[0]
 
 # -----------------------------
 # Crop plate image from full image
@@ -77,78 +188,193 @@ def stitch_images(front_img, rear_img):
     return stitched
 
 # -----------------------------
-# Process paired images
-front_folder = os.path.join(os.path.dirname(__file__), 'data', 'front')
-rear_folder = os.path.join(os.path.dirname(__file__), 'data', 'rear')
+# Check and annotate the plates found in a list of images, return their
+# broken character counts. Detection and drawing use the reduced images;
+# the broken character check uses full-resolution crops of the plates.
+def plate_region(img, boxes):
+    if boxes:
+        return boxes[0], "Broken: {}"
+    h, w, _ = img.shape
+    return (int(w * 0.3), int(h * 0.7), int(w * 0.7), int(h * 0.85)), "Broken: {} (Fallback)"
+
+def finish_plates(scaled_images, boxes_list):
+    regions = [plate_region(scaled.image, boxes) for scaled, boxes in zip(scaled_images, boxes_list)]
+    plates = [scaled.full_crops([scaled.to_full(bbox)])[0] for scaled, (bbox, _) in zip(scaled_images, regions)]
+    counts = [broken for broken, _ in detect_broken_characters_batch(plates)]
 
-front_files = sorted([f for f in os.listdir(front_folder) if f.lower().endswith((".jpg", ".png"))])
-rear_files = sorted([f for f in os.listdir(rear_folder) if f.lower().endswith((".jpg", ".png"))])
+    for scaled, boxes, ((x1, y1, x2, y2), label), broken in zip(scaled_images, boxes_list, regions, counts):
+        if boxes:
+            cv2.rectangle(scaled.image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(scaled.image, label.format(broken), (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+    return counts
 
-for f_file, r_file in zip(front_files, rear_files):
-    front_img = cv2.imread(os.path.join(front_folder, f_file))
-    rear_img = cv2.imread(os.path.join(rear_folder, r_file))
+def finish_plate(scaled, boxes):
+    return finish_plates([scaled], [boxes])[0]
 
-    if front_img is None or rear_img is None:
-        print(f"Skipping {f_file} or {r_file} due to load error.")
-        continue
+def check_plate(scaled):
+    return finish_plate(scaled, detect_license_plate(preprocess_image(scaled.image), scaled.reduce))
 
-    front_img_proc = preprocess_image(front_img)
-    rear_img_proc = preprocess_image(rear_img)
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
 
-    front_boxes = detect_license_plate(front_img_proc)
-    rear_boxes = detect_license_plate(rear_img_proc)
+def list_pairs(front_dir, rear_dir):
+    # Front and rear images are paired by sorted filename
+    front_files = sorted([f for f in os.listdir(front_dir) if f.lower().endswith((".jpg", ".png"))])
+    rear_files = sorted([f for f in os.listdir(rear_dir) if f.lower().endswith((".jpg", ".png"))])
+    return list(zip(front_files, rear_files))
 
-    broken_front = 0
-    broken_rear = 0
+# -----------------------------
+# Pipeline stages. load_pair and finish_pair run on worker threads;
+# detection runs on the calling thread, batched over several pairs,
+# because one YOLO model can't be shared between threads.
+class Pair:
+    def __init__(self, f_file, r_file, out_name):
+        self.f_file = f_file
+        self.r_file = r_file
+        self.out_name = out_name
+        self.key = None
+        self.front = None
+        self.rear = None
+        self.inputs = None  # preprocessed front and rear images for detection
+        self.broken = None  # (front, rear) counts once known
+        self.error = None
+        self.elapsed = 0.0
 
-    # Check front plate
-    if front_boxes:
-        front_plate = crop_plate(front_img, front_boxes[0])
-        broken_front, front_plate_annotated = detect_broken_characters(front_plate)
-        x1, y1, x2, y2 = front_boxes[0]
-        cv2.rectangle(front_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.putText(front_img, f"Broken: {broken_front}", (x1, y1 - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-    else:
-        h, w, _ = front_img.shape
-        x1, y1 = int(w * 0.3), int(h * 0.7)
-        x2, y2 = int(w * 0.7), int(h * 0.85)
-        front_plate = front_img[y1:y2, x1:x2]
-        broken_front, front_plate_annotated = detect_broken_characters(front_plate)
-        cv2.putText(front_img, f"Broken: {broken_front} (Fallback)", (x1, y1 - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+def load_pair(pair, front_dir, rear_dir, cache):
+    # Read both files, answer from the cache if possible, otherwise decode
+    # and preprocess both images ready for detection
+    try:
+        with metrics.stage("q1_code.read"):
+            front_data = read_bytes(os.path.join(front_dir, pair.f_file))
+            rear_data = read_bytes(os.path.join(rear_dir, pair.r_file))
+    except OSError:
+        pair.error = f"Skipping {pair.f_file} or {pair.r_file} due to load error."
+        return pair
+    pair.key = bytes_digest(front_data) + bytes_digest(rear_data)
 
-    # Check rear plate
-    if rear_boxes:
-        rear_plate = crop_plate(rear_img, rear_boxes[0])
-        broken_rear, rear_plate_annotated = detect_broken_characters(rear_plate)
-        x1, y1, x2, y2 = rear_boxes[0]
-        cv2.rectangle(rear_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.putText(rear_img, f"Broken: {broken_rear}", (x1, y1 - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-    else:
-        h, w, _ = rear_img.shape
-        x1, y1 = int(w * 0.3), int(h * 0.7)
-        x2, y2 = int(w * 0.7), int(h * 0.85)
-        rear_plate = rear_img[y1:y2, x1:x2]
-        broken_rear, rear_plate_annotated = detect_broken_characters(rear_plate)
-        cv2.putText(rear_img, f"Broken: {broken_rear} (Fallback)", (x1, y1 - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+    cached = cache.get(pair.key) if cache is not None else None
+    if cached is not None and (not any(cached) or os.path.exists(pair.out_name)):
+        pair.broken = tuple(cached)
+        return pair
 
-    # Save stitched image if any broken plate detected
+    start = time.perf_counter()
+    with metrics.stage("q1_code.decode"):
+        pair.front = ScaledImage(data=front_data, reduce=CONFIG["decode_reduce"])
+        pair.rear = ScaledImage(data=rear_data, reduce=CONFIG["decode_reduce"])
+    if not pair.front.ok or not pair.rear.ok:
+        pair.error = f"Skipping {pair.f_file} or {pair.r_file} due to load error."
+        return pair
+    with metrics.stage("q1_code.preprocess"):
+        pair.inputs = [preprocess_image(pair.front.image), preprocess_image(pair.rear.image)]
+    pair.elapsed = time.perf_counter() - start
+    return pair
+
+def finish_pair(pair, front_boxes, rear_boxes, cache):
+    start = time.perf_counter()
+    with metrics.stage("q1_code.broken_characters"):
+        broken_front, broken_rear = finish_plates([pair.front, pair.rear], [front_boxes, rear_boxes])
+    pair.broken = (broken_front, broken_rear)
+    if cache is not None:
+        cache.put(pair.key, [broken_front, broken_rear], pair.elapsed + time.perf_counter() - start)
+
+    # Save stitched image if any broken plate detected (run() reports it, in pair order)
     if broken_front > 0 or broken_rear > 0:
-        stitched = stitch_images(front_img, rear_img)
-        out_name = os.path.join(output_folder, f"broken_{f_file}")
-        cv2.imwrite(out_name, stitched)
-        report.append({
-            "Car Image": f_file,
-            "Broken Front": "Yes" if broken_front > 0 else "No",
-            "Broken Rear": "Yes" if broken_rear > 0 else "No"
-        })
-        print(f"Saved stitched broken plate for {f_file}: Front={broken_front}, Rear={broken_rear}")
-
-# Save report CSV
-df = pd.DataFrame(report)
-report_path = os.path.join(output_folder, "broken_license_plate_report.csv")
-df.to_csv(report_path, index=False)
-print("✅ Processing complete. Report saved at:", report_path)
+        with metrics.stage("q1_code.write"):
+            cv2.imwrite(pair.out_name, stitch_images(pair.front.image, pair.rear.image))
+
+    # Let the decoded frames go as soon as the pair is done
+    pair.front = pair.rear = pair.inputs = None
+    return pair
+
+def prefetch(pool, fn, items, depth):
+    # Like pool.map, but with at most `depth` tasks in flight so only a few
+    # decoded pairs are held in memory at once
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# -----------------------------
+# Process paired images
+def run(front_dir=front_folder, rear_dir=rear_folder, output_dir=output_folder, workers=4,
+        batch_pairs=4, use_cache=True):
+    # Finds broken plates in every front/rear pair and writes the stitched
+    # images and broken_license_plate_report.csv to output_dir.
+    #
+    # `workers` threads decode, preprocess and finish pairs (broken character
+    # check, stitching, writing) while the model runs; each predict call
+    # covers the front and rear images of `batch_pairs` pairs. Report rows
+    # are appended in pair order as soon as their batch is done.
+    os.makedirs(output_dir, exist_ok=True)
+    pairs = [Pair(f, r, os.path.join(output_dir, f"broken_{f}")) for f, r in list_pairs(front_dir, rear_dir)]
+
+    # Pairs whose images, model weights and CONFIG are unchanged are not processed again
+    cache = ResultCache(os.path.join(output_dir, "cache.sqlite"), fingerprint([model_path], CONFIG)) if use_cache else None
+    report_path = os.path.join(output_dir, "broken_license_plate_report.csv")
+
+    start = time.perf_counter()
+    processed = 0
+    with open(report_path, "w", newline="") as f, ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f, lineterminator="\n")  # same line endings as the old pandas report
+        writer.writerow(REPORT_COLUMNS)
+
+        def write_rows(in_flight):
+            for pair, future in in_flight:
+                if future is not None:
+                    future.result()
+                if pair.error is not None:
+                    print(pair.error)
+                    continue
+                broken_front, broken_rear = pair.broken
+                if broken_front > 0 or broken_rear > 0:
+                    if future is not None:
+                        print(f"Saved stitched broken plate for {pair.f_file}: Front={broken_front}, Rear={broken_rear}")
+                    writer.writerow([pair.f_file,
+                                     "Yes" if broken_front > 0 else "No",
+                                     "Yes" if broken_rear > 0 else "No"])
+            f.flush()
+
+        # The previous batch finishes on the pool while the next one is on the model
+        in_flight = []
+        loaded = prefetch(pool, lambda p: load_pair(p, front_dir, rear_dir, cache), pairs, depth=2 * batch_pairs)
+        for batch in batches(loaded, batch_pairs):
+            todo = [p for p in batch if p.broken is None and p.error is None]
+            with metrics.stage("q1_code.plate_detection"):
+                boxes = iter(detect_license_plates([img for p in todo for img in p.inputs], CONFIG["decode_reduce"]))
+            futures = {id(p): pool.submit(finish_pair, p, next(boxes), next(boxes), cache) for p in todo}
+
+            write_rows(in_flight)
+            in_flight = [(p, futures.get(id(p))) for p in batch]
+            processed += len(batch)
+            metrics.count("q1_code.pairs", len(batch))
+            metrics.count("q1_code.cache_hits", len(batch) - len(todo))
+        write_rows(in_flight)
+
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        print(cache.summary())
+        cache.close()
+
+    print(f"Processed {processed} pairs in {elapsed:.2f}s ({processed / elapsed if elapsed else 0.0:.2f} pairs/s)")
+    print("✅ Processing complete. Report saved at:", report_path)
+    metrics.report()
+    return {"pairs": processed, "seconds": elapsed, "pairs_per_sec": processed / elapsed if elapsed else 0.0,
+            "report_path": report_path}
+
+if __name__ == "__main__":
+    run()
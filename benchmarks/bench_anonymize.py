@@ -0,0 +1,75 @@
+# Benchmark: milliseconds per face for each program4/anonymize.py method
+# across face sizes, against the original copy-out/copy-back Gaussian blur
+#
+# Faces are a program3/images photo resized to each size, placed in a
+# 1920x1080 frame. The last column of the second table is the mean
+# absolute pixel difference from the Gaussian blur (0 = identical).
+#
+# Run from the repository root:
+#   python benchmarks/bench_anonymize.py [runs]
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from program4.anonymize import ANONYMIZERS, anonymize
+
+SIZES = [32, 64, 128, 256, 512, 1024]
+PHOTO = os.path.join("program3", "images", "person2.jpg")
+
+def original_blur(frame, faces):
+    # program4's blur before the anonymization engine
+    for (x, y, w, h) in faces:
+        face = frame[y:y+h, x:x+w]
+        blurred_face = cv2.GaussianBlur(face, (99, 99), 30)
+        frame[y:y+h, x:x+w] = blurred_face
+    return frame
+
+def make_frame(photo, size):
+    frame = np.full((1080, 1920, 3), 110, dtype=np.uint8)
+    frame[20:20 + size, 40:40 + size] = cv2.resize(photo, (size, size), interpolation=cv2.INTER_CUBIC)
+    return frame, [(40, 20, size, size)]
+
+def time_ms(fn, frame, faces, runs):
+    work = frame.copy()
+    fn(work, faces)  # warm up
+    total = 0.0
+    for _ in range(runs):
+        np.copyto(work, frame)
+        start = time.perf_counter()
+        fn(work, faces)
+        total += time.perf_counter() - start
+    return total / runs * 1000, work
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    photo = cv2.imread(PHOTO)
+    methods = {"original": original_blur}
+    methods.update({name: (lambda f, faces, name=name: anonymize(f, faces, method=name)) for name in ANONYMIZERS})
+
+    print(f"ms per face, {runs} runs")
+    print(f"{'face px':>8} | " + " | ".join(f"{name:>10}" for name in methods))
+    print("-" * (11 + 13 * len(methods)))
+    diffs = {}
+    for size in SIZES:
+        frame, faces = make_frame(photo, size)
+        row, outputs = [], {}
+        for name, fn in methods.items():
+            ms, outputs[name] = time_ms(fn, frame, faces, runs)
+            row.append(ms)
+        x, y, w, h = faces[0]
+        reference = outputs["gaussian"][y:y+h, x:x+w].astype(np.int16)
+        diffs[size] = {name: np.abs(out[y:y+h, x:x+w].astype(np.int16) - reference).mean() for name, out in outputs.items()}
+        print(f"{size:>8} | " + " | ".join(f"{ms:>10.3f}" for ms in row))
+
+    print("\nmean |difference| from gaussian")
+    print(f"{'face px':>8} | " + " | ".join(f"{name:>10}" for name in methods))
+    for size, d in diffs.items():
+        print(f"{size:>8} | " + " | ".join(f"{d[name]:>10.1f}" for name in methods))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Benchmark: broken-character check, findContours loop vs connected components
+#
+# Times the old per-contour Python loop, the connected-components version
+# one crop at a time, and the batch API over all crops at once. Crops are
+# plate-sized tiles from assignment_part_a/output, plus pure noise crops
+# (the worst case for the contour loop).
+#
+# Run from the repository root:
+#   python benchmarks/bench_broken_characters.py
+
+import os
+import sys
+import glob
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from assignment_part_a.Q1_code import CONFIG, detect_broken_characters, detect_broken_characters_batch
+
+REPEATS = 5
+
+def contour_broken_characters(plate_img):
+    # The loop detect_broken_characters used to run
+    gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
+    thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    broken_count = 0
+    annotated_plate = plate_img.copy()
+    for cnt in contours:
+        x, y, w, h = cv2.boundingRect(cnt)
+        area = cv2.contourArea(cnt)
+        if (CONFIG["broken_area"][0] < area < CONFIG["broken_area"][1]
+                and CONFIG["broken_width"][0] < w < CONFIG["broken_width"][1]
+                and CONFIG["broken_height"][0] < h < CONFIG["broken_height"][1]):
+            broken_count += 1
+            cv2.rectangle(annotated_plate, (x, y), (x + w, y + h), (0, 0, 255), 2)
+    return broken_count, annotated_plate
+
+def sample_crops():
+    crops = []
+    for path in sorted(glob.glob(os.path.join("assignment_part_a", "output", "*.jpg"))):
+        img = cv2.imread(path)
+        h, w = img.shape[:2]
+        for y in range(0, h - 120, 200):
+            for x in range(0, w - 360, 360):
+                crops.append(img[y:y + 120, x:x + 360])
+    return crops
+
+def noise_crops(n=200):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (120, 360, 3), np.uint8) for _ in range(n)]
+
+def time_per_crop(fn, crops):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(crops)
+        best = min(best, time.perf_counter() - start)
+    return best / len(crops) * 1e6
+
+def main():
+    methods = [
+        ("contour loop", lambda crops: [contour_broken_characters(c) for c in crops]),
+        ("components", lambda crops: [detect_broken_characters(c) for c in crops]),
+        ("components + annotate", lambda crops: [detect_broken_characters(c, annotate=True) for c in crops]),
+        ("components batch", detect_broken_characters_batch),
+    ]
+
+    for name, crops in [("output/ tiles", sample_crops()), ("noise", noise_crops())]:
+        expected = [contour_broken_characters(c)[0] for c in crops]
+        assert [n for n, _ in detect_broken_characters_batch(crops)] == expected
+
+        print(f"{name}: {len(crops)} crops of 360x120")
+        print(f"{'method':>22} | {'us/crop':>8} | {'speedup':>7}")
+        print("-" * 44)
+        baseline = None
+        for method, fn in methods:
+            us = time_per_crop(fn, crops)
+            baseline = baseline or us
+            print(f"{method:>22} | {us:>8.1f} | {baseline / us:>6.2f}x")
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Benchmark: common/face_detection.py at 480p, 720p, 1080p and 4K, full
+# resolution Haar (what program3/program4 did before) vs downscaled Haar,
+# with and without a minimum face size, and the DNN detector if its model
+# files are present
+#
+# Frames are the program3/images photos enlarged into a 2x2 grid, so each
+# frame has four faces at a size proportional to the resolution.
+#
+# Run from the repository root:
+#   python benchmarks/bench_face_detection.py [runs]
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.face_detection import FaceDetector, DNN_PROTOTXT, DNN_WEIGHTS
+
+IMAGES = os.path.join("program3", "images")
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080), (3840, 2160)]
+
+def make_frame(photos, width, height):
+    frame = np.full((height, width, 3), 128, dtype=np.uint8)
+    cell_w, cell_h = width // 2, height // 2
+    for i, photo in enumerate(photos[:4]):
+        h, w = photo.shape[:2]
+        scale = min(cell_w / w, cell_h / h)
+        resized = cv2.resize(photo, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+        y, x = (i // 2) * cell_h, (i % 2) * cell_w
+        frame[y:y + resized.shape[0], x:x + resized.shape[1]] = resized
+    return frame
+
+def detectors(height):
+    # Expected faces here are at least a tenth of the frame height
+    min_face = (height // 10, height // 10)
+    yield "full res", FaceDetector(max_side=None)
+    yield "640", FaceDetector(max_side=640)
+    yield "640 + minSize", FaceDetector(max_side=640, min_size=min_face)
+    yield "480 + minSize", FaceDetector(max_side=480, min_size=min_face)
+    if os.path.exists(DNN_PROTOTXT) and os.path.exists(DNN_WEIGHTS):
+        yield "dnn 640", FaceDetector(max_side=640, backend="dnn", min_size=min_face)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    photos = [cv2.imread(os.path.join(IMAGES, f)) for f in sorted(os.listdir(IMAGES))]
+    print(f"{runs} runs per case, 4 faces per frame")
+    print(f"{'resolution':>10} | {'detector':>14} | {'faces':>5} | {'ms/frame':>8} | {'speedup':>7}")
+    print("-" * 57)
+    for width, height in RESOLUTIONS:
+        frame = make_frame(photos, width, height)
+        baseline = None
+        for name, detector in detectors(height):
+            faces = detector.detect(frame)  # warm up
+            start = time.perf_counter()
+            for _ in range(runs):
+                detector.detect(frame)
+            ms = (time.perf_counter() - start) / runs * 1000
+            baseline = baseline or ms
+            print(f"{f'{width}x{height}':>10} | {name:>14} | {len(faces):>5} | {ms:>8.2f} | {baseline / ms:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
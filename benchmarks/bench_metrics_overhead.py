@@ -0,0 +1,39 @@
+# Benchmark: cost of the common/metrics.py stage timers, disabled and
+# enabled, per stage and per q1 image (a q1 analysis takes hundreds of ms)
+#
+# Run from the repository root:
+#   python benchmarks/bench_metrics_overhead.py [calls]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.metrics import Metrics
+
+# Stages recorded per image by q1/vehicle_attribute.py with four vehicles
+STAGES_PER_IMAGE = 15
+
+def per_call(metrics, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        with metrics.stage("bench"):
+            pass
+    return (time.perf_counter() - start) / calls
+
+def bare(calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        pass
+    return (time.perf_counter() - start) / calls
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    empty = bare(calls)
+    for name, enabled in [("disabled", False), ("enabled", True)]:
+        seconds = per_call(Metrics(enabled=enabled), calls) - empty
+        print(f"{name:>8}: {seconds * 1e9:7.0f} ns per stage, "
+              f"{seconds * STAGES_PER_IMAGE * 1e6:6.1f} us per q1 image ({STAGES_PER_IMAGE} stages)")
+
+if __name__ == "__main__":
+    main()
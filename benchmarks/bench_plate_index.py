@@ -0,0 +1,76 @@
+# Benchmark: watchlist lookups per second, q5/plate_index.py vs a compare_strings loop
+#
+# Watchlists are synthetic plates in the two formats seen in this repo
+# (e.g. KA01AB1234 and JUM5353). Queries are watchlist plates with one or
+# two OCR-style errors, plus unrelated plates. The linear loop is timed on
+# a few queries only, since it is the slow case being replaced.
+#
+# Run from the repository root:
+#   python benchmarks/bench_plate_index.py
+
+import os
+import sys
+import time
+import random
+import string
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from q5.plate_index import PlateIndex, similarity
+
+SIZES = [1_000, 10_000, 100_000, 300_000]
+THRESHOLD = 70
+QUERIES = 200
+LINEAR_QUERIES = 3
+
+def random_plate(rng):
+    if rng.random() < 0.5:
+        state = rng.choice(["KA", "MH", "DL", "TN", "UP", "RJ", "GJ"])
+        return f"{state}{rng.randint(1, 99):02d}{''.join(rng.choices(string.ascii_uppercase, k=2))}{rng.randint(0, 9999):04d}"
+    return "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 3))) + str(rng.randint(1, 9999))
+
+def ocr_noise(rng, plate):
+    chars = list(plate)
+    for _ in range(rng.randint(1, 2)):
+        i = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.6:
+            chars[i] = rng.choice(string.ascii_uppercase + string.digits)
+        elif op < 0.8 and len(chars) > 4:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice(string.ascii_uppercase + string.digits))
+    return "".join(chars)
+
+def make_queries(rng, watchlist, n):
+    noisy = [ocr_noise(rng, rng.choice(watchlist)) for _ in range(n // 2)]
+    return noisy + [random_plate(rng) for _ in range(n - len(noisy))]
+
+def queries_per_sec(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return len(queries) / (time.perf_counter() - start)
+
+def main():
+    rng = random.Random(0)
+    print(f"threshold {THRESHOLD}%, {QUERIES} queries per size (linear loop: {LINEAR_QUERIES})")
+    print(f"{'watchlist':>9} | {'metric':>10} | {'build s':>7} | {'index q/s':>9} | {'linear q/s':>10} | {'speedup':>8} | {'hits/q':>6}")
+    print("-" * 80)
+    for size in SIZES:
+        watchlist = [random_plate(rng) for _ in range(size)]
+        queries = make_queries(rng, watchlist, QUERIES)
+        for metric in ("positional", "edit"):
+            start = time.perf_counter()
+            index = PlateIndex(watchlist, metric)
+            index.search_many(queries[:20], THRESHOLD)  # builds the block tables these queries need
+            build = time.perf_counter() - start
+
+            hits = sum(len(r) for r in index.search_many(queries, THRESHOLD)) / len(queries)
+            index_qps = queries_per_sec(lambda q: index.search(q, THRESHOLD), queries)
+            linear_qps = queries_per_sec(
+                lambda q: [p for p in watchlist if similarity(q, p, metric) >= THRESHOLD], queries[:LINEAR_QUERIES])
+            print(f"{size:>9} | {metric:>10} | {build:>7.2f} | {index_qps:>9.1f} | {linear_qps:>10.2f} | "
+                  f"{index_qps / linear_qps:>7.0f}x | {hits:>6.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Benchmark: per-ROI vs batched logo/plate inference in VehicleSceneAnalyzer
+#
+# Run from the repository root:
+#   python benchmarks/bench_q1_batched_inference.py
+
+import os
+import sys
+import time
+import random
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from q1.vehicle_attribute import VehicleSceneAnalyzer
+
+IMAGE_PATH = os.path.join("q1", "traffic_images", "car",
+                          "20250917.071629.915.J001A1.SL.FR.JUM5353.NaN.jpg")
+VEHICLE_COUNTS = [1, 5, 10, 20, 40]
+REPEATS = 3
+
+def fake_detections(img, count, seed=0):
+    # Random vehicle-sized boxes so the secondary stage sees `count` ROIs
+    rng = random.Random(seed)
+    h, w = img.shape[:2]
+    detections = []
+    for _ in range(count):
+        bw, bh = rng.randint(w // 10, w // 4), rng.randint(h // 10, h // 4)
+        x1, y1 = rng.randint(0, w - bw), rng.randint(0, h - bh)
+        detections.append(("car", (x1, y1, x1 + bw, y1 + bh)))
+    return detections
+
+def time_frame(analyzer, img, detections):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        analyzer.analyze_detections(img, detections)
+    return (time.perf_counter() - start) / REPEATS
+
+def main():
+    img = cv2.imread(IMAGE_PATH)
+    if img is None:
+        print(f"Could not read {IMAGE_PATH}")
+        return
+
+    analyzer = VehicleSceneAnalyzer()
+
+    # Warm up both paths once so model fusing/allocation is not timed
+    warmup = fake_detections(img, 2)
+    analyzer.batched = False
+    analyzer.analyze_detections(img, warmup)
+    analyzer.batched = True
+    analyzer.analyze_detections(img, warmup)
+
+    print(f"{'vehicles':>8} | {'per-ROI fps':>11} | {'batched fps':>11} | {'speedup':>7}")
+    print("-" * 46)
+    for count in VEHICLE_COUNTS:
+        detections = fake_detections(img, count)
+
+        analyzer.batched = False
+        per_roi = time_frame(analyzer, img, detections)
+        analyzer.batched = True
+        batched = time_frame(analyzer, img, detections)
+
+        print(f"{count:>8} | {1 / per_roi:>11.2f} | {1 / batched:>11.2f} | {per_roi / batched:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Benchmark: assignment_part_a/Q1_code.py pair throughput by worker count and pairs per predict call
+#
+# The cache is off so every pair is processed. The model is loaded before
+# timing starts.
+#
+# Run from the repository root:
+#   python benchmarks/bench_q1_code_pairs.py [front_dir rear_dir]
+
+import os
+import sys
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from assignment_part_a import Q1_code
+
+CONFIGS = [(1, 1), (1, 4), (2, 4), (4, 4), (4, 8)]  # (workers, batch_pairs)
+
+def main():
+    front_dir = sys.argv[1] if len(sys.argv) > 2 else Q1_code.front_folder
+    rear_dir = sys.argv[2] if len(sys.argv) > 2 else Q1_code.rear_folder
+    Q1_code.model.model  # load before timing so the first row is comparable
+
+    print(f"{'workers':>7} | {'batch':>5} | {'seconds':>8} | {'pairs/s':>8}")
+    print("-" * 40)
+    for workers, batch_pairs in CONFIGS:
+        with tempfile.TemporaryDirectory() as out_dir, open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                stats = Q1_code.run(front_dir, rear_dir, out_dir, workers=workers,
+                                    batch_pairs=batch_pairs, use_cache=False)
+        print(f"{workers:>7} | {batch_pairs:>5} | {stats['seconds']:>8.2f} | {stats['pairs_per_sec']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Benchmark: dominant color modes in q1/color.py against the original K=1 kmeans
+#
+# Run from the repository root:
+#   python benchmarks/bench_q1_dominant_color.py
+
+import os
+import sys
+import time
+import random
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from q1.color import COLOR_MODES, kmeans_color, rgb_to_name
+
+IMAGE_FOLDER = os.path.join("q1", "traffic_images", "car")
+CROPS_PER_IMAGE = 5
+
+def load_crops(seed=0):
+    # Vehicle-sized crops (roughly 200-800 px wide) from the sample stills
+    rng = random.Random(seed)
+    crops = []
+    for filename in sorted(os.listdir(IMAGE_FOLDER)):
+        img = cv2.imread(os.path.join(IMAGE_FOLDER, filename))
+        if img is None:
+            continue
+        h, w = img.shape[:2]
+        for _ in range(CROPS_PER_IMAGE):
+            cw, ch = rng.randint(200, 800), rng.randint(150, 600)
+            x, y = rng.randint(0, w - cw), rng.randint(0, h - ch)
+            crops.append(img[y:y + ch, x:x + cw])
+    return crops
+
+def color_class(rgb):
+    # Unnamed colours come back as "rgb(r, g, b)"; treat them all as one class
+    name = rgb_to_name(rgb)
+    return "other" if name.startswith("rgb") else name
+
+def main():
+    crops = load_crops()
+    if not crops:
+        print(f"No images found in {IMAGE_FOLDER}")
+        return
+
+    reference = [kmeans_color(c) for c in crops]
+    reference_names = [color_class(c) for c in reference]
+
+    print(f"{len(crops)} crops")
+    print(f"{'mode':>10} | {'us/crop':>9} | {'mean |dRGB|':>11} | {'same class':>9}")
+    print("-" * 51)
+    for mode, fn in COLOR_MODES.items():
+        start = time.perf_counter()
+        colors = [fn(c) for c in crops]
+        elapsed = (time.perf_counter() - start) / len(crops) * 1e6
+
+        error = np.abs(np.array(colors) - np.array(reference)).mean()
+        same = np.mean([color_class(c) == n for c, n in zip(colors, reference_names)]) * 100
+        print(f"{mode:>10} | {elapsed:>9.1f} | {error:>11.2f} | {same:>9.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Benchmark: analyze_folder_sharded throughput with 1, 2, 4 and N worker processes
+#
+# Run from the repository root:
+#   python benchmarks/bench_q1_sharded_scaling.py [folder]
+
+import os
+import sys
+import time
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from q1.vehicle_attribute import list_images
+from q1.pipeline import analyze_folder_sharded
+
+DEFAULT_FOLDER = os.path.join("q1", "traffic_images", "car")
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FOLDER
+    image_count = len(list_images(folder))
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpus})
+
+    print(f"{image_count} images, {cpus} CPUs")
+    print(f"{'workers':>7} | {'seconds':>8} | {'images/s':>8} | {'speedup':>7}")
+    print("-" * 42)
+
+    baseline = None
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as out_dir, open(os.devnull, "w") as devnull:
+            start = time.perf_counter()
+            # Model loading is part of the cost of starting each worker, so it is timed
+            with contextlib.redirect_stdout(devnull):
+                analyze_folder_sharded(folder, save_json=True,
+                                       json_folder=os.path.join(out_dir, "results"),
+                                       annotated_folder=os.path.join(out_dir, "annotated"),
+                                       processes=workers)
+            elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        print(f"{workers:>7} | {elapsed:>8.2f} | {image_count / elapsed:>8.2f} | {baseline / elapsed:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Benchmark: q7 ResNet18 backends (q7/backends.py) for latency, memory and
+# top-1 dog/non-dog parity with the eager FP32 model
+#
+# Each backend runs in a fresh interpreter. Memory is the peak RSS growth
+# from after importing torch to after the timed runs, so it covers the
+# model, any conversion, and inference buffers. Parity compares each
+# image's top-1 dog decision (and each flipped copy's) with the eager model.
+# Backends whose dependencies are missing (e.g. onnxruntime) are reported
+# as failed.
+#
+# Run from the repository root:
+#   python benchmarks/bench_q7_backends.py [folder] [backend ...]
+
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_FOLDER = os.path.join("q7", "test_images")
+BACKENDS = ["eager", "dynamic_int8", "static_int8", "torchscript", "compile", "onnx"]
+SINGLE_RUNS = 20
+BATCH_SIZE = 32
+BATCH_RUNS = 5
+
+RUNNER = '''
+import json, resource, statistics, sys, time
+import torch
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+from PIL import Image
+from q7 import cat_dog_classifier as c
+from q7.batch_classifier import list_images
+
+t0 = time.perf_counter()
+net = c.use_backend({backend!r}).model
+load = time.perf_counter() - t0
+
+images = torch.stack([c.transform(Image.open(p).convert("RGB")) for p in list_images({folder!r})])
+images = torch.cat([images, images.flip(3)])
+batch = images[torch.arange({batch_size}) % len(images)]
+
+with torch.inference_mode():
+    for _ in range(3):
+        net(images[:1])  # warm up (and compile, for torch.compile)
+    net(batch)
+
+    single = []
+    for i in range({single_runs}):
+        t = time.perf_counter()
+        net(images[i % len(images)].unsqueeze(0))
+        single.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    for _ in range({batch_runs}):
+        net(batch)
+    batched = (time.perf_counter() - t) / ({batch_runs} * {batch_size})
+
+    is_dog, _ = c.dog_scores(net(images))
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"load": load, "single_ms": statistics.median(single) * 1000, "batched_ms": batched * 1000,
+                  "memory_mb": (peak - base) / 1024, "is_dog": is_dog.tolist()}}))
+'''
+
+def run_backend(backend, folder):
+    code = RUNNER.format(backend=backend, folder=folder, batch_size=BATCH_SIZE,
+                         single_runs=SINGLE_RUNS, batch_runs=BATCH_RUNS)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        return None, out.stderr.strip().splitlines()[-1]
+    return json.loads(out.stdout.strip().splitlines()[-1]), None
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FOLDER
+    backends = sys.argv[2:] or BACKENDS
+    if "eager" not in backends:
+        backends = ["eager"] + backends
+
+    print(f"{os.cpu_count()} CPUs, batch {BATCH_SIZE}, parity on {folder} plus flipped copies")
+    print(f"{'backend':>13} | {'load s':>6} | {'batch 1 ms':>10} | {f'batch {BATCH_SIZE} ms/img':>15} | {'peak MB':>7} | {'dog parity':>10}")
+    print("-" * 80)
+    reference = None
+    for backend in backends:
+        result, error = run_backend(backend, folder)
+        if error:
+            print(f"{backend:>13} | failed: {error}")
+            continue
+        if backend == "eager":
+            reference = result["is_dog"]
+        parity = "-"
+        if reference is not None:
+            agree = sum(a == b for a, b in zip(reference, result["is_dog"]))
+            parity = f"{agree}/{len(reference)}"
+        print(f"{backend:>13} | {result['load']:>6.2f} | {result['single_ms']:>10.2f} | "
+              f"{result['batched_ms']:>15.2f} | {result['memory_mb']:>7.0f} | {parity:>10}")
+
+if __name__ == "__main__":
+    main()
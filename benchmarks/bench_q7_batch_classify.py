@@ -0,0 +1,48 @@
+# Benchmark: q7 classification throughput, classify_image loop vs
+# classify_images at batch sizes 1, 8, 32 and 64
+#
+# The test images are repeated to make a longer run. The model is loaded
+# before timing starts.
+#
+# Run from the repository root:
+#   python benchmarks/bench_q7_batch_classify.py [folder] [images]
+
+import os
+import sys
+import time
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from q7.cat_dog_classifier import classify_image, model
+from q7.batch_classifier import classify_images, list_images, default_workers
+
+DEFAULT_FOLDER = os.path.join("q7", "test_images")
+BATCH_SIZES = [1, 8, 32, 64]
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FOLDER
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    images = list_images(folder)
+    paths = (images * (count // len(images) + 1))[:count]
+    model.model  # load before timing
+
+    print(f"{count} images, {os.cpu_count()} CPUs, {default_workers()} decode workers")
+    print(f"{'mode':>16} | {'seconds':>8} | {'images/s':>8}")
+    print("-" * 40)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for path in paths:
+            classify_image(path)
+        elapsed = time.perf_counter() - start
+    print(f"{'classify_image':>16} | {elapsed:>8.2f} | {count / elapsed:>8.1f}")
+
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        results = list(classify_images(paths, batch_size=batch_size))
+        elapsed = time.perf_counter() - start
+        assert len(results) == count
+        print(f"{f'batch {batch_size}':>16} | {elapsed:>8.2f} | {count / elapsed:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Benchmark: full-resolution loading vs reduced decode + full-resolution crops
+#
+# Mirrors what one image costs before any model runs: decode, the crops the
+# analyzer takes for each vehicle, and the frame used for annotation.
+# "reduced_N" always crops at full resolution; "reduced_N_min640" crops from
+# the reduced frame when the vehicle is still 640 px across there (what
+# analyze_scaled does at imgsz=640). Each mode runs in its own interpreter
+# so peak RSS is measured separately.
+#
+# Run from the repository root:
+#   python benchmarks/bench_reduced_decode.py
+
+import os
+import sys
+import json
+import time
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+IMAGE_ROOT = os.path.join("q1", "traffic_images")
+MODES = ["full", "reduced_2", "reduced_2_min640", "reduced_4", "reduced_4_min640"]
+
+# Vehicle boxes as fractions of the frame: a close vehicle, a far one and
+# one filling most of the frame
+BOXES = [(0.10, 0.26, 0.43, 0.77), (0.53, 0.07, 0.75, 0.33), (0.05, 0.10, 0.85, 0.95)]
+
+def frame_boxes(w, h):
+    return [(int(x1 * w), int(y1 * h), int(x2 * w), int(y2 * h)) for x1, y1, x2, y2 in BOXES]
+
+def run_mode(mode):
+    import cv2
+    from common.image_loader import ScaledImage
+    from q1.image_index import walk_images
+
+    paths = list(walk_images(IMAGE_ROOT))
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for path in paths:
+        if mode == "full":
+            # Old path: full decode, a full copy for annotation, crops as views
+            img = cv2.imread(path)
+            h, w = img.shape[:2]
+            crops = [img[y1:y2, x1:x2] for x1, y1, x2, y2 in frame_boxes(w, h)]
+            annotated = img.copy()
+        else:
+            parts = mode.split("_")
+            scaled = ScaledImage(path, reduce=int(parts[1]))
+            boxes = frame_boxes(scaled.full_width, scaled.full_height)
+            min_side = int(parts[2][3:]) if len(parts) > 2 else None
+            crops, _ = scaled.crops(boxes, min_side=min_side)
+            annotated = scaled.image
+        del crops, annotated
+    elapsed = (time.perf_counter() - start) / len(paths) * 1000
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"ms_per_image": elapsed, "peak_mb": peak / 1024, "delta_mb": (peak - base_rss) / 1024}
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        print(json.dumps(run_mode(sys.argv[2])))
+        return
+
+    print(f"{'mode':>16} | {'ms/image':>8} | {'peak RSS MB':>11} | {'added MB':>8}")
+    print("-" * 54)
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, "--mode", mode], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout)
+        print(f"{mode:>16} | {r['ms_per_image']:>8.1f} | {r['peak_mb']:>11.1f} | {r['delta_mb']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Benchmark: startup cost of the model-backed modules with lazy loading
+#
+# Each case runs in a fresh interpreter and reports the time to import the
+# module, construct the analyzer/model handle, and run the first inference.
+#
+# Run from the repository root:
+#   python benchmarks/bench_startup.py
+
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMER = '''
+import json, time
+t0 = time.perf_counter()
+{imports}
+t1 = time.perf_counter()
+{construct}
+t2 = time.perf_counter()
+{infer}
+t3 = time.perf_counter()
+print(json.dumps([t1 - t0, t2 - t1, t3 - t2]))
+'''
+
+CASES = {
+    "q1 lazy": {
+        "imports": "import numpy as np\nfrom q1.vehicle_attribute import VehicleSceneAnalyzer",
+        "construct": "analyzer = VehicleSceneAnalyzer()",
+        "infer": "analyzer.analyze(np.zeros((640, 640, 3), dtype=np.uint8))",
+    },
+    "q1 preloaded": {
+        "imports": "import numpy as np\nfrom q1.vehicle_attribute import VehicleSceneAnalyzer, preload_models",
+        "construct": "preload_models(fuse=True, warmup=True)\nanalyzer = VehicleSceneAnalyzer()",
+        "infer": "analyzer.analyze(np.zeros((640, 640, 3), dtype=np.uint8))",
+    },
+    "q7 lazy": {
+        "imports": "import torch\nfrom q7 import cat_dog_classifier as c",
+        "construct": "model = c.model",
+        "infer": "model(torch.zeros(1, 3, 224, 224))",
+    },
+}
+
+def run_case(case):
+    code = TIMER.format(**case)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        return None, out.stderr.strip().splitlines()[-1]
+    return json.loads(out.stdout.strip().splitlines()[-1]), None
+
+def main():
+    print(f"{'case':>14} | {'import s':>8} | {'construct s':>11} | {'first infer s':>13}")
+    print("-" * 58)
+    for name, case in CASES.items():
+        times, error = run_case(case)
+        if error:
+            print(f"{name:>14} | failed: {error}")
+            continue
+        print(f"{name:>14} | {times[0]:>8.3f} | {times[1]:>11.3f} | {times[2]:>13.3f}")
+
+if __name__ == "__main__":
+    main()
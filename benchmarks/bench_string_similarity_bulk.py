@@ -0,0 +1,70 @@
+# Benchmark: compare_strings loop vs compare_strings_bulk at 10^4, 10^6 and 10^7 pairs
+#
+# Pairs look like the ones test_license_plate_similarity.py builds: a plate
+# and a noisy or unrelated plate. They are drawn from a pool so building
+# 10^7 pairs doesn't dominate the run. 10^7 pairs need a few GB of RAM.
+#
+# Run from the repository root:
+#   python benchmarks/bench_string_similarity_bulk.py [max_pairs]
+
+import os
+import sys
+import time
+import random
+import string
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from q5.string_similarity import compare_strings, compare_strings_bulk, pack_strings, compare_packed
+
+SIZES = [10_000, 1_000_000, 10_000_000]
+POOL = 100_000
+
+def make_pool(rng):
+    plates, noisy = [], []
+    for _ in range(POOL):
+        plate = (rng.choice(["KA", "MH", "DL", "TN"]) + f"{rng.randint(1, 99):02d}"
+                 + "".join(rng.choices(string.ascii_uppercase, k=2)) + f"{rng.randint(0, 9999):04d}")
+        plates.append(plate)
+        noisy.append(plate[:6] + "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.randint(0, 4))))
+    return plates, noisy
+
+def main():
+    max_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    plates, noisy = make_pool(random.Random(0))
+    rng = np.random.default_rng(0)
+
+    print(f"{'pairs':>10} | {'loop s':>8} | {'bulk s':>7} | {'bulk+lines s':>12} | {'packed s':>8} | {'speedup':>7} | {'Mpairs/s':>8}")
+    print("-" * 79)
+    for n in [s for s in SIZES if s <= max_pairs]:
+        idx1 = rng.integers(0, POOL, n).tolist()
+        idx2 = rng.integers(0, POOL, n).tolist()
+        strings1 = [plates[i] for i in idx1]
+        strings2 = [noisy[i] for i in idx2]
+
+        start = time.perf_counter()
+        expected = [compare_strings(a, b)[4] for a, b in zip(strings1, strings2)]
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, similarity = compare_strings_bulk(strings1, strings2)
+        bulk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compare_strings_bulk(strings1, strings2, match_lines=True)
+        bulk_lines = time.perf_counter() - start
+
+        # Already-packed input, e.g. a list that is scored repeatedly
+        packed1, packed2 = pack_strings(strings1), pack_strings(strings2)
+        start = time.perf_counter()
+        compare_packed(*packed1, *packed2)
+        packed = time.perf_counter() - start
+        del packed1, packed2
+
+        assert similarity.tolist() == expected
+        del expected
+        print(f"{n:>10} | {loop:>8.2f} | {bulk:>7.3f} | {bulk_lines:>12.3f} | {packed:>8.3f} | {loop / bulk:>6.0f}x | {n / bulk / 1e6:>8.2f}")
+
+if __name__ == "__main__":
+    main()
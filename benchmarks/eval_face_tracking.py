@@ -0,0 +1,136 @@
+# Evaluation: program4 blur with the detector on every frame vs every N
+# frames with optical-flow tracking (program4/face_tracking.py)
+#
+# Reports blur coverage, i.e. the share of face pixels inside a blurred
+# box, averaged over frames and at its worst frame. It also reports frames
+# where under 90% of a face was blurred, detector runs, and time per frame
+# for detection (including tracking) and blur, with the fps they allow
+# (video decoding not included). "every frame, pad" detects on every frame
+# with the same box padding as the tracking modes.
+#
+# Without a video argument a synthetic 1280x720 clip is made from
+# program3/images with known face positions: two faces drifting, one
+# growing as if walking towards the camera, and one entering from the
+# right halfway through. With a recorded clip, the every-frame detections
+# stand in for the true face positions.
+#
+# Run from the repository root:
+#   python benchmarks/eval_face_tracking.py [video]
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.face_detection import FaceDetector
+from program4.face_detection_blur import FACE_DETECTOR, TRACKING, blur_faces
+from program4.face_tracking import TrackingDetector
+
+IMAGES = os.path.join("program3", "images")
+SIZE = (1280, 720)
+FRAMES = 120
+EVERY = [3, 5, 10]
+
+# ========== Synthetic Clip ==========
+
+def placements(i):
+    # (photo index, x, y, scale) of each photo in frame i
+    out = [
+        (0, 60 + 3 * i, 120 + int(20 * np.sin(i / 10)), 1.4),
+        (1, 560 - 2 * i, 300, 1.2 + 0.5 * i / FRAMES),
+    ]
+    if i >= FRAMES // 2:
+        out.append((3, SIZE[0] - 6 * (i - FRAMES // 2), 80, 1.3))
+    return out
+
+def make_synthetic():
+    photos = [cv2.imread(os.path.join(IMAGES, f)) for f in sorted(os.listdir(IMAGES))]
+    face_boxes = [FaceDetector(max_side=None).detect(p)[0] for p in photos]
+    frames, truth = [], []
+    for i in range(FRAMES):
+        frame = np.full((SIZE[1], SIZE[0], 3), 110, dtype=np.uint8)
+        boxes = []
+        for k, x, y, s in placements(i):
+            photo = cv2.resize(photos[k], None, fx=s, fy=s, interpolation=cv2.INTER_CUBIC)
+            h, w = photo.shape[:2]
+            x2, y2 = min(x + w, SIZE[0]), min(y + h, SIZE[1])
+            if x2 <= x or y2 <= y:
+                continue
+            frame[y:y2, x:x2] = photo[:y2 - y, :x2 - x]
+            fx, fy, fw, fh = face_boxes[k] * s
+            box = np.array([x + fx, y + fy, fw, fh])
+            if box[0] + box[2] <= SIZE[0]:  # only faces fully in view count
+                boxes.append(box)
+        frames.append(frame)
+        truth.append(np.array(boxes).reshape(-1, 4))
+    return frames, truth
+
+def read_video(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+# ========== Scoring ==========
+
+def coverage(truth, boxes, shape):
+    # Share of true face pixels inside the blurred boxes
+    if not len(truth):
+        return 1.0
+    faces = np.zeros(shape[:2], bool)
+    for x, y, w, h in np.round(truth).astype(int):
+        faces[max(y, 0):y + h, max(x, 0):x + w] = True
+    blurred = np.zeros(shape[:2], bool)
+    for x, y, w, h in boxes:
+        blurred[y:y + h, x:x + w] = True
+    return (faces & blurred).sum() / max(faces.sum(), 1)
+
+def run_mode(frames, detector):
+    boxes, detect_s, blur_s = [], 0.0, 0.0
+    for frame in frames:
+        image = frame.copy()
+        start = time.perf_counter()
+        found = detector.detect(image)
+        detected = time.perf_counter()
+        blur_faces(image, found)
+        detect_s += detected - start
+        blur_s += time.perf_counter() - detected
+        boxes.append(found)
+    return boxes, detect_s, blur_s
+
+def main():
+    if len(sys.argv) > 1:
+        frames, truth = read_video(sys.argv[1]), None
+        source = sys.argv[1]
+    else:
+        frames, truth = make_synthetic()
+        source = f"synthetic {SIZE[0]}x{SIZE[1]}"
+
+    modes = [("every frame", FaceDetector(**FACE_DETECTOR)),
+             ("every frame, pad", TrackingDetector(FaceDetector(**FACE_DETECTOR), every=1, **TRACKING))]
+    modes += [(f"every {n} + track", TrackingDetector(FaceDetector(**FACE_DETECTOR), every=n, **TRACKING)) for n in EVERY]
+
+    print(f"{source}, {len(frames)} frames")
+    print(f"{'mode':>18} | {'coverage':>8} | {'worst':>6} | {'<90% frames':>11} | {'detector runs':>13} | "
+          f"{'detect ms':>9} | {'blur ms':>7} | {'fps':>6}")
+    print("-" * 102)
+    for name, detector in modes:
+        boxes, detect_s, blur_s = run_mode(frames, detector)
+        if truth is None:
+            truth = boxes  # every-frame detections are the reference for a recorded clip
+        scores = [coverage(t, b, f.shape) for t, b, f in zip(truth, boxes, frames)]
+        runs = getattr(detector, "detections", len(frames))
+        print(f"{name:>18} | {np.mean(scores):>8.1%} | {np.min(scores):>6.1%} | {sum(s < 0.9 for s in scores):>11} | "
+              f"{runs:>13} | {detect_s / len(frames) * 1000:>9.1f} | {blur_s / len(frames) * 1000:>7.1f} | "
+              f"{len(frames) / (detect_s + blur_s):>6.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Stand-in models for the benchmark suite, registered through
+# common/model_registry.py so the q1, assignment_part_a and q7 code runs
+# unchanged: stub YOLO models when ultralytics isn't installed, and an
+# untrained ResNet18 when the ImageNet weights aren't cached.
+#
+# A stub resizes each image to the model input size, as YOLO's
+# preprocessing does, and returns fixed boxes placed at fractions of the
+# image. The boxes are picked per weight file so they pass the same filters
+# the real detections do (vehicle classes, plate aspect and size). Timings
+# with stubs cover everything around inference, not the networks themselves.
+
+import os
+
+import cv2
+import numpy as np
+
+from common.model_registry import register_loader, clear
+
+IMGSZ = 640
+
+# Weight file name -> (class names, boxes as (x1, y1, x2, y2) image fractions, class, confidence)
+STUBS = {
+    "yolov8n.pt": ({0: "person", 2: "car", 7: "truck"}, [
+        (0.05, 0.35, 0.45, 0.95, 2, 0.91),
+        (0.55, 0.30, 0.95, 0.95, 7, 0.84),
+        (0.47, 0.40, 0.52, 0.60, 0, 0.55),
+    ]),
+    "yolo11n.pt": ({0: "proton", 1: "toyota"}, [
+        (0.40, 0.45, 0.60, 0.55, 1, 0.62),
+    ]),
+    "best.pt": ({0: "plate"}, [
+        (0.35, 0.70, 0.65, 0.80, 0, 0.77),
+    ]),
+    "LP-detection.pt": ({0: "plate"}, [
+        (0.35, 0.70, 0.65, 0.80, 0, 0.77),
+    ]),
+}
+
+class StubBoxes:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = xyxy
+        self.cls = cls
+        self.conf = conf
+
+    def __len__(self):
+        return len(self.xyxy)
+
+class StubResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+class StubYolo:
+    def __init__(self, name):
+        self.names, boxes = STUBS.get(os.path.basename(name), ({}, []))
+        self.fractions = np.array([b[:4] for b in boxes], np.float32).reshape(-1, 4)
+        self.cls = np.array([b[4] for b in boxes], np.float32)
+        self.conf = np.array([b[5] for b in boxes], np.float32)
+
+    def __call__(self, source, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        return [self.infer(img) for img in images]
+
+    predict = __call__
+
+    def fuse(self):
+        return self
+
+    def infer(self, img):
+        cv2.resize(img, (IMGSZ, IMGSZ), interpolation=cv2.INTER_LINEAR)
+        h, w = img.shape[:2]
+        xyxy = self.fractions * np.array([w, h, w, h], np.float32)
+        return StubResult(StubBoxes(xyxy, self.cls.copy(), self.conf.copy()))
+
+def ultralytics_available():
+    try:
+        import ultralytics  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def use_stub_yolo():
+    # Every "yolo" model loaded from now on is a stub; already loaded ones are dropped
+    register_loader("yolo", StubYolo, warmup=lambda model, imgsz=IMGSZ: model(np.zeros((imgsz, imgsz, 3), np.uint8)))
+    clear()
+
+def resnet18_weights_cached():
+    # Whether torchvision can load the ImageNet weights without downloading
+    import torch
+    import torchvision.models as models
+    url = models.ResNet18_Weights.IMAGENET1K_V1.url
+    return os.path.exists(os.path.join(torch.hub.get_dir(), "checkpoints", os.path.basename(url)))
+
+def load_untrained_resnet18(name):
+    # Same network and cost, random weights
+    import torch
+    import torchvision.models as models
+    torch.manual_seed(0)
+    return models.resnet18(weights=None).eval()
+
+def use_untrained_resnet18():
+    register_loader("resnet18", load_untrained_resnet18)
+    clear()
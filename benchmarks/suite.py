@@ -0,0 +1,333 @@
+# Benchmark suite: each entry point on the bundled sample data, timed end
+# to end and per stage, with a history of results so a slower commit is
+# flagged
+#
+#   q1.analyze                         VehicleSceneAnalyzer.analyze on q1/traffic_images (car and truck images)
+#   q1_code.detect_license_plate       assignment_part_a/data front and rear stills, preprocessed as Q1_code.py does
+#   q1_code.detect_broken_characters   plate-sized 360x120 tiles of the assignment_part_a/output images
+#   program3.detect_features           program3/images
+#   q5.compare_strings                 every pair of plate numbers in the q1 filenames
+#   q7.classify_image                  q7/test_images
+#
+# Times are per item and include reading and decoding the file, except for
+# the broken-character tiles, which are cut out once up front. Per-stage
+# times come from common/metrics.py, so they are the stages the pipelines
+# record themselves plus "decode".
+#
+# Models: the real YOLO models when ultralytics is installed, otherwise the
+# stubs in benchmarks/stub_models.py (--stub forces them). ResNet18 gets
+# random weights if the ImageNet checkpoint isn't cached. A benchmark whose
+# library is missing (torch for q7, cv2.CascadeClassifier for program3) is
+# skipped. Runs are only compared with runs that used the same models.
+#
+# Each benchmark runs once to warm up, then `--repeats` times over all its
+# items (several passes per repeat if one pass is very short). The per-item
+# time of the fastest and the median repeat are recorded, with stage means.
+# Runs are compared on the fastest repeat, which is the least noisy.
+# Results are appended to benchmarks/results/<machine>.jsonl along with the
+# commit. Each run is compared with the latest saved run from another
+# commit (or --against <commit>), and a benchmark more than --threshold
+# slower is flagged as a REGRESSION, which makes the exit status 1. Stages
+# are flagged the same way, but only as a hint to where the time went.
+#
+# Run from the repository root:
+#   python benchmarks/suite.py [--stub] [--repeats N] [--only name,...]
+#                              [--threshold 0.2] [--against commit] [--no-save]
+
+import os
+import io
+import sys
+import glob
+import json
+import math
+import time
+import platform
+import contextlib
+import itertools
+import statistics
+import subprocess
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from common.metrics import metrics
+from stub_models import (ultralytics_available, use_stub_yolo, resnet18_weights_cached,
+                         use_untrained_resnet18)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+REPEATS = 3
+THRESHOLD = 0.2
+MIN_REPEAT_SECONDS = 0.2    # fast benchmarks loop over their items until a repeat takes this long
+
+class Skip(Exception):
+    pass
+
+# ========== Benchmarks ==========
+# Each setup() returns (items, run, models): run(item) is timed once per
+# item, and `models` says which models it used ("real", "stub", ...) or
+# None if it uses none.
+
+def files(*patterns):
+    return sorted(itertools.chain.from_iterable(glob.glob(os.path.join(ROOT, p)) for p in patterns))
+
+def read(path):
+    with metrics.stage("decode"):
+        img = cv2.imread(path)
+    if img is None:
+        raise Skip(f"could not read {path}")
+    return img
+
+def setup_analyze(models):
+    from q1.vehicle_attribute import VehicleSceneAnalyzer
+    analyzer = VehicleSceneAnalyzer()
+    items = files("q1/traffic_images/car/*.jpg", "q1/traffic_images/truck images/*.jpg")
+    return items, lambda path: analyzer.analyze(read(path)), models["yolo"]
+
+def setup_license_plate(models):
+    from assignment_part_a.Q1_code import detect_license_plate, preprocess_image
+
+    def run(path):
+        img = read(path)
+        with metrics.stage("preprocess"):
+            img = preprocess_image(img)
+        with metrics.stage("plate_detection"):
+            return detect_license_plate(img)
+
+    return files("assignment_part_a/data/front/*.jpg", "assignment_part_a/data/rear/*.jpg"), run, models["yolo"]
+
+def setup_broken_characters(models):
+    from assignment_part_a.Q1_code import detect_broken_characters
+    crops = []
+    for path in files("assignment_part_a/output/*.jpg"):
+        img = cv2.imread(path)
+        h, w = img.shape[:2]
+        for y in range(0, h - 120, 200):
+            for x in range(0, w - 360, 360):
+                crops.append(img[y:y + 120, x:x + 360])
+    return crops, detect_broken_characters, None
+
+def setup_detect_features(models):
+    if not hasattr(cv2, "CascadeClassifier"):
+        raise Skip("this OpenCV build has no CascadeClassifier")
+    from program3.face_detection_app import detect_features
+    return files("program3/images/*.jpg"), lambda path: detect_features(read(path)), None
+
+def setup_compare_strings(models):
+    from q1.image_index import build_index, ground_truth_plates
+    from q5.string_similarity import compare_strings
+    plates = sorted(set(ground_truth_plates(build_index(os.path.join(ROOT, "q1", "traffic_images"))).values()))
+    return [(a, b) for a in plates for b in plates], lambda pair: compare_strings(*pair), None
+
+def setup_classify_image(models):
+    if models["resnet18"] is None:
+        raise Skip("torch is not installed")
+    from q7 import cat_dog_classifier
+    from q7.cat_dog_classifier import classify_image
+
+    def run(path):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return classify_image(path)
+
+    return files("q7/test_images/*.jpg"), run, f"{cat_dog_classifier.CONFIG['backend']}-{models['resnet18']}"
+
+BENCHMARKS = {
+    "q1.analyze": setup_analyze,
+    "q1_code.detect_license_plate": setup_license_plate,
+    "q1_code.detect_broken_characters": setup_broken_characters,
+    "program3.detect_features": setup_detect_features,
+    "q5.compare_strings": setup_compare_strings,
+    "q7.classify_image": setup_classify_image,
+}
+
+def choose_models(stub):
+    # "real" or "stub" for the YOLO models; "real", "untrained" or None
+    # (torch missing) for ResNet18
+    models = {"yolo": "real", "resnet18": None}
+    if stub or not ultralytics_available():
+        use_stub_yolo()
+        models["yolo"] = "stub"
+    try:
+        if resnet18_weights_cached():
+            models["resnet18"] = "real"
+        else:
+            use_untrained_resnet18()
+            models["resnet18"] = "untrained"
+    except ImportError:
+        pass
+    return models
+
+def run_benchmark(setup, models, repeats):
+    items, run, used = setup(models)
+    if not items:
+        raise Skip("no sample data found")
+    run(items[0])  # warm-up: loads models, fills caches
+
+    start = time.perf_counter()
+    for item in items:
+        run(item)
+    passes = max(1, math.ceil(MIN_REPEAT_SECONDS / max(time.perf_counter() - start, 1e-9)))
+
+    metrics.reset()
+    per_item = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(passes):
+            for item in items:
+                run(item)
+        per_item.append((time.perf_counter() - start) / (passes * len(items)))
+
+    calls = repeats * passes * len(items)
+    stages = {name: h["sum"] / calls for name, h in metrics.to_dict()["stages"].items()}
+    return {
+        "items": len(items),
+        "models": used,
+        "median": statistics.median(per_item),
+        "min": min(per_item),
+        "stages": stages,
+    }
+
+# ========== Results History ==========
+
+def git(*args):
+    out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True)
+    return out.stdout.strip() if out.returncode == 0 else None
+
+def machine_info():
+    return {
+        "name": platform.node() or "unknown",
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+def results_path(machine):
+    return os.path.join(RESULTS_DIR, f"{machine}.jsonl")
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def save_run(path, run):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+def find_baseline(history, commit, against=None):
+    # Latest run of `against` if given, else the latest run from another
+    # commit, else the latest run
+    if against:
+        matches = [r for r in history if r["commit"] and r["commit"].startswith(against)]
+        return matches[-1] if matches else None
+    others = [r for r in history if r["commit"] != commit]
+    if others:
+        return others[-1]
+    return history[-1] if history else None
+
+def compare(current, baseline, threshold=THRESHOLD):
+    # One row per benchmark: (name, current, baseline, ratio, flag), and
+    # the same per stage. Benchmarks that used other models, or are
+    # missing from either run, get no baseline.
+    rows = []
+    for name, result in current["benchmarks"].items():
+        base = (baseline or {}).get("benchmarks", {}).get(name)
+        if base is not None and base["models"] != result["models"]:
+            base = None
+        rows.append(row(name, result["min"], base and base["min"], threshold))
+        for stage, seconds in result["stages"].items():
+            rows.append(row(f"  {stage}", seconds, base and base["stages"].get(stage), threshold))
+    return rows
+
+def row(name, current, baseline, threshold):
+    if baseline is None:
+        return name, current, None, None, ""
+    return (name, current, baseline, *judge(current, baseline, threshold))
+
+def judge(current, baseline, threshold):
+    ratio = current / baseline if baseline > 0 else 1.0
+    if ratio > 1 + threshold:
+        return ratio, "REGRESSION"
+    if ratio < 1 - threshold:
+        return ratio, "faster"
+    return ratio, ""
+
+def print_rows(rows):
+    print(f"{'benchmark (fastest repeat)':<36} | {'ms/item':>9} | {'baseline':>9} | {'ratio':>6} |")
+    print("-" * 78)
+    for name, current, base, ratio, flag in rows:
+        base_text = f"{base * 1000:>9.3f}" if base is not None else f"{'-':>9}"
+        ratio_text = f"{ratio:>6.2f}" if ratio is not None else f"{'':>6}"
+        print(f"{name:<36} | {current * 1000:>9.3f} | {base_text} | {ratio_text} | {flag}")
+
+# ========== Main ==========
+
+def parse_args(argv):
+    options = {"stub": False, "repeats": REPEATS, "only": None, "threshold": THRESHOLD,
+               "against": None, "save": True}
+    args = iter(argv)
+    for arg in args:
+        if arg == "--stub":
+            options["stub"] = True
+        elif arg == "--no-save":
+            options["save"] = False
+        elif arg == "--repeats":
+            options["repeats"] = int(next(args))
+        elif arg == "--only":
+            options["only"] = next(args).split(",")
+        elif arg == "--threshold":
+            options["threshold"] = float(next(args))
+        elif arg == "--against":
+            options["against"] = next(args)
+        else:
+            raise SystemExit(f"Unknown argument {arg}")
+    return options
+
+def main(argv):
+    options = parse_args(argv)
+    names = options["only"] or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmark(s) {sorted(unknown)}, expected some of {list(BENCHMARKS)}")
+
+    models = choose_models(options["stub"])
+    machine = machine_info()
+    run = {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine,
+        "benchmarks": {},
+    }
+    print(f"{machine['name']}, {machine['cpus']} CPUs, commit {(run['commit'] or 'unknown')[:10]}"
+          f"{' (dirty)' if run['dirty'] else ''}, YOLO models: {models['yolo']}")
+
+    metrics.enable()
+    for name in names:
+        try:
+            run["benchmarks"][name] = run_benchmark(BENCHMARKS[name], models, options["repeats"])
+        except Skip as e:
+            print(f"{name}: skipped, {e}")
+    metrics.enable(False)
+
+    path = results_path(machine["name"])
+    history = load_history(path)
+    baseline = find_baseline(history, run["commit"], options["against"])
+    if baseline is not None:
+        print(f"baseline: commit {(baseline['commit'] or 'unknown')[:10]} from {baseline['time']}")
+    elif options["against"]:
+        print(f"no saved run of commit {options['against']}")
+    rows = compare(run, baseline, options["threshold"])
+    print_rows(rows)
+
+    if options["save"]:
+        save_run(path, run)
+        print(f"Saved to {os.path.relpath(path, ROOT)}")
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION" and not row[0].startswith(" ")]
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
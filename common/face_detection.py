@@ -0,0 +1,129 @@
+import os
+import math
+
+import cv2
+import numpy as np
+
+# Face detection shared by program3 and program4: Haar cascade (or OpenCV's
+# DNN face detector) on a downscaled copy of the image, with boxes mapped
+# back to full resolution.
+
+HAAR_FACE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+HAAR_WINDOW = (24, 24)  # smallest face the frontal cascade can find
+
+# OpenCV's ResNet-10 SSD face detector. The files are not bundled; get them from
+# https://github.com/opencv/opencv/tree/master/samples/dnn/face_detector
+# (deploy.prototxt) and opencv_3rdparty (res10_300x300_ssd_iter_140000.caffemodel).
+DNN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+DNN_PROTOTXT = os.path.join(DNN_DIR, "deploy.prototxt")
+DNN_WEIGHTS = os.path.join(DNN_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+DNN_INPUT = (300, 300)
+DNN_MEAN = (104.0, 177.0, 123.0)
+
+def downscale(image, max_side):
+    # Returns the image shrunk so its longer side is at most max_side, and
+    # the factor applied (1.0 if it was already small enough)
+    h, w = image.shape[:2]
+    if not max_side or max(h, w) <= max_side:
+        return image, 1.0
+    scale = max_side / max(h, w)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA), scale
+
+def remap_boxes(boxes, scale, shape):
+    # x, y, w, h boxes found at `scale` back to full-resolution pixels,
+    # clipped to the image
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if scale != 1.0:
+        boxes = boxes / scale
+    h, w = shape[:2]
+    x1 = np.clip(np.round(boxes[:, 0]), 0, w)
+    y1 = np.clip(np.round(boxes[:, 1]), 0, h)
+    x2 = np.clip(np.round(boxes[:, 0] + boxes[:, 2]), 0, w)
+    y2 = np.clip(np.round(boxes[:, 1] + boxes[:, 3]), 0, h)
+    return np.stack([x1, y1, x2 - x1, y2 - y1], axis=1).astype(np.int32)
+
+def scaled_size(size, scale, floor=None):
+    # A full-resolution (w, h) size bound at detection scale
+    if size is None:
+        return None
+    w, h = (math.ceil(v * scale) for v in size)
+    if floor is not None:
+        w, h = max(w, floor[0]), max(h, floor[1])
+    return (w, h)
+
+class FaceDetector:
+    # Finds faces and returns them as an (N, 4) int array of x, y, w, h in
+    # the input image's pixels.
+    #
+    # max_side: detect on a copy shrunk to this longer side (None = full
+    #     resolution). Small images are not enlarged.
+    # min_size, max_size: expected face size range, (w, h) in full-resolution
+    #     pixels. Faces outside it are not searched for, which also saves time.
+    # backend: "haar" (default) or "dnn" for OpenCV's ResNet-10 SSD, which
+    #     needs DNN_PROTOTXT and DNN_WEIGHTS (or the paths given here).
+    #
+    # A detector is not meant to be shared between threads; make one per thread.
+    def __init__(self, max_side=640, min_size=None, max_size=None, backend="haar",
+                 scale_factor=1.3, min_neighbors=5, confidence=0.5,
+                 prototxt=DNN_PROTOTXT, weights=DNN_WEIGHTS):
+        if backend not in ("haar", "dnn"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'haar' or 'dnn'")
+        self.max_side = max_side
+        self.min_size = min_size
+        self.max_size = max_size
+        self.backend = backend
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.confidence = confidence
+
+        if backend == "haar":
+            self.cascade = cv2.CascadeClassifier(HAAR_FACE_PATH)
+        else:
+            for path in (prototxt, weights):
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"DNN face detector file not found: {path}")
+            self.net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+
+    def detect(self, image):
+        # `image` is BGR, or grayscale for the Haar backend
+        small, scale = downscale(image, self.max_side)
+        if self.backend == "haar":
+            boxes = self.detect_haar(small, scale)
+        else:
+            boxes = self.detect_dnn(small)
+        return self.filter_size(remap_boxes(boxes, scale, image.shape))
+
+    def detect_haar(self, small, scale):
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        kwargs = {}
+        min_size = scaled_size(self.min_size, scale, floor=HAAR_WINDOW)
+        max_size = scaled_size(self.max_size, scale)
+        if min_size is not None:
+            kwargs["minSize"] = min_size
+        if max_size is not None:
+            kwargs["maxSize"] = max_size
+        faces = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors, **kwargs)
+        return np.asarray(faces).reshape(-1, 4)
+
+    def detect_dnn(self, small):
+        bgr = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR) if small.ndim == 2 else small
+        h, w = bgr.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(bgr, DNN_INPUT), 1.0, DNN_INPUT, DNN_MEAN)
+        self.net.setInput(blob)
+        detections = self.net.forward().reshape(-1, 7)
+        detections = detections[detections[:, 2] >= self.confidence]
+        corners = detections[:, 3:7] * np.array([w, h, w, h])
+        return np.column_stack([corners[:, :2], corners[:, 2:] - corners[:, :2]])
+
+    def filter_size(self, boxes):
+        # The Haar search is already bounded; the DNN detector has no size
+        # limits of its own, so its boxes are filtered here
+        if self.backend != "dnn":
+            return boxes
+        keep = np.ones(len(boxes), dtype=bool)
+        if self.min_size is not None:
+            keep &= (boxes[:, 2] >= self.min_size[0]) & (boxes[:, 3] >= self.min_size[1])
+        if self.max_size is not None:
+            keep &= (boxes[:, 2] <= self.max_size[0]) & (boxes[:, 3] <= self.max_size[1])
+        return boxes[keep]
@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+# libjpeg can decode straight to 1/2, 1/4 or 1/8 size by skipping DCT
+# coefficients, which is much cheaper than decoding and resizing
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def read_image(path=None, data=None, reduce=1):
+    # Decode from a path or from bytes already in memory
+    if reduce not in REDUCED_FLAGS:
+        raise ValueError(f"reduce must be one of {list(REDUCED_FLAGS)}, got {reduce}")
+    flag = REDUCED_FLAGS[reduce]
+    if data is not None:
+        return cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    return cv2.imread(path, flag)
+
+class ScaledImage:
+    # A frame decoded at 1/reduce size for detection. Full-resolution pixels
+    # are decoded only when crops are asked for, and only the crops are kept.
+    def __init__(self, path=None, data=None, reduce=2):
+        self.path = path
+        self.data = data
+        self.reduce = reduce
+        self.image = read_image(path, data, reduce)
+
+    @property
+    def ok(self):
+        return self.image is not None
+
+    @property
+    def full_width(self):
+        return self.image.shape[1] * self.reduce
+
+    @property
+    def full_height(self):
+        return self.image.shape[0] * self.reduce
+
+    def to_full(self, bbox):
+        return tuple(int(v * self.reduce) for v in bbox)
+
+    def to_reduced(self, bbox):
+        return tuple(int(v // self.reduce) for v in bbox)
+
+    def full_crops(self, bboxes):
+        # Decode the full frame once, copy out the requested regions and let
+        # the full buffer go straight away
+        if not bboxes:
+            return []
+        if self.reduce == 1:
+            full = self.image
+        else:
+            full = read_image(self.path, self.data, 1)
+        crops = [crop_copy(full, bbox) for bbox in bboxes]
+        del full
+        return crops
+
+    def crops(self, bboxes, min_side=None):
+        # Crops for full-resolution bboxes, taken from the reduced frame when
+        # it still has at least `min_side` pixels on the crop's longer side.
+        # The full frame is decoded only if some crop is smaller than that.
+        # Returns (crops, scales); scale maps crop pixels back to full
+        # resolution (1 for full-resolution crops, `reduce` for reduced ones).
+        if min_side is None or self.reduce == 1:
+            return self.full_crops(bboxes), [1] * len(bboxes)
+
+        crops, scales, need_full = [], [], []
+        for i, bbox in enumerate(bboxes):
+            x1, y1, x2, y2 = self.to_reduced(bbox)
+            if max(x2 - x1, y2 - y1) >= min_side:
+                crops.append(crop_copy(self.image, (x1, y1, x2, y2)))
+                scales.append(self.reduce)
+            else:
+                crops.append(None)
+                scales.append(1)
+                need_full.append(i)
+
+        for i, crop in zip(need_full, self.full_crops([bboxes[i] for i in need_full])):
+            crops[i] = crop
+        return crops, scales
+
+def crop_copy(img, bbox):
+    h, w = img.shape[:2]
+    x1, y1, x2, y2 = bbox
+    x1, x2 = max(0, min(x1, w)), max(0, min(x2, w))
+    y1, y2 = max(0, min(y1, h)), max(0, min(y2, h))
+    return img[y1:y2, x1:x2].copy()
@@ -0,0 +1,205 @@
+import os
+import json
+import math
+import time
+import threading
+
+# Stage timers, counters and latency histograms for the vision pipelines.
+#
+#     from common.metrics import metrics
+#
+#     with metrics.stage("q1.vehicle_detection"):
+#         ...
+#     metrics.count("q1.images")
+#
+# Recording is off unless metrics.enable() is called or VISION_METRICS=1 is
+# set; while off, stage() hands back a shared do-nothing timer, so the
+# instrumented code pays one attribute check per stage. At the end of a run,
+# report() prints a summary table and, if VISION_METRICS_OUT is set, writes
+# a JSON (.json) or Prometheus text (anything else) file there.
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.bounds = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.bounds):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Estimated from the buckets, interpolating inside the one that holds
+        # the q-th observation, and kept within the observed min and max
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for bound, n in zip(self.bounds, self.counts):
+            if n and seen + n >= rank:
+                upper = self.max if math.isinf(bound) else bound
+                value = lower + (upper - lower) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+            lower = bound
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": {("+Inf" if math.isinf(b) else b): n for b, n in zip(self.bounds, self.counts)},
+        }
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = _NullTimer()
+
+class Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    # --- Recording ---
+
+    def stage(self, name):
+        # Context manager that records the time spent inside it under `name`
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name)
+
+    def timed(self, name):
+        # Decorator form of stage()
+        def wrap(fn):
+            def inner(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            inner.__name__ = fn.__name__
+            inner.__doc__ = fn.__doc__
+            return inner
+        return wrap
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # --- Export ---
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "stages": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix="vision"):
+        # Prometheus text exposition format: one histogram with a stage
+        # label, and one counter with a name label
+        lines = [f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage.",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        data = self.to_dict()
+        for name, h in data["stages"].items():
+            cumulative = 0
+            for bound, n in h["buckets"].items():
+                cumulative += n
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h["sum"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h["count"]}')
+        lines += [f"# HELP {prefix}_events_total Events counted by the pipelines.",
+                  f"# TYPE {prefix}_events_total counter"]
+        for name, n in data["counters"].items():
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def summary_table(self):
+        data = self.to_dict()
+        lines = [f"{'stage':<30} | {'count':>7} | {'total s':>8} | {'mean ms':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'max ms':>8}",
+                 "-" * 96]
+        for name, h in data["stages"].items():
+            lines.append(f"{name:<30} | {h['count']:>7} | {h['sum']:>8.2f} | {h['mean'] * 1000:>8.2f} | "
+                         f"{h['p50'] * 1000:>8.2f} | {h['p95'] * 1000:>8.2f} | {h['max'] * 1000:>8.2f}")
+        for name, n in data["counters"].items():
+            lines.append(f"{name:<30} | {n:>7}")
+        return "\n".join(lines)
+
+    def write(self, path):
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def report(self, path=None):
+        # End-of-run output: the summary table, plus a file if `path` or
+        # VISION_METRICS_OUT is set. Does nothing while disabled.
+        if not self.enabled:
+            return
+        print(self.summary_table())
+        path = path or os.environ.get("VISION_METRICS_OUT")
+        if path:
+            print(f"Metrics written to {self.write(path)}")
+
+# Process-wide instance the pipelines record into
+metrics = Metrics(enabled=os.environ.get("VISION_METRICS") == "1")
@@ -0,0 +1,118 @@
+import threading
+
+import numpy as np
+
+# Process-wide cache of loaded models, keyed by (kind, name)
+_models = {}
+_lock = threading.Lock()
+
+# ========== Loaders ==========
+
+def load_yolo(name):
+    from ultralytics import YOLO
+    return YOLO(name)
+
+def load_resnet18(name):
+    import torchvision.models as models
+    model = models.resnet18(weights=models.ResNet18_Weights.IMAGENET1K_V1)
+    model.eval()
+    return model
+
+def warmup_yolo(model, imgsz=640):
+    model(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), verbose=False)
+
+def warmup_torch(model, imgsz=224):
+    import torch
+    with torch.inference_mode():
+        model(torch.zeros(1, 3, imgsz, imgsz))
+
+LOADERS = {
+    "yolo": load_yolo,
+    "resnet18": load_resnet18,
+}
+
+WARMUPS = {
+    "yolo": warmup_yolo,
+    "resnet18": warmup_torch,
+}
+
+def register_loader(kind, loader, warmup=None):
+    LOADERS[kind] = loader
+    if warmup is not None:
+        WARMUPS[kind] = warmup
+
+# ========== Registry ==========
+
+def load_model(name, kind="yolo", fuse=False, warmup=False):
+    if kind not in LOADERS:
+        raise ValueError(f"Unknown model kind '{kind}', expected one of {list(LOADERS)}")
+    model = LOADERS[kind](name)
+    if fuse and hasattr(model, "fuse"):
+        model.fuse()
+    if warmup and kind in WARMUPS:
+        WARMUPS[kind](model)
+    return model
+
+def get_model(name, kind="yolo", fuse=False, warmup=False):
+    key = (kind, name)
+    model = _models.get(key)
+    if model is None:
+        # Loading happens under the lock so two threads never load the same weights twice
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = load_model(name, kind, fuse, warmup)
+                _models[key] = model
+    return model
+
+def preload(specs, fuse=False, warmup=False):
+    # Load models up front, e.g. in the parent process before forking
+    # workers so they share the weights copy-on-write.
+    # `specs` is a list of names or (name, kind) pairs.
+    for spec in specs:
+        name, kind = spec if isinstance(spec, tuple) else (spec, "yolo")
+        get_model(name, kind, fuse, warmup)
+
+def is_loaded(name, kind="yolo"):
+    return (kind, name) in _models
+
+def clear():
+    with _lock:
+        _models.clear()
+
+class LazyModel:
+    # Stands in for a model and loads it on first call or attribute access.
+    # With shared=False the instance is private to this proxy instead of
+    # coming from the registry (needed when threads run models concurrently).
+    def __init__(self, name, kind="yolo", shared=True, fuse=False, warmup=False):
+        self.name = name
+        self.kind = kind
+        self.shared = shared
+        self.fuse_on_load = fuse
+        self.warmup_on_load = warmup
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            if self.shared:
+                self._model = get_model(self.name, self.kind, self.fuse_on_load, self.warmup_on_load)
+            else:
+                self._model = load_model(self.name, self.kind, self.fuse_on_load, self.warmup_on_load)
+        return self._model
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.model(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes not defined on the proxy itself
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.model, attr)
+
+def lazy_model(name, kind="yolo", shared=True, fuse=False, warmup=False):
+    return LazyModel(name, kind, shared, fuse, warmup)
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# ========== Hashing ==========
+
+def bytes_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fingerprint(model_files=(), config=None):
+    # Identifies everything besides the input that affects a result: the
+    # weight files' contents and the analysis settings. Weights that aren't
+    # on disk yet (auto-downloaded by name) are identified by name.
+    h = hashlib.sha256()
+    for path in model_files:
+        h.update(path.encode())
+        if os.path.exists(path):
+            h.update(file_digest(path).encode())
+    h.update(json.dumps(config or {}, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+# ========== Cache ==========
+
+class ResultCache:
+    # SQLite store of JSON results keyed by (input hash, fingerprint).
+    # Every put is committed right away, so an interrupted run resumes from
+    # the last finished input. A new fingerprint only misses its own entries;
+    # results stored under other fingerprints stay in the file.
+    # One connection is shared between threads, guarded by a lock.
+    # get/put take another fingerprint for entries that have their own, such
+    # as intermediate stages; hit/miss counts and time saved only cover
+    # entries under the cache's fingerprint.
+    def __init__(self, path, fingerprint):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                value TEXT NOT NULL,
+                elapsed REAL NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (key, fingerprint)
+            )
+        """)
+        self.conn.commit()
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+    def get(self, key, fingerprint=None):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, elapsed FROM results WHERE key = ? AND fingerprint = ?",
+                (key, fingerprint or self.fingerprint)).fetchone()
+            if fingerprint is not None:
+                return None if row is None else json.loads(row[0])
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.time_saved += row[1]
+        return json.loads(row[0])
+
+    def put(self, key, value, elapsed, fingerprint=None):
+        # `elapsed` is how long computing the value took, reported as time saved on later hits
+        value = json.dumps(value)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (key, fingerprint, value, elapsed, created) VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint or self.fingerprint, value, elapsed, time.time()))
+            self.conn.commit()
+
+    def prune(self, keep=()):
+        # Drop entries made under other fingerprints (old weights or settings)
+        # than the cache's own and those in `keep`
+        current = [self.fingerprint, *keep]
+        with self.lock:
+            cur = self.conn.execute(
+                f"DELETE FROM results WHERE fingerprint NOT IN ({', '.join('?' * len(current))})", current)
+            self.conn.commit()
+        return cur.rowcount
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"Cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {self.time_saved:.1f}s saved"
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,110 @@
+import numpy as np
+
+# One row per kept detection
+DETECTION_DTYPE = np.dtype([
+    ("x1", np.int32), ("y1", np.int32), ("x2", np.int32), ("y2", np.int32),
+    ("cls", np.int32), ("conf", np.float32),
+])
+
+# ========== Array Conversion ==========
+
+def to_numpy(x):
+    # Works for torch tensors (CPU or GPU) and anything array-like
+    if hasattr(x, "cpu"):
+        x = x.cpu()
+    if hasattr(x, "numpy"):
+        return x.numpy()
+    return np.asarray(x)
+
+def boxes_to_arrays(result):
+    # Pull all boxes of one YOLO result out in three array copies instead
+    # of one .item()/.tolist() call per box
+    boxes = result.boxes
+    if len(boxes) == 0:
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.int32), np.zeros(0, np.float32)
+    xyxy = to_numpy(boxes.xyxy).astype(np.float32).reshape(-1, 4)
+    cls = to_numpy(boxes.cls).astype(np.int32).reshape(-1)
+    conf = to_numpy(boxes.conf).astype(np.float32).reshape(-1)
+    return xyxy, cls, conf
+
+def class_ids(names, wanted):
+    # Map class names to ids using a model's `names` dict
+    return [i for i, name in names.items() if name in wanted]
+
+# ========== Vectorized Filters ==========
+
+def clip_boxes(xyxy, img_w, img_h):
+    out = xyxy.copy()
+    out[:, [0, 2]] = np.clip(out[:, [0, 2]], 0, img_w)
+    out[:, [1, 3]] = np.clip(out[:, [1, 3]], 0, img_h)
+    return out
+
+def box_mask(xyxy, cls=None, conf=None, allowed_classes=None, min_conf=None,
+             min_aspect=None, max_aspect=None, min_width=None, min_height=None):
+    # Boolean mask of the boxes that pass every given filter. Aspect ratio
+    # bounds are inclusive; min_width/min_height are strict (w > min_width).
+    keep = np.ones(len(xyxy), dtype=bool)
+    w = xyxy[:, 2] - xyxy[:, 0]
+    h = xyxy[:, 3] - xyxy[:, 1]
+
+    if allowed_classes is not None:
+        keep &= np.isin(cls, allowed_classes)
+    if min_conf is not None:
+        keep &= conf >= min_conf
+    if min_width is not None:
+        keep &= w > min_width
+    if min_height is not None:
+        keep &= h > min_height
+    if min_aspect is not None or max_aspect is not None:
+        # Zero-height boxes get an infinite aspect ratio instead of a division error
+        with np.errstate(divide="ignore", invalid="ignore"):
+            aspect = np.where(h > 0, w / np.where(h > 0, h, 1), np.inf)
+        if min_aspect is not None:
+            keep &= aspect >= min_aspect
+        if max_aspect is not None:
+            keep &= aspect <= max_aspect
+    return keep
+
+# ========== Post-Processing ==========
+
+def postprocess(result, img_shape=None, allowed_classes=None, min_conf=None, min_aspect=None,
+                max_aspect=None, min_width=None, min_height=None, top_k=None, truncate=True):
+    # Turn one YOLO result into a structured array of DETECTION_DTYPE rows,
+    # filtered and sorted by confidence (best first).
+    #
+    # Coordinates are truncated to int before filtering when `truncate` is
+    # set, the same as the old `map(int, box)` loops did.
+    xyxy, cls, conf = boxes_to_arrays(result)
+    if truncate:
+        xyxy = np.trunc(xyxy)
+
+    if img_shape is not None:
+        img_h, img_w = img_shape[:2]
+        xyxy = clip_boxes(xyxy, img_w, img_h)
+
+    keep = box_mask(xyxy, cls, conf, allowed_classes, min_conf, min_aspect, max_aspect, min_width, min_height)
+    xyxy, cls, conf = xyxy[keep], cls[keep], conf[keep]
+
+    # Stable sort so equal confidences keep the model's order
+    order = np.argsort(-conf, kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+
+    out = np.zeros(len(order), dtype=DETECTION_DTYPE)
+    out["x1"], out["y1"], out["x2"], out["y2"] = xyxy[order].astype(np.int32).T
+    out["cls"] = cls[order]
+    out["conf"] = conf[order]
+    return out
+
+def best_box(result, **filters):
+    # Highest-confidence box as ((x1, y1, x2, y2), cls), or (None, None)
+    detections = postprocess(result, top_k=1, **filters)
+    if len(detections) == 0:
+        return None, None
+    d = detections[0]
+    return (int(d["x1"]), int(d["y1"]), int(d["x2"]), int(d["y2"])), int(d["cls"])
+
+def bbox_tuples(detections):
+    # One .tolist() converts every coordinate to a Python int at once
+    xyxy = np.stack([detections["x1"], detections["y1"], detections["x2"], detections["y2"]], axis=1)
+    return [tuple(row) for row in xyxy.tolist()]
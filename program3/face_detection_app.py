@@ -1,28 +1,169 @@
 import cv2
 import os
-import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
 
-# Load Haar cascades for face and eye detection
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_eye.xml")
+# Tk is only needed for the GUI; headless mode runs without it
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+    from PIL import ImageTk
+except ImportError:
+    tk = messagebox = ImageTk = None
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.face_detection import FaceDetector
+from common.metrics import metrics
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Face detection settings (see common/face_detection.py): faces are found on
+# a copy at most 640 px on its longer side, then eyes at full resolution.
+# backend="dnn" switches to OpenCV's DNN face detector.
+FACE_DETECTOR = {
+    "max_side": 640,
+    "min_size": None,
+    "max_size": None,
+    "backend": "haar",
+}
+
+EYE_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_eye.xml"
+
+# Load face detector and Haar cascade for eye detection
+face_detector = FaceDetector(**FACE_DETECTOR)
+eye_cascade = cv2.CascadeClassifier(EYE_CASCADE_PATH)
+
+# Background threads get their own detectors rather than sharing the ones above
+_local = threading.local()
+
+def thread_detectors():
+    if threading.current_thread() is threading.main_thread():
+        return face_detector, eye_cascade
+    if not hasattr(_local, "face"):
+        _local.face = FaceDetector(**FACE_DETECTOR)
+        _local.eye = cv2.CascadeClassifier(EYE_CASCADE_PATH)
+    return _local.face, _local.eye
+
+# Detect face, eyes, and nose tip in the image; draws on it and returns it
+def detect_features(image):
+    face_detector, eye_detector = thread_detectors()
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    with metrics.stage("program3.face_detection"):
+        faces = face_detector.detect(gray)
+
+    for (x, y, w, h) in faces:
+        roi_gray = gray[y:y+h, x:x+w]
+
+        # Detect eyes only in the upper half of the face region
+        upper_half = roi_gray[0:h//2, :]
+        with metrics.stage("program3.eye_detection"):
+            eyes = eye_detector.detectMultiScale(upper_half)
+
+        # Draw circles on first two detected eyes
+        for (ex, ey, ew, eh) in eyes[:2]:
+            eye_cx = x + ex + ew // 2
+            eye_cy = y + ey + eh // 2
+            cv2.circle(image, (int(eye_cx), int(eye_cy)), 5, (255, 0, 0), -1)  # Blue circle
+
+        # Approximate nose tip position
+        nose_cx = x + w // 2
+        nose_cy = y + int(h * 0.6)
+        cv2.circle(image, (int(nose_cx), int(nose_cy)), 5, (0, 0, 255), -1)  # Red circle
+
+    return image
+
+def list_images(input_dir):
+    return [f for f in os.listdir(input_dir) if f.lower().endswith(IMAGE_EXTENSIONS)]
+
+def output_path(output_dir, input_filename):
+    name, ext = os.path.splitext(input_filename)
+    return os.path.join(output_dir, f"{name}_output{ext}")
+
+# Resize an OpenCV image for display (PIL, so it can be made off the Tk thread)
+def make_thumbnail(cv_img, max_size=300):
+    img_rgb = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
+    pil_img = Image.fromarray(img_rgb)
+    pil_img.thumbnail((max_size, max_size))
+    return pil_img
+
+# ========== Cache ==========
+
+class CachedImage:
+    # Everything show_image needs for one file: the decoded image, the
+    # annotated output, and both display thumbnails. The Tk PhotoImages are
+    # added on the main thread the first time the image is shown.
+    def __init__(self, image, processed, input_thumb, output_thumb):
+        self.image = image
+        self.processed = processed
+        self.input_thumb = input_thumb
+        self.output_thumb = output_thumb
+        self.photos = None
+
+def load_cached_image(img_path, max_size=300):
+    # Returns None if the image can't be read
+    image = cv2.imread(img_path)
+    if image is None:
+        return None
+    processed = detect_features(image.copy())
+    return CachedImage(image, processed, make_thumbnail(image, max_size), make_thumbnail(processed, max_size))
+
+class LRUCache:
+    # Thread-safe; holds at most `capacity` items, dropping the least recently used
+    def __init__(self, capacity=16):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.items:
+                return None
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.capacity:
+                self.items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
 
 # Define the GUI application class
 class FaceDetectionApp:
-    def __init__(self, root, input_dir="data/input/"):
+    def __init__(self, root, input_dir="data/input/", cache_size=16, prefetch=1):
         self.root = root
         self.root.title("Face Feature Points")
 
         self.input_dir = input_dir
         # Get list of image files in input directory
-        self.image_files = [f for f in os.listdir(input_dir) if f.lower().endswith((".jpg", ".jpeg", ".png", ".bmp"))]
+        self.image_files = list_images(input_dir)
         self.current_index = 0
 
+        # Images already decoded and detected, and the neighbours being
+        # prepared in the background (`prefetch` on each side)
+        self.cache = LRUCache(cache_size)
+        self.prefetch = prefetch
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.pending = {}
+        root.protocol("WM_DELETE_WINDOW", self.close)
+
         # Show error and exit if no images found
         if not self.image_files:
             messagebox.showerror("Error", f"No images found in {input_dir}")
-            root.destroy()
+            self.close()
             return
 
         # UI Buttons: Previous, Next, Save Output
@@ -52,26 +193,46 @@ class FaceDetectionApp:
     # Load and display current image
     def show_image(self):
         img_path = os.path.join(self.input_dir, self.image_files[self.current_index])
-        image = cv2.imread(img_path)
+        cached = self.get_cached(self.current_index)
 
         # Show error if image can't be read
-        if image is None:
+        if cached is None:
             messagebox.showerror("Error", f"Could not open {img_path}")
             return
 
-        # Display original image
-        self.display_image(image, self.input_canvas, max_size=300)
-
-        # Detect and annotate features (eyes and nose)
-        processed = self.detect_features(image.copy())
-        self.processed_image = processed
-
-        # Display processed (output) image
-        self.display_image(processed, self.output_canvas, max_size=300)
+        # Display original and processed (output) images
+        if cached.photos is None:
+            cached.photos = (ImageTk.PhotoImage(cached.input_thumb), ImageTk.PhotoImage(cached.output_thumb))
+        self.show_photo(cached.photos[0], self.input_canvas)
+        self.show_photo(cached.photos[1], self.output_canvas)
+        self.processed_image = cached.processed
 
         # Enable save button
         self.save_btn.config(state=tk.NORMAL)
         self.root.title(f"Face Detection – {self.image_files[self.current_index]}")
+        self.prefetch_neighbours()
+
+    # Cached result for an image, waiting for or doing the work if needed
+    def get_cached(self, index):
+        cached = self.cache.get(index)
+        if cached is None:
+            future = self.pending.pop(index, None)
+            cached = future.result() if future is not None else self.load(index)
+        return cached
+
+    def load(self, index):
+        cached = load_cached_image(os.path.join(self.input_dir, self.image_files[index]))
+        if cached is not None:
+            self.cache.put(index, cached)
+        return cached
+
+    # Prepare the images either side of the current one in the background
+    def prefetch_neighbours(self):
+        self.pending = {i: f for i, f in self.pending.items() if not f.done()}
+        for offset in range(1, self.prefetch + 1):
+            for index in (self.current_index + offset, self.current_index - offset):
+                if 0 <= index < len(self.image_files) and index not in self.cache and index not in self.pending:
+                    self.pending[index] = self.pool.submit(self.load, index)
 
     # Navigate to next image
     def show_next(self):
@@ -87,38 +248,21 @@ class FaceDetectionApp:
 
     # Detect face, eyes, and nose tip in the image
     def detect_features(self, image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-        for (x, y, w, h) in faces:
-            roi_gray = gray[y:y+h, x:x+w]
-
-            # Detect eyes only in the upper half of the face region
-            upper_half = roi_gray[0:h//2, :]
-            eyes = eye_cascade.detectMultiScale(upper_half)
-
-            # Draw circles on first two detected eyes
-            for (ex, ey, ew, eh) in eyes[:2]:
-                eye_cx = x + ex + ew // 2
-                eye_cy = y + ey + eh // 2
-                cv2.circle(image, (eye_cx, eye_cy), 5, (255, 0, 0), -1)  # Blue circle
-
-            # Approximate nose tip position
-            nose_cx = x + w // 2
-            nose_cy = y + int(h * 0.6)
-            cv2.circle(image, (nose_cx, nose_cy), 5, (0, 0, 255), -1)  # Red circle
-
-        return image
+        return detect_features(image)
 
     # Display a given OpenCV image on a tkinter canvas
     def display_image(self, cv_img, canvas, max_size=300):
-        img_rgb = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        pil_img = Image.fromarray(img_rgb)
-        pil_img.thumbnail((max_size, max_size))  # Resize for display
-        tk_img = ImageTk.PhotoImage(pil_img)
+        self.show_photo(ImageTk.PhotoImage(make_thumbnail(cv_img, max_size)), canvas)
+
+    def show_photo(self, tk_img, canvas):
         canvas.config(image=tk_img)
         canvas.image = tk_img  # Keep reference to avoid garbage collection
 
+    # Drop queued prefetches and close the window without waiting for the one running
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     # Save the processed (output) image
     def save_output(self):
         if self.processed_image is None:
@@ -130,17 +274,48 @@ class FaceDetectionApp:
         os.makedirs(output_dir, exist_ok=True)
 
         # Generate output filename
-        input_filename = self.image_files[self.current_index]
-        name, ext = os.path.splitext(input_filename)
-        output_filename = f"{name}_output{ext}"
-        save_path = os.path.join(output_dir, output_filename)
+        save_path = output_path(output_dir, self.image_files[self.current_index])
 
         # Save the image
         cv2.imwrite(save_path, self.processed_image)
         messagebox.showinfo("Saved", f"✅ Output saved at:\n{save_path}")
 
+# ========== Headless Mode ==========
+
+def annotate_file(input_dir, filename, output_dir):
+    with metrics.stage("program3.decode"):
+        image = cv2.imread(os.path.join(input_dir, filename))
+    if image is None:
+        return None
+    save_path = output_path(output_dir, filename)
+    annotated = detect_features(image)
+    with metrics.stage("program3.write"):
+        cv2.imwrite(save_path, annotated)
+    metrics.count("program3.images")
+    return save_path
+
+def annotate_folder(input_dir, output_dir, workers=4):
+    # Runs detect_features on every image in input_dir and saves the
+    # annotated copies to output_dir, without Tk. Returns (filename,
+    # save path or None if the image couldn't be read) pairs.
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = list_images(input_dir)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        saved = list(pool.map(lambda f: annotate_file(input_dir, f, output_dir), filenames))
+    return list(zip(filenames, saved))
+
 # Run the application
+#   python program3/face_detection_app.py                      (GUI)
+#   python program3/face_detection_app.py --headless [input_dir] [output_dir]
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = FaceDetectionApp(root, input_dir="program3/images")  # Change the path as needed
-    root.mainloop()
+    if "--headless" in sys.argv:
+        args = [a for a in sys.argv[1:] if a != "--headless"]
+        input_dir = args[0] if args else "program3/images"
+        output_dir = args[1] if len(args) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+        for filename, save_path in annotate_folder(input_dir, output_dir):
+            print(f"{filename}: {save_path or 'could not open'}")
+        metrics.report()
+    else:
+        root = tk.Tk()
+        app = FaceDetectionApp(root, input_dir="program3/images")  # Change the path as needed
+        root.mainloop()
@@ -0,0 +1,59 @@
+import math
+
+import cv2
+
+# Ways of hiding a face. Each method takes the face's region of the frame
+# (a NumPy view) and overwrites it in place, so nothing is copied back.
+# Methods are picked by name with anonymize(); keyword options go to the
+# method.
+
+def gaussian_blur(roi, ksize=99, sigma=30):
+    # The original program4 blur; cost grows with the kernel size
+    cv2.GaussianBlur(roi, (ksize, ksize), sigma, dst=roi)
+
+def box_blur(roi, sigma=30, passes=3):
+    # Repeated box filters approach a Gaussian of the same sigma, and each
+    # pass costs the same whatever its size
+    k = max(3, round(math.sqrt(12 * sigma * sigma / passes + 1)))
+    for _ in range(passes):
+        cv2.blur(roi, (k, k), dst=roi)
+
+def downscaled_blur(roi, factor=4, ksize=99, sigma=30):
+    # Gaussian blur at 1/factor size, scaled back up. Blurring hides the
+    # detail lost by downscaling, so it looks like the full-size blur.
+    h, w = roi.shape[:2]
+    small = cv2.resize(roi, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+    k = max(3, (ksize // factor) | 1)
+    cv2.GaussianBlur(small, (k, k), sigma / factor, dst=small)
+    cv2.resize(small, (w, h), dst=roi, interpolation=cv2.INTER_LINEAR)
+
+def pixelate(roi, blocks=12):
+    # `blocks` squares across the face
+    h, w = roi.shape[:2]
+    size = max(1, w // blocks)
+    small = cv2.resize(roi, (max(1, w // size), max(1, h // size)), interpolation=cv2.INTER_AREA)
+    cv2.resize(small, (w, h), dst=roi, interpolation=cv2.INTER_NEAREST)
+
+def solid_mask(roi, color=(0, 0, 0)):
+    # Filled rectangle rather than roi[:] = color, which is far slower on large faces
+    h, w = roi.shape[:2]
+    cv2.rectangle(roi, (0, 0), (w - 1, h - 1), color, -1)
+
+ANONYMIZERS = {
+    "gaussian": gaussian_blur,
+    "box": box_blur,
+    "downscaled": downscaled_blur,
+    "pixelate": pixelate,
+    "mask": solid_mask,
+}
+
+def anonymize(frame, faces, method="gaussian", **options):
+    # Hide each x, y, w, h face in the frame, in place
+    if method not in ANONYMIZERS:
+        raise ValueError(f"Unknown anonymization method '{method}', expected one of {list(ANONYMIZERS)}")
+    fn = ANONYMIZERS[method]
+    for (x, y, w, h) in faces:
+        roi = frame[y:y+h, x:x+w]
+        if roi.size:
+            fn(roi, **options)
+    return frame
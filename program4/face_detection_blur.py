@@ -1,64 +1,413 @@
 import cv2
 import datetime
+import os
+import sys
+import time
+import threading
+from collections import deque
 
-# Load OpenCV's pre-trained face detector (Haar Cascade)
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-
-# Open video capture (0 = default webcam; replace with video source if needed)
-cap = cv2.VideoCapture(0)
-
-# Define video writer (set when saving is triggered)
-fourcc = cv2.VideoWriter_fourcc(*'XVID')
-out = None
-saving = False
-
-print("Press 's' to start/stop saving video.")
-print("Press 'q' to quit.")
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    # Convert to grayscale for face detection
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # Detect faces
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-    # Blur each face
-    for (x, y, w, h) in faces:
-        face = frame[y:y+h, x:x+w]
-        blurred_face = cv2.GaussianBlur(face, (99, 99), 30)
-        frame[y:y+h, x:x+w] = blurred_face
-
-    # Display the frame
-    cv2.imshow('Face Blurring Feed', frame)
-
-    # Save frame if saving is active
-    if saving and out is not None:
-        out.write(frame)
-
-    # Handle keypresses
-    key = cv2.waitKey(1) & 0xFF
-
-    if key == ord('s'):
-        saving = not saving
-        if saving:
-            # Create new video file with timestamp
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-            out = cv2.VideoWriter(f'output_{timestamp}.avi', fourcc, 20.0, (frame.shape[1], frame.shape[0]))
-            print(f"[INFO] Saving started: output_{timestamp}.avi")
-        else:
-            out.release()
-            out = None
-            print("[INFO] Saving stopped.")
-
-    elif key == ord('q'):
-        break
-
-# Cleanup
-cap.release()
-if out:
-    out.release()
-cv2.destroyAllWindows()
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.face_detection import FaceDetector
+from program4.face_tracking import TrackingDetector
+from program4.anonymize import anonymize
+from common.metrics import metrics
+
+# Face detector settings (see common/face_detection.py). Faces are found on
+# a copy at most 640 px on its longer side; webcam faces are assumed to be
+# at least 40 px across. backend="dnn" switches to OpenCV's DNN detector.
+FACE_DETECTOR = {
+    "max_side": 640,
+    "min_size": (40, 40),
+    "max_size": None,
+    "backend": "haar",
+}
+
+# Run the face detector on every DETECT_EVERY-th frame and follow faces with
+# optical flow in between (see program4/face_tracking.py). 1 = detect on
+# every frame. Tracked boxes are padded by TRACKING["pad"] on each side.
+DETECT_EVERY = 1
+TRACKING = {
+    "motion_threshold": 0.02,
+    "pad": 0.2,
+}
+
+# Frames waiting between stages. Small, so a slow stage holds back (or, for
+# live sources, drops) frames instead of building up latency.
+QUEUE_SIZE = 4
+
+# Video writer settings; cameras don't always report fps
+FOURCC = 'XVID'
+DEFAULT_FPS = 20.0
+
+# How faces are hidden (see program4/anonymize.py): "gaussian" (the
+# original 99x99 blur), "box", "downscaled", "pixelate" or "mask", plus
+# that method's options
+ANONYMIZE = {
+    "method": "gaussian",
+}
+
+# ========== Blur ==========
+
+def blur_faces(frame, faces, anonymizer=None):
+    # Hide each face in place with the ANONYMIZE method (or `anonymizer` options)
+    return anonymize(frame, faces, **(anonymizer or ANONYMIZE))
+
+# ========== Pipeline Plumbing ==========
+
+class RingBuffer:
+    # Bounded, thread-safe FIFO between two stages. When full, put() either
+    # waits for room or, with drop_oldest, discards the oldest item and
+    # counts it in `dropped`. close() lets the consumer drain what is left;
+    # get() then returns None.
+    def __init__(self, capacity, drop_oldest=False):
+        self.items = deque()
+        self.capacity = capacity
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, item):
+        with self.cond:
+            while len(self.items) >= self.capacity and not self.closed:
+                if self.drop_oldest:
+                    self.items.popleft()
+                    self.dropped += 1
+                    break
+                self.cond.wait()
+            if self.closed:
+                return False
+            self.items.append(item)
+            self.cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items or self.closed, timeout):
+                return None
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self.cond.notify_all()
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class StageTimes:
+    # Per-frame seconds spent in each stage
+    def __init__(self):
+        self.times = {}
+
+    def add(self, stage, seconds):
+        self.times.setdefault(stage, []).append(seconds)
+        metrics.observe(f"program4.{stage}", seconds)
+
+    def summary(self):
+        return {stage: {
+            "frames": len(t),
+            "mean_ms": float(np.mean(t)) * 1000,
+            "p95_ms": float(np.percentile(t, 95)) * 1000,
+            "max_ms": float(np.max(t)) * 1000,
+        } for stage, t in self.times.items() if t}
+
+class Frame:
+    # One frame moving through the pipeline
+    __slots__ = ("index", "image", "captured", "faces")
+
+    def __init__(self, index, image, captured):
+        self.index = index
+        self.image = image
+        self.captured = captured
+        self.faces = None
+
+# ========== Pipeline ==========
+
+class BlurPipeline:
+    # Capture, detect/blur and encode run in their own threads, joined by
+    # RingBuffers, so a capture stall, a slow blur and video encoding
+    # overlap instead of adding up.
+    #
+    # source: video file path, camera index or stream URL.
+    # output_path: write blurred frames here (None = don't write).
+    # realtime: read a file no faster than its frame rate, like a camera
+    #     would deliver it (for testing live behaviour offline).
+    # drop_frames: when detection falls behind, drop the oldest captured
+    #     frames instead of pausing capture. Defaults to True for cameras,
+    #     streams and realtime files, and False otherwise so a file is
+    #     processed in full.
+    # on_frame: called from the blur thread with each finished Frame,
+    #     e.g. to show a preview.
+    # detect_every: run the detector every N frames and track faces in
+    #     between (also on motion outside the tracked faces).
+    # anonymizer: options for anonymize(), e.g. {"method": "pixelate"};
+    #     defaults to ANONYMIZE.
+    def __init__(self, source, output_path=None, detector=None, queue_size=QUEUE_SIZE,
+                 drop_frames=None, max_frames=None, on_frame=None, realtime=False,
+                 detect_every=DETECT_EVERY, anonymizer=None):
+        self.source = source
+        self.output_path = output_path
+        self.detector = detector or FaceDetector(**FACE_DETECTOR)
+        if detect_every > 1:
+            self.detector = TrackingDetector(self.detector, every=detect_every, **TRACKING)
+        self.max_frames = max_frames
+        self.on_frame = on_frame
+        self.anonymizer = anonymizer or ANONYMIZE
+        self.realtime = realtime
+        if drop_frames is None:
+            drop_frames = realtime or not (isinstance(source, str) and os.path.isfile(source))
+
+        self.captured = RingBuffer(queue_size, drop_oldest=drop_frames)
+        self.blurred = RingBuffer(queue_size)
+        self.times = StageTimes()
+        self.stop_event = threading.Event()
+        self.fps = None
+        self.frames_read = 0
+        self.frames_written = 0
+        self.writing = output_path is not None
+        self.writer = None
+        self.writer_lock = threading.Lock()
+        self.threads = []
+        self.started = None
+        self.error = None
+
+    # --- Stages ---
+
+    def capture_loop(self, cap):
+        try:
+            while not self.stop_event.is_set():
+                if self.max_frames is not None and self.frames_read >= self.max_frames:
+                    break
+                if self.realtime:
+                    delay = self.started + self.frames_read / self.fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                start = time.perf_counter()
+                ret, image = cap.read()
+                if not ret:
+                    break
+                now = time.perf_counter()
+                self.times.add("capture", now - start)
+                self.captured.put(Frame(self.frames_read, image, now))
+                self.frames_read += 1
+        except Exception as e:
+            self.fail(e)
+        finally:
+            cap.release()
+            self.captured.close()
+
+    def process(self, frame):
+        # Detect and blur one frame; separated out so it can be run (and
+        # timed) without the threads
+        start = time.perf_counter()
+        frame.faces = self.detector.detect(frame.image)
+        detected = time.perf_counter()
+        blur_faces(frame.image, frame.faces, self.anonymizer)
+        self.times.add("detect", detected - start)
+        self.times.add("blur", time.perf_counter() - detected)
+        return frame
+
+    def process_loop(self):
+        try:
+            while True:
+                frame = self.captured.get()
+                if frame is None:
+                    break
+                self.process(frame)
+                if self.on_frame is not None:
+                    self.on_frame(frame)
+                self.blurred.put(frame)
+        except Exception as e:
+            self.fail(e)
+        finally:
+            self.blurred.close()
+
+    def write_loop(self):
+        try:
+            while True:
+                frame = self.blurred.get()
+                if frame is None:
+                    break
+                start = time.perf_counter()
+                with self.writer_lock:
+                    if self.writing:
+                        self.write(frame.image)
+                self.times.add("write", time.perf_counter() - start)
+                self.times.add("end_to_end", time.perf_counter() - frame.captured)
+        except Exception as e:
+            self.fail(e)
+        finally:
+            with self.writer_lock:
+                self.close_writer()
+
+    # --- Writer ---
+
+    def write(self, image):
+        if self.writer is None:
+            h, w = image.shape[:2]
+            self.writer = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*FOURCC), self.fps, (w, h))
+        self.writer.write(image)
+        self.frames_written += 1
+
+    def close_writer(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def start_writing(self, output_path):
+        # Switch output to a new file (the live 's' key)
+        with self.writer_lock:
+            self.close_writer()
+            self.output_path = output_path
+            self.writing = True
+
+    def stop_writing(self):
+        with self.writer_lock:
+            self.close_writer()
+            self.writing = False
+
+    # --- Running ---
+
+    def start(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Could not open video source {self.source}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        self.started = time.perf_counter()
+        self.threads = [
+            threading.Thread(target=self.capture_loop, args=(cap,), name="capture", daemon=True),
+            threading.Thread(target=self.process_loop, name="blur", daemon=True),
+            threading.Thread(target=self.write_loop, name="write", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def fail(self, error):
+        # A stage raised: keep the first error for join() and shut every
+        # stage down, so none is left waiting on a buffer nobody serves
+        if self.error is None:
+            self.error = error
+        self.stop_event.set()
+        self.captured.close()
+        self.blurred.close()
+
+    def running(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def join(self):
+        # Re-raises the first error any stage hit
+        for thread in self.threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+        report = self.report()
+        metrics.count("program4.frames_read", report["frames_read"])
+        metrics.count("program4.frames_dropped", report["dropped"])
+        metrics.count("program4.detector_runs", report["detections"])
+        return report
+
+    def run(self):
+        return self.start().join()
+
+    def report(self):
+        seconds = time.perf_counter() - self.started
+        processed = self.frames_read - self.captured.dropped
+        return {
+            "frames_read": self.frames_read,
+            "frames_processed": processed,
+            "frames_written": self.frames_written,
+            "dropped": self.captured.dropped,
+            "seconds": seconds,
+            "fps": processed / seconds if seconds else 0.0,
+            "detections": getattr(self.detector, "detections", processed),
+            "stages": self.times.summary(),
+        }
+
+def print_report(report):
+    print(f"\nFrames read: {report['frames_read']}, processed: {report['frames_processed']}, "
+          f"written: {report['frames_written']}, dropped: {report['dropped']}")
+    print(f"{report['fps']:.1f} fps over {report['seconds']:.1f} s, face detector ran on {report['detections']} frames")
+    print(f"{'stage':>10} | {'mean ms':>8} | {'p95 ms':>8} | {'max ms':>8}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:>10} | {s['mean_ms']:>8.2f} | {s['p95_ms']:>8.2f} | {s['max_ms']:>8.2f}")
+
+# ========== Live Preview ==========
+
+def run_live(source=0, detect_every=DETECT_EVERY, anonymizer=None):
+    # The original interactive mode: show the blurred feed, 's' starts or
+    # stops saving to a timestamped file, 'q' quits. The window is driven
+    # from this (main) thread; the blur thread hands it the newest frame.
+    latest = RingBuffer(1, drop_oldest=True)
+    pipeline = BlurPipeline(source, on_frame=latest.put, detect_every=detect_every, anonymizer=anonymizer).start()
+
+    print("Press 's' to start/stop saving video.")
+    print("Press 'q' to quit.")
+
+    saving = False
+    while pipeline.running():
+        frame = latest.get(timeout=0.1)
+        if frame is not None:
+            # Display the frame
+            cv2.imshow('Face Blurring Feed', frame.image)
+
+        # Handle keypresses
+        key = cv2.waitKey(1) & 0xFF
+
+        if key == ord('s'):
+            saving = not saving
+            if saving:
+                # Create new video file with timestamp
+                timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+                pipeline.start_writing(f'output_{timestamp}.avi')
+                print(f"[INFO] Saving started: output_{timestamp}.avi")
+            else:
+                pipeline.stop_writing()
+                print("[INFO] Saving stopped.")
+
+        elif key == ord('q'):
+            pipeline.stop()
+            break
+
+    # Cleanup
+    report = pipeline.join()
+    cv2.destroyAllWindows()
+    return report
+
+# Usage:
+#   python program4/face_detection_blur.py [source]                      (live preview, 0 = webcam)
+#   python program4/face_detection_blur.py video.mp4 --headless [--output blurred.avi] [--realtime]
+#   Either mode also takes [--every N] [--method gaussian|box|downscaled|pixelate|mask]
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    valued = ("--output", "--every", "--method")
+
+    def option(name, default=None):
+        return args[args.index(name) + 1] if name in args else default
+
+    headless = "--headless" in args
+    realtime = "--realtime" in args
+    output_path = option("--output")
+    every = int(option("--every", DETECT_EVERY))
+    anonymizer = {"method": option("--method")} if "--method" in args else None
+    positional = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] not in valued)]
+    source = positional[0] if positional else "0"
+    if source.isdigit():
+        source = int(source)  # camera index
+
+    if headless:
+        report = BlurPipeline(source, output_path=output_path, realtime=realtime,
+                              detect_every=every, anonymizer=anonymizer).run()
+    else:
+        report = run_live(source, detect_every=every, anonymizer=anonymizer)
+    print_report(report)
+    metrics.report()
@@ -0,0 +1,135 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.face_detection import downscale
+
+# Run the face detector only every few frames and follow the faces with
+# optical flow in between. TrackingDetector has the same detect() as
+# FaceDetector, so BlurPipeline can use either.
+
+# Lucas-Kanade settings for following face points between frames
+LK_PARAMS = {
+    "winSize": (15, 15),
+    "maxLevel": 2,
+    "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+}
+MIN_POINTS = 3          # fewer tracked points than this and a face is considered lost
+POINTS_PER_FACE = 30
+MOTION_PIXEL = 25       # gray-level change that counts as motion
+
+def pad_boxes(boxes, pad, shape):
+    # Grow x, y, w, h boxes by `pad` of their size on each side, clipped to
+    # the image, so small tracking errors don't uncover the face
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    h, w = shape[:2]
+    x1 = np.clip(boxes[:, 0] - boxes[:, 2] * pad, 0, w)
+    y1 = np.clip(boxes[:, 1] - boxes[:, 3] * pad, 0, h)
+    x2 = np.clip(boxes[:, 0] + boxes[:, 2] * (1 + pad), 0, w)
+    y2 = np.clip(boxes[:, 1] + boxes[:, 3] * (1 + pad), 0, h)
+    x1, y1, x2, y2 = np.floor(x1), np.floor(y1), np.ceil(x2), np.ceil(y2)
+    return np.stack([x1, y1, x2 - x1, y2 - y1], axis=1).astype(np.int32)
+
+def box_mask(shape, boxes, scale):
+    # Mask of full-resolution boxes on an image at `scale`
+    mask = np.zeros(shape[:2], dtype=np.uint8)
+    for x, y, w, h in boxes:
+        x1, y1 = int(x * scale), int(y * scale)
+        x2, y2 = int(np.ceil((x + w) * scale)), int(np.ceil((y + h) * scale))
+        mask[y1:y2, x1:x2] = 255
+    return mask
+
+class TrackingDetector:
+    # Wraps a FaceDetector. The detector runs on every `every`-th frame, on
+    # frames where something changed outside the faces being tracked (a
+    # face may have come into view), and after a face is lost. In between,
+    # the boxes are moved and resized with optical flow on a small gray
+    # copy of the frame. Returned boxes are padded by `pad` on each side.
+    #
+    # One instance follows one video; frames must be passed in order.
+    def __init__(self, detector, every=5, motion_threshold=0.02, pad=0.2, work_side=320):
+        self.detector = detector
+        self.every = every
+        self.motion_threshold = motion_threshold
+        self.pad = pad
+        self.work_side = work_side
+
+        self.frames = 0
+        self.detections = 0
+        self.boxes = np.zeros((0, 4))    # full resolution, unpadded
+        self.points = None               # (N, 1, 2) float32, at work scale
+        self.owners = None               # box index of each point
+        self.prev_gray = None
+        self.force = True
+
+    def detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small, scale = downscale(gray, self.work_side)
+
+        if self.force or self.frames % self.every == 0 or self.moved_outside_faces(small, scale, image.shape):
+            self.boxes = self.detector.detect(image).astype(np.float64)
+            self.seed_points(small, scale)
+            self.detections += 1
+            self.force = False
+        else:
+            self.track(small, scale)
+
+        self.prev_gray = small
+        self.frames += 1
+        return pad_boxes(self.boxes, self.pad, image.shape)
+
+    def moved_outside_faces(self, small, scale, shape):
+        # Whether enough pixels changed since the last frame, not counting
+        # the (padded) faces already being tracked
+        changed = cv2.absdiff(small, self.prev_gray) > MOTION_PIXEL
+        if len(self.boxes):
+            changed &= box_mask(small.shape, pad_boxes(self.boxes, self.pad, shape), scale) == 0
+        return changed.mean() > self.motion_threshold
+
+    def seed_points(self, small, scale):
+        points, owners = [], []
+        for i, (x, y, w, h) in enumerate(self.boxes):
+            found = cv2.goodFeaturesToTrack(small, POINTS_PER_FACE, 0.01, 3,
+                                            mask=box_mask(small.shape, [(x, y, w, h)], scale))
+            if found is not None:
+                points.append(found)
+                owners.extend([i] * len(found))
+        if points:
+            self.points = np.concatenate(points).astype(np.float32)
+            self.owners = np.array(owners)
+        else:
+            self.points, self.owners = None, None
+
+    def track(self, small, scale):
+        if not len(self.boxes):
+            return
+        if self.points is None:
+            self.force = True
+            return
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, small, self.points, None, **LK_PARAMS)
+        ok = status.ravel() == 1
+        for i in range(len(self.boxes)):
+            mine = ok & (self.owners == i)
+            if mine.sum() < MIN_POINTS:
+                self.force = True  # keep the old box this frame, detect on the next
+                continue
+            p0 = self.points[mine, 0]
+            p1 = moved[mine, 0]
+            c0, c1 = np.median(p0, axis=0), np.median(p1, axis=0)
+            spread0 = np.median(np.linalg.norm(p0 - c0, axis=1))
+            spread1 = np.median(np.linalg.norm(p1 - c1, axis=1))
+            growth = np.clip(spread1 / spread0, 0.8, 1.25) if spread0 > 1e-3 else 1.0
+
+            x, y, w, h = self.boxes[i]
+            cx, cy = x + w / 2 + (c1[0] - c0[0]) / scale, y + h / 2 + (c1[1] - c0[1]) / scale
+            w, h = w * growth, h * growth
+            self.boxes[i] = (cx - w / 2, cy - h / 2, w, h)
+
+        self.points = moved[ok]
+        self.owners = self.owners[ok]
@@ -0,0 +1,119 @@
+import cv2
+import numpy as np
+
+# Every mode looks at no more than this many pixels per crop
+MAX_PIXELS = 4096
+
+# ========== Pixel Sampling ==========
+
+def sample_pixels(roi, max_pixels=MAX_PIXELS):
+    # Take every n-th row and column so the sample stays spread over the crop
+    h, w = roi.shape[:2]
+    step = 1
+    if h * w > max_pixels:
+        step = int(np.ceil(np.sqrt(h * w / max_pixels)))
+    return roi[::step, ::step].reshape(-1, 3)
+
+def bgr_to_rgb_tuple(bgr):
+    b, g, r = bgr
+    return (int(r), int(g), int(b))
+
+# ========== Dominant Color Modes ==========
+
+def mean_color(roi, max_pixels=MAX_PIXELS):
+    # K=1 k-means converges to the mean, so this is the old result without the iterations
+    pixels = sample_pixels(roi, max_pixels)
+    return bgr_to_rgb_tuple(pixels.mean(axis=0, dtype=np.float32))
+
+def histogram_color(roi, max_pixels=MAX_PIXELS, bits=3):
+    # Quantize every channel to `bits` bits, find the fullest bin and
+    # return the mean of the pixels that fell into it
+    pixels = sample_pixels(roi, max_pixels)
+    shift = 8 - bits
+    q = (pixels >> shift).astype(np.int32)
+    bins = (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+    counts = np.bincount(bins, minlength=1 << (3 * bits))
+    best = np.argmax(counts)
+    return bgr_to_rgb_tuple(pixels[bins == best].mean(axis=0, dtype=np.float32))
+
+def cluster_color(roi, max_pixels=MAX_PIXELS, k=3, margin=0.15, min_value=40):
+    # Road background sits near the crop border and glass/tyres/shadows are
+    # very dark, so cluster only the centre of the crop and drop dark pixels
+    h, w = roi.shape[:2]
+    my, mx = int(h * margin), int(w * margin)
+    center = roi[my:h - my, mx:w - mx]
+    if center.size == 0:
+        center = roi
+
+    pixels = sample_pixels(center, max_pixels)
+    bright = pixels[pixels.max(axis=1) >= min_value]
+    if len(bright) >= k:
+        pixels = bright
+    if len(pixels) < k:
+        return bgr_to_rgb_tuple(pixels.mean(axis=0, dtype=np.float32))
+
+    _, labels, centers = cv2.kmeans(pixels.astype(np.float32), k, None,
+        (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0),
+        1, cv2.KMEANS_PP_CENTERS)
+
+    # The biggest cluster is the body colour
+    largest = np.argmax(np.bincount(labels.ravel(), minlength=k))
+    return bgr_to_rgb_tuple(centers[largest])
+
+def kmeans_color(roi):
+    # Original implementation, kept as the reference for benchmarks
+    roi_rgb = cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)
+    data = roi_rgb.reshape((-1, 3)).astype(np.float32)
+    # cv2.kmeans reads a single row as three 1-D samples, so one pixel is its own answer
+    if len(data) == 1:
+        return tuple(map(int, data[0]))
+
+    _, labels, centers = cv2.kmeans(data, 1, None,
+        (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0),
+        10, cv2.KMEANS_RANDOM_CENTERS)
+
+    return tuple(map(int, centers[0]))
+
+COLOR_MODES = {
+    "mean": mean_color,
+    "histogram": histogram_color,
+    "cluster": cluster_color,
+    "kmeans": kmeans_color,
+}
+
+def dominant_color(roi, mode="mean"):
+    if mode not in COLOR_MODES:
+        raise ValueError(f"Unknown color mode '{mode}', expected one of {list(COLOR_MODES)}")
+    # Each mode would fail differently (NaN mean, cv2.error), so fail the same way up front
+    if roi.size == 0:
+        raise ValueError("Cannot find the dominant color of an empty crop")
+    return COLOR_MODES[mode](roi)
+
+# ========== Color Names ==========
+
+# Each named colour is one bit. A channel LUT sets the bit for every value
+# that satisfies that colour's rule for the channel, so ANDing the three
+# lookups leaves exactly the colours whose rules all pass.
+WHITE, RED, BLUE, GREEN = 1, 2, 4, 8
+
+_values = np.arange(256)
+_R_LUT = ((_values > 200) * WHITE | (_values > 150) * RED | (_values < 100) * BLUE | (_values < 100) * GREEN).astype(np.uint8)
+_G_LUT = ((_values > 200) * WHITE | (_values < 100) * RED | (_values < 100) * BLUE | (_values > 150) * GREEN).astype(np.uint8)
+_B_LUT = ((_values > 200) * WHITE | (_values < 100) * RED | (_values > 150) * BLUE | (_values < 100) * GREEN).astype(np.uint8)
+
+# Name of the lowest set bit, matching the order of the original if/elif chain
+_FLAG_NAMES = [None] * 16
+for _flags in range(1, 16):
+    _lowest = _flags & -_flags
+    _FLAG_NAMES[_flags] = {WHITE: "white", RED: "red", BLUE: "blue", GREEN: "green"}[_lowest]
+
+def rgb_to_name(rgb):
+    r, g, b = rgb
+    name = _FLAG_NAMES[_R_LUT[r] & _G_LUT[g] & _B_LUT[b]]
+    return name if name is not None else f"rgb{tuple(rgb)}"
+
+def rgb_to_names(rgbs):
+    # Vectorized version for an (N, 3) array of RGB values
+    rgbs = np.asarray(rgbs, dtype=np.uint8).reshape(-1, 3)
+    flags = _R_LUT[rgbs[:, 0]] & _G_LUT[rgbs[:, 1]] & _B_LUT[rgbs[:, 2]]
+    return [_FLAG_NAMES[f] or f"rgb{(int(r), int(g), int(b))}" for f, (r, g, b) in zip(flags, rgbs)]
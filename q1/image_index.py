@@ -0,0 +1,135 @@
+import os
+import sys
+import datetime
+from collections import namedtuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from q5.string_similarity import compare_strings
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Camera stills are named
+#   <date>.<time>.<ms>.<camera>.<lane>.<direction>.<plate>.<extra>.jpg
+# e.g. 20250917.071629.915.J001A1.SL.FR.JUM5353.NaN.jpg
+# where lane is FL/SL, direction is FR (front) or RE (rear) and "NaN" marks
+# a missing plate.
+ImageRecord = namedtuple("ImageRecord", [
+    "relpath", "path", "folder", "timestamp", "camera", "lane", "direction", "plate",
+])
+
+# ========== Walking ==========
+
+def walk_images(root, recursive=True):
+    # Yields every image path below root, in sorted order, using scandir
+    # so file types come from the directory listing instead of extra stat calls
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if recursive:
+                yield from walk_images(entry.path)
+        elif entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+            yield entry.path
+
+# ========== Filename Parsing ==========
+
+def parse_filename(name):
+    # Returns a dict of the fields in a camera still name, or None if the
+    # name doesn't follow the pattern
+    stem = os.path.splitext(os.path.basename(name))[0]
+    parts = stem.split(".")
+    if len(parts) != 8:
+        return None
+
+    date, time, ms, camera, lane, direction, plate, _ = parts
+    try:
+        timestamp = datetime.datetime.strptime(f"{date}{time}{ms}", "%Y%m%d%H%M%S%f")
+    except ValueError:
+        return None
+
+    return {
+        "timestamp": timestamp,
+        "camera": camera,
+        "lane": lane,
+        "direction": direction,
+        "plate": None if plate == "NaN" else plate,
+    }
+
+def build_index(root, recursive=True):
+    # One ImageRecord per image below root. Images with other names are
+    # kept, with their metadata fields set to None.
+    records = []
+    for path in walk_images(root, recursive):
+        relpath = os.path.relpath(path, root)
+        fields = parse_filename(path) or dict.fromkeys(["timestamp", "camera", "lane", "direction", "plate"])
+        records.append(ImageRecord(relpath=relpath, path=path, folder=os.path.dirname(relpath), **fields))
+    return records
+
+# ========== Filtering ==========
+
+def as_set(value):
+    if value is None:
+        return None
+    return {value} if isinstance(value, str) else set(value)
+
+def filter_index(records, start=None, end=None, cameras=None, lanes=None, directions=None, folders=None, has_plate=None):
+    # Every argument is optional. start/end are datetimes (end exclusive);
+    # cameras/lanes/directions/folders take a single value or a collection.
+    cameras, lanes, directions, folders = as_set(cameras), as_set(lanes), as_set(directions), as_set(folders)
+    selected = []
+    for r in records:
+        if start is not None and (r.timestamp is None or r.timestamp < start):
+            continue
+        if end is not None and (r.timestamp is None or r.timestamp >= end):
+            continue
+        if cameras is not None and r.camera not in cameras:
+            continue
+        if lanes is not None and r.lane not in lanes:
+            continue
+        if directions is not None and r.direction not in directions:
+            continue
+        if folders is not None and r.folder not in folders:
+            continue
+        if has_plate is not None and (r.plate is not None) != has_plate:
+            continue
+        selected.append(r)
+    return selected
+
+# ========== Ground Truth ==========
+
+def ground_truth_plates(records):
+    # Plate text from the filenames, for images that have one
+    return {r.relpath: r.plate for r in records if r.plate is not None}
+
+def plate_accuracy(ground_truth, predictions, threshold=70):
+    # Compare predicted plate strings with the filename ground truth.
+    # Returns exact-match rate, rate above `threshold` % similarity and the
+    # mean similarity, all over images that have ground truth.
+    exact, close, total_similarity, count = 0, 0, 0.0, 0
+    for relpath, truth in ground_truth.items():
+        predicted = predictions.get(relpath) or ""
+        similarity = compare_strings(truth, predicted)[4] if predicted else 0.0
+        exact += predicted == truth
+        close += similarity >= threshold
+        total_similarity += similarity
+        count += 1
+
+    if count == 0:
+        return {"images": 0, "exact": 0.0, "close": 0.0, "mean_similarity": 0.0}
+    return {
+        "images": count,
+        "exact": exact / count * 100,
+        "close": close / count * 100,
+        "mean_similarity": total_similarity / count,
+    }
+
+# ========== Index Example ==========
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else "q1/traffic_images"
+    index = build_index(root)
+    print(f"{len(index)} images under {root}")
+    for r in index:
+        print(f"  {r.relpath}: {r.timestamp} camera={r.camera} lane={r.lane} direction={r.direction} plate={r.plate}")
@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import multiprocessing
+
+import cv2
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from q1.vehicle_attribute import VehicleSceneAnalyzer, list_images, format_result, save_result, preload_models, open_store
+from common.image_loader import ScaledImage
+from common.metrics import metrics
+
+# Marks the end of a queue; each downstream worker receives one
+DONE = object()
+
+def check_no_cache(cache_path):
+    # The result cache (analyze_folder's cache_path) is only wired into the serial run
+    if cache_path is not None:
+        raise ValueError("cache_path is only supported by analyze_folder")
+
+# ========== Helper Classes ==========
+
+class OrderedPrinter:
+    # Writers finish out of order, so hold results back until every earlier
+    # file has been printed. This keeps stdout (and the result store)
+    # identical to the serial run.
+    def __init__(self, print_results=True, store=None):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.next_index = 0
+        self.print_results = print_results
+        self.store = store
+
+    def emit(self, index, text, filename=None, result=None):
+        with self.lock:
+            self.pending[index] = (text, filename, result)
+            while self.next_index in self.pending:
+                text, filename, result = self.pending.pop(self.next_index)
+                # Move on first, so a failed print or write doesn't hold back later files
+                self.next_index += 1
+                if text is not None and (self.print_results or result is None):
+                    print(text)
+                if self.store is not None and result is not None:
+                    self.store.write(filename, result)
+
+def start_stage(process, in_queue, out_queue, workers, downstream_workers, init=None):
+    # Run `workers` threads that map `process` over in_queue. Once they have
+    # all stopped, send one DONE per downstream worker.
+    def worker():
+        state, init_error = None, None
+        if init is not None:
+            try:
+                state = init()
+            except Exception as e:
+                init_error = e
+
+        while True:
+            item = in_queue.get()
+            if item is DONE:
+                break
+            index, filename, img, result = item
+            if init_error is not None and not isinstance(result, Exception):
+                result = init_error
+            if not isinstance(result, Exception):
+                try:
+                    img, result = process(state, filename, img)
+                except Exception as e:
+                    result = e
+            if out_queue is not None:
+                out_queue.put((index, filename, img, result))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+
+    def close():
+        for t in threads:
+            t.join()
+        if out_queue is not None:
+            for _ in range(downstream_workers):
+                out_queue.put(DONE)
+
+    closer = threading.Thread(target=close, daemon=True)
+    closer.start()
+    return closer
+
+# ========== Pipelined Batch Processing ==========
+
+def analyze_folder_pipelined(folder_path, save_json=False, json_folder="results", save_annotated=True,
+                             annotated_folder="annotated_images", batched=False,
+                             decode_workers=4, infer_workers=1, write_workers=2, queue_size=8,
+                             print_results=True, result_store=None, resume=False, recursive=False, filters=None,
+                             decode_reduce=1, cache_path=None):
+    # decode_reduce works as in analyze_folder; cache_path isn't supported
+    check_no_cache(cache_path)
+    os.makedirs(json_folder, exist_ok=True)
+    if save_annotated:
+        os.makedirs(annotated_folder, exist_ok=True)
+
+    store, filenames = open_store(result_store, list_images(folder_path, recursive, filters), resume)
+    printer = OrderedPrinter(print_results, store)
+    errors = []
+
+    # Filenames are tiny, so only the image-carrying queues are bounded.
+    # A full queue blocks the stage in front of it (backpressure).
+    path_queue = queue.Queue()
+    decoded_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue(maxsize=queue_size)
+
+    for index, filename in enumerate(filenames):
+        path_queue.put((index, filename, None, None))
+    for _ in range(decode_workers):
+        path_queue.put(DONE)
+
+    def decode(state, filename, img):
+        with metrics.stage("q1.decode"):
+            scaled = ScaledImage(os.path.join(folder_path, filename), reduce=decode_reduce)
+        return (scaled if scaled.ok else None), None
+
+    def infer(analyzer, filename, scaled):
+        if scaled is None:
+            return None, None
+        with metrics.stage("q1.analyze"):
+            result = analyzer.analyze_decoded(scaled)
+        return scaled.image, result
+
+    def write(filename, img, result):
+        if isinstance(result, Exception):
+            errors.append(result)
+            return None
+        if img is None:
+            return f"Warning: Could not read {os.path.join(folder_path, filename)}"
+        with metrics.stage("q1.write"):
+            save_result(filename, img, result, save_json, json_folder, save_annotated, annotated_folder, decode_reduce)
+        metrics.count("q1.images")
+        metrics.count("q1.vehicles", result["vehicle_count"])
+        return format_result(filename, result)
+
+    def write_worker():
+        while True:
+            item = result_queue.get()
+            if item is DONE:
+                break
+            index, filename, img, result = item
+            # Errors are recorded rather than raised: a dead writer would stop
+            # draining result_queue and leave the other stages blocked on put
+            try:
+                text = write(filename, img, result)
+            except Exception as e:
+                errors.append(e)
+                text = None
+            if text is None or img is None:
+                result = None
+            try:
+                printer.emit(index, text, filename, result)
+            except Exception as e:
+                errors.append(e)
+
+    decode_closer = start_stage(decode, path_queue, decoded_queue, decode_workers, infer_workers)
+    # Each inference worker owns its own analyzer. YOLO predictors are not
+    # thread-safe, so with several workers each one also gets private models.
+    shared_models = infer_workers == 1
+    infer_closer = start_stage(infer, decoded_queue, result_queue, infer_workers, write_workers,
+                               init=lambda: VehicleSceneAnalyzer(batched=batched, shared_models=shared_models))
+
+    writers = [threading.Thread(target=write_worker, daemon=True) for _ in range(write_workers)]
+    for t in writers:
+        t.start()
+
+    decode_closer.join()
+    infer_closer.join()
+    for t in writers:
+        t.join()
+    if store is not None:
+        store.close()
+    metrics.report()
+
+    if errors:
+        raise errors[0]
+
+# ========== Multi-Process Sharded Processing ==========
+
+# Per-process state, set once by init_worker when the pool starts
+worker_analyzer = None
+worker_options = None
+
+def pin_threads(threads):
+    # Stop every worker from spawning one thread per core for its own ops
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def init_worker(threads, batched, options):
+    global worker_analyzer, worker_options
+    pin_threads(threads)
+    worker_analyzer = VehicleSceneAnalyzer(batched=batched)
+    worker_analyzer.warmup()  # load (or pick up preloaded) models before the first task
+    worker_options = options
+
+def analyze_file(task):
+    # Returns (filename, result, seconds spent analyzing, error); result is
+    # None if the image couldn't be read or analyzed, and error says why
+    # for the latter. Errors are returned rather than raised, since a raise
+    # would come out of pool.imap and end the whole run over one file.
+    folder_path, filename, decode_reduce = task
+    try:
+        scaled = ScaledImage(os.path.join(folder_path, filename), reduce=decode_reduce)
+        if not scaled.ok:
+            return filename, None, 0.0, None
+
+        start = time.perf_counter()
+        result = worker_analyzer.analyze_decoded(scaled)
+        elapsed = time.perf_counter() - start
+        save_result(filename, scaled.image, result, **worker_options)
+    except Exception as e:
+        return filename, None, 0.0, f"{type(e).__name__}: {e}"
+    return filename, result, elapsed, None
+
+def analyze_folder_sharded(folder_path, save_json=False, json_folder="results", save_annotated=True,
+                           annotated_folder="annotated_images", batched=False, processes=None,
+                           threads_per_worker=None, chunksize=4, merged_path=None, start_method=None,
+                           preload=True, print_results=True, result_store=None, resume=False,
+                           recursive=False, filters=None, decode_reduce=1, cache_path=None):
+    # decode_reduce works as in analyze_folder; cache_path isn't supported.
+    # Metrics: workers report their analysis time, which is recorded here.
+    check_no_cache(cache_path)
+    processes = processes or os.cpu_count() or 1
+    threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // processes)
+
+    os.makedirs(json_folder, exist_ok=True)
+    if save_annotated:
+        os.makedirs(annotated_folder, exist_ok=True)
+
+    options = {
+        "save_json": save_json,
+        "json_folder": json_folder,
+        "save_annotated": save_annotated,
+        "annotated_folder": annotated_folder,
+        "annotate_scale": decode_reduce,
+    }
+    store, filenames = open_store(result_store, list_images(folder_path, recursive, filters), resume)
+    tasks = [(folder_path, filename, decode_reduce) for filename in filenames]
+
+    merged = open(merged_path, "w") if merged_path else None
+    context = multiprocessing.get_context(start_method)
+
+    # With fork, models loaded here are inherited by every worker and shared
+    # copy-on-write instead of being read from disk once per process
+    if preload and context.get_start_method() == "fork":
+        preload_models()
+    try:
+        # Each worker loads the models once in init_worker; files are handed
+        # out in small chunks so slow images don't leave other workers idle
+        with context.Pool(processes, initializer=init_worker,
+                          initargs=(threads_per_worker, batched, options)) as pool:
+            for filename, result, elapsed, error in pool.imap(analyze_file, tasks, chunksize=chunksize):
+                if error is not None:
+                    print(f"Warning: Could not analyze {os.path.join(folder_path, filename)}: {error}")
+                    metrics.count("q1.errors")
+                    continue
+                if result is None:
+                    print(f"Warning: Could not read {os.path.join(folder_path, filename)}")
+                    continue
+                metrics.observe("q1.analyze", elapsed)
+                metrics.count("q1.images")
+                metrics.count("q1.vehicles", result["vehicle_count"])
+                if print_results:
+                    print(format_result(filename, result))
+                if store is not None:
+                    store.write(filename, result)
+                if merged is not None:
+                    merged.write(json.dumps({"image": filename, **result}) + "\n")
+    finally:
+        if merged is not None:
+            merged.close()
+        if store is not None:
+            store.close()
+        metrics.report()
+
+# ========== Run Batch Example ==========
+
+if __name__ == "__main__":
+    folder = "q1/traffic_images"  # Change to your folder path
+    analyze_folder_pipelined(folder, save_json=True, save_annotated=True, decode_workers=4, infer_workers=1, write_workers=2)
@@ -0,0 +1,144 @@
+import os
+import csv
+import glob
+
+# One row per detected vehicle. Images without vehicles get a single row
+# with vehicle_index -1 so resumed runs know they were already processed.
+COLUMNS = [
+    "image", "vehicle_index", "type",
+    "x1", "y1", "x2", "y2",
+    "color", "lane", "make",
+    "logo_x1", "logo_y1", "logo_x2", "logo_y2",
+    "license_plate_present",
+    "plate_x1", "plate_y1", "plate_x2", "plate_y2",
+    "license_plate_color",
+]
+
+def parquet_schema():
+    # Fixed column types, so a batch where a column is all None (no logos,
+    # say) still matches the other part files
+    import pyarrow as pa
+    types = {
+        "image": pa.string(), "vehicle_index": pa.int64(), "type": pa.string(),
+        "color": pa.string(), "lane": pa.string(), "make": pa.string(),
+        "license_plate_present": pa.bool_(), "license_plate_color": pa.string(),
+    }
+    # Vehicle boxes are whole pixels; logo and plate boxes can be scaled up
+    # from a reduced decode
+    types.update({name: pa.int64() for name in ["x1", "y1", "x2", "y2"]})
+    types.update({name: pa.float64() for name in COLUMNS if name.startswith(("logo_", "plate_"))})
+    return pa.schema([(name, types[name]) for name in COLUMNS])
+
+def split_bbox(bbox):
+    return list(bbox) if bbox else [None, None, None, None]
+
+def flatten_result(image, result):
+    rows = []
+    for i, v in enumerate(result["vehicles"]):
+        rows.append([image, i, v["type"], *split_bbox(v["bbox"]),
+                     v["color"], v["lane"], v["make"], *split_bbox(v["logo_bbox"]),
+                     v["license_plate_present"], *split_bbox(v["license_plate_bbox"]),
+                     v["license_plate_color"]])
+    if not rows:
+        rows.append([image, -1] + [None] * (len(COLUMNS) - 2))
+    return rows
+
+# ========== Writers ==========
+
+class CsvResultWriter:
+    # Buffers rows and appends them to a single CSV file every `batch_size` rows
+    def __init__(self, path, batch_size=512, append=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = []
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, "a" if exists else "w", newline="")
+        self.writer = csv.writer(self.file)
+        if not exists:
+            self.writer.writerow(COLUMNS)
+
+    def write(self, image, result):
+        self.rows.extend(flatten_result(image, result))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.writerows(self.rows)
+            self.rows = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ParquetResultWriter:
+    # Writes every batch as a new part file in a directory, so appending
+    # never rewrites existing data. Needs pyarrow.
+    def __init__(self, path, batch_size=4096, append=True):
+        import pyarrow  # noqa: F401 - fail early if pyarrow is missing
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = []
+        os.makedirs(path, exist_ok=True)
+        if not append:
+            for part in glob.glob(os.path.join(path, "part-*.parquet")):
+                os.remove(part)
+        self.part = len(glob.glob(os.path.join(path, "part-*.parquet")))
+        self.schema = parquet_schema()
+
+    def write(self, image, result):
+        self.rows.extend(flatten_result(image, result))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = list(zip(*self.rows))
+        table = pa.table({name: list(values) for name, values in zip(COLUMNS, columns)}, schema=self.schema)
+        pq.write_table(table, os.path.join(self.path, f"part-{self.part:05d}.parquet"))
+        self.part += 1
+        self.rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_result_writer(path, batch_size=None, append=True):
+    # ".csv" files get the CSV writer; anything else is a Parquet directory
+    writer_cls = CsvResultWriter if path.lower().endswith(".csv") else ParquetResultWriter
+    if batch_size is None:
+        return writer_cls(path, append=append)
+    return writer_cls(path, batch_size=batch_size, append=append)
+
+# ========== Readers ==========
+
+def processed_images(path):
+    # Names of every image already in the store, for resuming a run
+    if not os.path.exists(path):
+        return set()
+
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            return {row["image"] for row in csv.DictReader(f)}
+
+    import pyarrow.parquet as pq
+    images = set()
+    for part in sorted(glob.glob(os.path.join(path, "part-*.parquet"))):
+        images.update(pq.read_table(part, columns=["image"]).column("image").to_pylist())
+    return images
@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from q1.vehicle_attribute import VehicleSceneAnalyzer, annotate_image, bbox_center, get_lane
+
+# ========== Tracking ==========
+
+def iou_matrix(boxes_a, boxes_b):
+    # Pairwise IoU between two (N, 4) and (M, 4) arrays of x1, y1, x2, y2
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+class IoUTracker:
+    # Greedy IoU tracker: each detection joins the track it overlaps most,
+    # otherwise it starts a new track. Tracks unseen for `max_missed`
+    # processed frames are dropped.
+    def __init__(self, iou_threshold=0.3, max_missed=15):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = {}  # track_id -> {"type", "bbox", "missed"}
+        self.next_id = 1
+
+    def update(self, detections):
+        track_ids = list(self.tracks)
+        assigned = [None] * len(detections)
+
+        if track_ids and detections:
+            ious = iou_matrix([self.tracks[t]["bbox"] for t in track_ids], [bbox for _, bbox in detections])
+            # Match the highest overlaps first
+            for flat in np.argsort(-ious, axis=None):
+                ti, di = np.unravel_index(flat, ious.shape)
+                if ious[ti, di] < self.iou_threshold:
+                    break
+                if assigned[di] is None and track_ids[ti] not in assigned:
+                    assigned[di] = track_ids[ti]
+
+        matched = set()
+        results = []
+        for (cls_name, bbox), track_id in zip(detections, assigned):
+            is_new = track_id is None
+            if is_new:
+                track_id = self.next_id
+                self.next_id += 1
+            self.tracks[track_id] = {"type": cls_name, "bbox": bbox, "missed": 0}
+            matched.add(track_id)
+            results.append((track_id, cls_name, bbox, is_new))
+
+        for track_id in track_ids:
+            if track_id not in matched:
+                self.tracks[track_id]["missed"] += 1
+                if self.tracks[track_id]["missed"] > self.max_missed:
+                    del self.tracks[track_id]
+
+        return results
+
+    def active_ids(self):
+        return set(self.tracks)
+
+# ========== Streaming Analyzer ==========
+
+def shift_bbox(bbox, dx, dy):
+    if bbox is None:
+        return None
+    x1, y1, x2, y2 = bbox
+    return [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
+
+class VehicleStreamAnalyzer:
+    # Runs vehicle detection on every processed frame, but logo, plate and
+    # color analysis only once per track. Later frames reuse the cached
+    # attributes and move the logo/plate boxes along with the vehicle.
+    def __init__(self, analyzer=None, iou_threshold=0.3, max_missed=15):
+        self.analyzer = analyzer or VehicleSceneAnalyzer(batched=True)
+        self.tracker = IoUTracker(iou_threshold, max_missed)
+        self.cache = {}  # track_id -> vehicle dict from the frame it was first seen
+        self.totals = {"vehicles_seen": 0, "incoming_seen": 0, "outgoing_seen": 0}
+
+    def process(self, frame, frame_index=None):
+        w = frame.shape[1]
+        tracked = self.tracker.update(self.analyzer.detect_vehicles(frame))
+
+        # Analyze all vehicles that appeared in this frame in one call
+        new = [(cls_name, bbox) for _, cls_name, bbox, is_new in tracked if is_new]
+        if new:
+            fresh = self.analyzer.analyze_detections(frame, new)["vehicles"]
+            new_ids = [track_id for track_id, _, _, is_new in tracked if is_new]
+            for track_id, vehicle in zip(new_ids, fresh):
+                self.cache[track_id] = vehicle
+                self.totals["vehicles_seen"] += 1
+                if vehicle["lane"] == "Left":
+                    self.totals["incoming_seen"] += 1
+                else:
+                    self.totals["outgoing_seen"] += 1
+
+        vehicles = []
+        for track_id, cls_name, bbox, _ in tracked:
+            cached = self.cache[track_id]
+            dx, dy = bbox[0] - cached["bbox"][0], bbox[1] - cached["bbox"][1]
+            cx, _ = bbox_center(bbox)
+            vehicles.append({
+                **cached,
+                "track_id": track_id,
+                "bbox": list(bbox),
+                "lane": get_lane(cx, w),
+                "logo_bbox": shift_bbox(cached["logo_bbox"], dx, dy),
+                "license_plate_bbox": shift_bbox(cached["license_plate_bbox"], dx, dy),
+            })
+
+        # Forget attributes of tracks the tracker has dropped
+        for track_id in set(self.cache) - self.tracker.active_ids():
+            del self.cache[track_id]
+
+        return {
+            "frame": frame_index,
+            "incoming_traffic": any(v['lane'] == 'Left' for v in vehicles),
+            "outgoing_traffic": any(v['lane'] == 'Right' for v in vehicles),
+            "vehicle_count": len(vehicles),
+            "vehicles": vehicles,
+            "totals": dict(self.totals),
+        }
+
+def analyze_stream(source, analyzer=None, frame_skip=0, max_frames=None, annotated_path=None,
+                   iou_threshold=0.3, max_missed=15):
+    # Yields one summary per processed frame from a video file or capture
+    # source (camera index or RTSP URL). With frame_skip=N only every
+    # (N+1)-th frame is analyzed.
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video source {source}")
+
+    stream = VehicleStreamAnalyzer(analyzer, iou_threshold, max_missed)
+    out = None
+    frame_index = 0
+    try:
+        while max_frames is None or frame_index < max_frames:
+            if frame_index % (frame_skip + 1) != 0:
+                # grab() skips decoding frames we are not going to analyze
+                if not cap.grab():
+                    break
+                frame_index += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            summary = stream.process(frame, frame_index)
+
+            if annotated_path:
+                if out is None:
+                    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+                    out = cv2.VideoWriter(annotated_path, cv2.VideoWriter_fourcc(*'XVID'),
+                                          fps / (frame_skip + 1), (frame.shape[1], frame.shape[0]))
+                out.write(annotate_image(frame, summary["vehicles"]))
+
+            yield summary
+            frame_index += 1
+    finally:
+        cap.release()
+        if out is not None:
+            out.release()
+
+# ========== Run Stream Example ==========
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "0"  # video file, RTSP URL or camera index
+    if source.isdigit():
+        source = int(source)
+    start = time.perf_counter()
+    processed = 0
+    for summary in analyze_stream(source, frame_skip=1, annotated_path="annotated_stream.avi"):
+        processed += 1
+        print(f"Frame {summary['frame']}: {summary['vehicle_count']} vehicles, totals {summary['totals']}")
+
+    elapsed = time.perf_counter() - start
+    if processed:
+        print(f"Processed {processed} frames at {processed / elapsed:.1f} fps")
@@ -0,0 +1,210 @@
+import os
+import sys
+
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from q5.string_similarity import compare_strings
+
+# "positional" is the compare_strings score: matching positions after
+# padding both plates to the same length. "edit" scores by Levenshtein
+# distance instead, so a dropped or extra character only costs one.
+# Both are (max_len - distance) / max_len * 100.
+METRICS = ("positional", "edit")
+
+# ========== Pairwise Scores ==========
+
+def levenshtein(a, b):
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+def similarity(s1, s2, metric="positional"):
+    if metric == "positional":
+        return compare_strings(s1, s2)[4]
+    if metric == "edit":
+        max_len = max(len(s1), len(s2))
+        return ((max_len - levenshtein(s1, s2)) / max_len) * 100
+    raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+
+def max_distance(width, threshold):
+    # Most mismatches/edits a pair padded to `width` can have and still
+    # score >= threshold, computed with the same float expression as the
+    # scores themselves. -1 if no pair of that width can reach it.
+    for matches in range(width + 1):
+        if (matches / width) * 100 >= threshold:
+            return width - matches
+    return -1
+
+def blocks(width, count):
+    # Split positions 0..width-1 into `count` contiguous, non-empty blocks
+    edges = [round(i * width / count) for i in range(count + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+def encode(strings, width):
+    # One row of Unicode code points per string, padded with spaces
+    codes = np.array(strings, dtype=f"<U{width}").view(np.uint32).reshape(len(strings), width)
+    return np.where(codes == 0, ord(" "), codes).astype(np.uint32)
+
+# ========== Index ==========
+
+class PlateIndex:
+    # Finds every watchlist plate scoring >= threshold against a query
+    # without scoring the whole list.
+    #
+    # Plates are grouped by length. Within a group, a score threshold
+    # allows at most r mismatches (or edits), so if the query is split
+    # into r + 1 blocks, at least one block matches a candidate exactly:
+    # at the same position for "positional", shifted by at most r for
+    # "edit". Only plates sharing such blocks are scored, all at once.
+    def __init__(self, plates, metric="positional"):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+        self.plates = list(plates)
+        self.metric = metric
+        self.width = max((len(p) for p in self.plates), default=1) or 1
+        self.codes = encode(self.plates, self.width)
+
+        lengths = np.array([len(p) for p in self.plates], dtype=np.int64)
+        self.groups = {int(n): np.flatnonzero(lengths == n) for n in np.unique(lengths)}
+        # (length, start, end) -> {block bytes: plate ids}, built on first use
+        self.tables = {}
+
+    def __len__(self):
+        return len(self.plates)
+
+    def table(self, length, start, end):
+        key = (length, start, end)
+        if key not in self.tables:
+            ids = self.groups[length]
+            block = np.ascontiguousarray(self.codes[ids, start:end])
+            keys = block.view(f"V{block.shape[1] * block.itemsize}").ravel()
+            uniq, inverse = np.unique(keys, return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            splits = np.cumsum(np.bincount(inverse))[:-1]
+            self.tables[key] = dict(zip((u.tobytes() for u in uniq), np.split(ids[order], splits)))
+        return self.tables[key]
+
+    def lookup(self, length, start, end, query_block):
+        return self.table(length, start, end).get(query_block.tobytes())
+
+    def search(self, query, threshold=70):
+        # [(plate, similarity)], best first; ties keep watchlist order
+        if not query:
+            return []
+        found_ids, found_scores = [], []
+        for length, ids in self.groups.items():
+            if self.metric == "positional":
+                cand, scores = self.search_positional(query, length, ids, threshold)
+            else:
+                cand, scores = self.search_edit(query, length, ids, threshold)
+            found_ids.append(cand)
+            found_scores.append(scores)
+
+        if not found_ids:
+            return []
+        ids = np.concatenate(found_ids)
+        scores = np.concatenate(found_scores)
+        order = np.lexsort((ids, -scores))
+        return [(self.plates[i], float(s)) for i, s in zip(ids[order].tolist(), scores[order].tolist())]
+
+    def search_many(self, queries, threshold=70):
+        return [self.search(q, threshold) for q in queries]
+
+    # ---------- Positional metric ----------
+
+    def search_positional(self, query, length, ids, threshold):
+        width = max(len(query), length)
+        budget = max_distance(width, threshold)
+        if budget < 0:
+            return ids[:0], np.zeros(0)
+
+        # Query characters past the index width only ever meet padding
+        compared = min(width, self.width)
+        q = encode([query[:compared]], self.width)[0]
+        tail_mismatches = sum(c != " " for c in query[compared:])
+        budget -= tail_mismatches
+        if budget < 0:
+            return ids[:0], np.zeros(0)
+
+        if budget + 1 > compared:
+            cand = ids
+        else:
+            hits = [self.lookup(length, a, b, q[a:b]) for a, b in blocks(compared, budget + 1)]
+            hits = [h for h in hits if h is not None]
+            if not hits:
+                return ids[:0], np.zeros(0)
+            cand = np.unique(np.concatenate(hits))
+
+        mismatches = (self.codes[cand, :compared] != q[:compared]).sum(axis=1) + tail_mismatches
+        scores = ((width - mismatches) / width) * 100
+        keep = scores >= threshold
+        return cand[keep], scores[keep]
+
+    # ---------- Edit distance metric ----------
+
+    def search_edit(self, query, length, ids, threshold):
+        width = max(len(query), length)
+        budget = max_distance(width, threshold)
+        # Every edit changes the length by at most one
+        if budget < abs(len(query) - length):
+            return ids[:0], np.zeros(0)
+
+        q = encode([query], len(query))[0]
+        if budget + 1 > len(query):
+            cand = ids
+        else:
+            # Shifted blocks match far more plates than aligned ones, so when
+            # the query is long enough use one extra block and require two
+            # of them to match: r edits can spoil at most r of r + 2 blocks.
+            pieces = budget + 2 if len(query) >= 2 * (budget + 2) else budget + 1
+            hits = []
+            for a, b in blocks(len(query), pieces):
+                block_hits = []
+                for shift in range(-budget, budget + 1):
+                    if a + shift >= 0 and b + shift <= length:
+                        h = self.lookup(length, a + shift, b + shift, q[a:b])
+                        if h is not None:
+                            block_hits.append(h)
+                if block_hits:
+                    hits.append(np.unique(np.concatenate(block_hits)))
+            if not hits:
+                return ids[:0], np.zeros(0)
+            cand, counts = np.unique(np.concatenate(hits), return_counts=True)
+            cand = cand[counts >= pieces - budget]
+
+        distances = levenshtein_rows(q, self.codes[cand, :length])
+        scores = ((width - distances) / width) * 100
+        keep = scores >= threshold
+        return cand[keep], scores[keep]
+
+def levenshtein_rows(query, rows):
+    # Levenshtein distance from one encoded query to every row of a
+    # same-length block, filling the DP table for all rows at once
+    n, length = rows.shape
+    prev = np.broadcast_to(np.arange(length + 1), (n, length + 1)).copy()
+    cur = np.empty_like(prev)
+    for i, c in enumerate(query, 1):
+        cur[:, 0] = i
+        substitute = prev[:, :-1] + (rows != c)
+        delete = prev[:, 1:] + 1
+        best = np.minimum(substitute, delete)
+        # Insertions chain along the row, so they need a running pass
+        for j in range(1, length + 1):
+            cur[:, j] = np.minimum(best[:, j - 1], cur[:, j - 1] + 1)
+        prev, cur = cur, prev
+    return prev[:, -1]
+
+# ========== Index Example ==========
+
+if __name__ == "__main__":
+    watchlist = ["JUM5353", "PUTRAJAYA9558", "VMY6667", "WA1234B", "JUM5358", "JUN5353"]
+    for metric in METRICS:
+        index = PlateIndex(watchlist, metric)
+        print(f"{metric}: {index.search('JUM535', threshold=70)}")
@@ -1,3 +1,5 @@
+import numpy as np
+
 def get_valid_string(prompt):
     while True:
         s = input(prompt).strip()
@@ -25,6 +27,87 @@ def compare_strings(s1, s2):
     similarity = (matches / len(s1)) * 100
     return s1, s2, match_line, matches, similarity
 
+def pack_strings(strings):
+    # One row per string, padded with spaces like align_strings, plus each
+    # string's length. ASCII strings pack into uint8; anything else falls
+    # back to uint32 code points.
+    #
+    # The strings are joined with NULs and encoded in one call, and the
+    # rows are cut out of that buffer, which avoids a Python-level call per
+    # string. Strings that contain NULs themselves take the slower path.
+    if len(strings) == 0:
+        return np.zeros((0, 0), np.uint8), np.zeros(0, np.int64)
+    joined = "\0".join(strings)
+    try:
+        buf = np.frombuffer(joined.encode("ascii"), np.uint8)
+    except UnicodeEncodeError:
+        buf = np.frombuffer(joined.encode("utf-32-le"), np.uint32)
+
+    seps = np.flatnonzero(buf == 0)
+    if len(seps) != max(len(strings) - 1, 0):
+        lengths = np.fromiter(map(len, strings), np.int64, len(strings))
+        seps = np.cumsum(lengths + 1)[:-1] - 1
+    starts = np.concatenate([[0], seps + 1])
+    lengths = np.concatenate([seps, [len(buf)]]) - starts
+
+    # Column by column keeps the index arrays one string long
+    width = int(lengths.max())
+    codes = np.full((len(strings), width), ord(" "), dtype=buf.dtype)
+    for c in range(width):
+        rows = np.flatnonzero(lengths > c)
+        codes[rows, c] = buf[starts[rows] + c]
+    return codes, lengths
+
+def pad_columns(codes, width):
+    if codes.shape[1] == width:
+        return codes
+    out = np.full((len(codes), width), ord(" "), dtype=codes.dtype)
+    out[:, :codes.shape[1]] = codes
+    return out
+
+def compare_packed(codes1, lengths1, codes2, lengths2, match_lines=False):
+    # The vectorized part of compare_strings_bulk, for strings already
+    # packed with pack_strings (e.g. a list scored many times)
+    max_len = np.maximum(lengths1, lengths2)
+    if (max_len == 0).any():
+        raise ZeroDivisionError("cannot compare two empty strings")
+
+    width = max(codes1.shape[1], codes2.shape[1])
+    equal = pad_columns(codes1, width) == pad_columns(codes2, width)
+    # Past a pair's own length both sides are padding, so always equal
+    matches = equal.sum(axis=1) - (width - max_len)
+    similarity = (matches / max_len) * 100
+    if not match_lines:
+        return matches, similarity
+
+    line = np.where(equal, ord("*"), ord("x")).astype(np.uint8)
+    line[np.arange(width) >= max_len[:, None]] = 0  # trailing NULs are dropped by the S dtype
+    return matches, similarity, [b.decode() for b in line.view(f"S{width}").ravel().tolist()]
+
+def compare_strings_bulk(strings1, strings2, match_lines=False, chunk_size=1 << 20):
+    # compare_strings over many pairs at once: returns (matches, similarity)
+    # arrays, plus a list of match lines if match_lines is set. Pairs are
+    # processed chunk_size at a time to bound memory.
+    if len(strings1) != len(strings2):
+        raise ValueError(f"got {len(strings1)} and {len(strings2)} strings")
+
+    n = len(strings1)
+    matches = np.zeros(n, dtype=np.int64)
+    similarity = np.zeros(n, dtype=np.float64)
+    lines = [] if match_lines else None
+
+    for start in range(0, n, chunk_size):
+        end = min(start + chunk_size, n)
+        result = compare_packed(*pack_strings(strings1[start:end]), *pack_strings(strings2[start:end]),
+                                match_lines=match_lines)
+        matches[start:end], similarity[start:end] = result[0], result[1]
+        if match_lines:
+            lines.extend(result[2])
+
+    if match_lines:
+        return matches, similarity, lines
+    return matches, similarity
+
 def main():
     print("🔤 String Similarity Checker (6–10 characters)")
     str1 = get_valid_string("Enter first string: ")
@@ -0,0 +1,127 @@
+import os
+import sys
+import hashlib
+
+import torch
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.model_registry import load_resnet18, register_loader, warmup_torch
+
+# Inference backends for the q7 ResNet18. Each one takes the eager FP32
+# model (or its name) and returns something that is called like it: a
+# (batch, 3, 224, 224) float tensor in, a (batch, 1000) logits tensor out.
+# They are registered with common/model_registry.py as kind
+# "resnet18-<backend>", so cat_dog_classifier.py can pick one by name.
+
+# Exports are named after a hash of the weights (resnet18-<hash>.onnx), so
+# new weights get a new export instead of a stale file
+ONNX_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ========== Conversions ==========
+
+def to_dynamic_int8(model):
+    # Weights of the Linear layers in INT8, activations quantized on the fly.
+    # In ResNet18 that is only the final fc layer; the convolutions stay FP32.
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def to_torchscript(model, imgsz=224):
+    with torch.no_grad():
+        traced = torch.jit.trace(model, torch.zeros(1, 3, imgsz, imgsz))
+    return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+def to_compiled(model):
+    return torch.compile(model)
+
+def weights_digest(model):
+    # Short hash of every parameter and buffer, in state_dict order
+    h = hashlib.sha256()
+    for name, tensor in model.state_dict().items():
+        h.update(name.encode())
+        h.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return h.hexdigest()[:16]
+
+def onnx_path(model):
+    return os.path.join(ONNX_DIR, f"resnet18-{weights_digest(model)}.onnx")
+
+def export_onnx(model, path, imgsz=224):
+    torch.onnx.export(model, torch.zeros(1, 3, imgsz, imgsz), path,
+                      input_names=["input"], output_names=["logits"],
+                      dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}})
+    return path
+
+class OnnxModel:
+    # An onnxruntime session that is called like the torch model
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or torch.get_num_threads()
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        logits = self.session.run(None, {self.input_name: batch.numpy()})[0]
+        return torch.from_numpy(logits)
+
+    def eval(self):
+        return self
+
+# ========== Loaders ==========
+
+def to_onnx(model):
+    # Exports the model the first time its weights are seen; later runs
+    # with the same weights reuse the file
+    path = onnx_path(model)
+    if not os.path.exists(path):
+        export_onnx(model, path)
+    return OnnxModel(path)
+
+CONVERSIONS = {
+    "eager": lambda model: model,
+    "dynamic_int8": to_dynamic_int8,
+    "torchscript": to_torchscript,
+    "compile": to_compiled,
+    "onnx": to_onnx,
+}
+
+def load_static_int8(name):
+    # Not a conversion of the eager model: this loads torchvision's own
+    # pre-quantized ResNet18 (INT8 weights and activations, FBGEMM), which
+    # torchvision calibrated from the same IMAGENET1K_V1 FP32 weights. It
+    # ignores any other weights the eager model is loaded with.
+    import torchvision.models.quantization as qmodels
+    model = qmodels.resnet18(weights=qmodels.ResNet18_QuantizedWeights.IMAGENET1K_FBGEMM_V1, quantize=True)
+    model.eval()
+    return model
+
+def converted_loader(convert):
+    return lambda name: convert(load_resnet18(name))
+
+BACKENDS = {backend: converted_loader(convert) for backend, convert in CONVERSIONS.items()}
+BACKENDS["static_int8"] = load_static_int8
+
+def backend_kind(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {list(BACKENDS)}")
+    return f"resnet18-{backend}"
+
+for _backend, _loader in BACKENDS.items():
+    register_loader(backend_kind(_backend), _loader, warmup_torch)
+
+# ========== Parity ==========
+
+def top1_dog_parity(reference, candidate, batches):
+    # Runs both models over the batches and compares their top-1 dog/non-dog
+    # decisions. Returns (agreeing, total, indices that disagree).
+    from q7.cat_dog_classifier import dog_scores
+    agree, total, disagree = 0, 0, []
+    with torch.inference_mode():
+        for batch in batches:
+            expected, _ = dog_scores(reference(batch))
+            got, _ = dog_scores(candidate(batch))
+            same = (expected == got).tolist()
+            disagree.extend(total + i for i, s in enumerate(same) if not s)
+            agree += sum(same)
+            total += len(same)
+    return agree, total, disagree
@@ -0,0 +1,130 @@
+import os
+import sys
+from collections import namedtuple
+
+import torch
+from PIL import Image
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from q7 import cat_dog_classifier
+from q7.cat_dog_classifier import transform, idx_to_labels, dog_scores
+from common.metrics import metrics
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+# One per input image. label is the lowercase top-1 label, like
+# classify_image returns; is_dog says whether that class is a dog class
+# and dog_probability is the probability summed over all dog classes.
+# If the image couldn't be read, error says why and the rest is empty.
+Classification = namedtuple("Classification", [
+    "path", "label", "top_labels", "top_probs", "top_indices", "is_dog", "dog_probability", "error",
+])
+
+# ========== Loading ==========
+
+class ImageDataset(torch.utils.data.Dataset):
+    # Decodes and transforms one image; runs inside DataLoader workers
+    def __init__(self, paths):
+        self.paths = paths
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        try:
+            img = Image.open(self.paths[index]).convert("RGB")
+            return index, transform(img), None
+        except (OSError, ValueError) as e:
+            return index, None, f"{type(e).__name__}: {e}"
+
+def collate(items):
+    # Stack the images that loaded; keep errors for the ones that didn't
+    loaded = [(index, tensor) for index, tensor, _ in items if tensor is not None]
+    errors = {index: error for index, _, error in items if error is not None}
+    batch = torch.stack([tensor for _, tensor in loaded]) if loaded else None
+    return [index for index, _ in loaded], batch, errors
+
+def init_worker(worker_id):
+    # Runs in each DataLoader worker process, not the caller's: a decode
+    # worker needs one thread, the main process keeps the rest for inference
+    torch.set_num_threads(1)
+
+def default_workers():
+    return min(4, max(0, (os.cpu_count() or 1) - 1))
+
+def configure_threads(workers):
+    # Give inference the cores the decode workers aren't using. This is a
+    # process-wide torch setting; returns the previous value so the caller
+    # can put it back.
+    previous = torch.get_num_threads()
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) - workers))
+    return previous
+
+# ========== Batched Classification ==========
+
+def classify_images(paths, batch_size=32, workers=None, prefetch=2, topk=5):
+    # Yields one Classification per path, in input order.
+    #
+    # `workers` processes decode and transform images while the model runs,
+    # each keeping `prefetch` batches ready ahead of it. workers=0 loads
+    # in the calling process.
+    paths = list(paths)
+    workers = default_workers() if workers is None else workers
+    options = {}
+    if workers:
+        # torch < 2.0 rejects prefetch_factor without worker processes, even as None
+        options = {"worker_init_fn": init_worker, "prefetch_factor": prefetch}
+    loader = torch.utils.data.DataLoader(
+        ImageDataset(paths), batch_size=batch_size, shuffle=False, num_workers=workers,
+        collate_fn=collate, **options)
+
+    net = cat_dog_classifier.model.model  # load once before workers start, not on the first batch
+    for indices, batch, errors in loader:
+        yield from classify_batch(net, paths, indices, batch, errors, topk, workers)
+
+def classify_batch(net, paths, indices, batch, errors, topk, workers):
+    # The Classifications for one loader batch, in input order. Inference
+    # mode and the inference thread count are only set while the batch
+    # runs, so code consuming the results never runs under either.
+    results = {index: Classification(paths[index], None, [], [], [], None, None, error)
+               for index, error in errors.items()}
+    metrics.count("q7.images", len(indices))
+    metrics.count("q7.errors", len(errors))
+    if batch is not None:
+        previous_threads = configure_threads(workers)
+        try:
+            with torch.inference_mode():
+                with metrics.stage("q7.batch_inference"):
+                    logits = net(batch)
+                top = torch.topk(torch.softmax(logits, dim=1), topk, dim=1)
+                is_dog, dog_probability = dog_scores(logits)
+                rows = zip(indices, top.indices.tolist(), top.values.tolist(), is_dog.tolist(), dog_probability.tolist())
+                for index, top_indices, top_probs, dog, dog_prob in rows:
+                    labels = [idx_to_labels[i] for i in top_indices]
+                    results[index] = Classification(paths[index], labels[0].lower(), labels,
+                                                    top_probs, top_indices, dog, dog_prob, None)
+        finally:
+            torch.set_num_threads(previous_threads)
+    return [results[index] for index in sorted(results)]
+
+def list_images(folder_path):
+    return sorted(os.path.join(folder_path, f) for f in os.listdir(folder_path)
+                  if f.lower().endswith(IMAGE_EXTENSIONS))
+
+def classify_folder(folder_path, **options):
+    return list(classify_images(list_images(folder_path), **options))
+
+# ========== Batch Example ==========
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_images")
+    results = classify_folder(folder, batch_size=8)
+    for result in results:
+        if result.error:
+            print(f"{os.path.basename(result.path)}: {result.error}")
+        else:
+            print(f"{os.path.basename(result.path)}: {result.top_labels[0]} ({result.top_probs[0] * 100:.2f}%), "
+                  f"dog={result.is_dog} (dog classes {result.dog_probability * 100:.2f}%)")
+    metrics.report()
@@ -1,24 +1,37 @@
 import torch
 import torchvision.transforms as transforms
-import torchvision.models as models
 from PIL import Image
 import os
+import sys
 
-# Download ImageNet labels
-LABELS_URL = "https://raw.githubusercontent.com/pytorch/hub/master/imagenet_classes.txt"
-LABELS_PATH = "imagenet_classes.txt"
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-if not os.path.exists(LABELS_PATH):
-    import urllib.request
-    urllib.request.urlretrieve(LABELS_URL, LABELS_PATH)
+from common.model_registry import lazy_model
+from common.metrics import metrics
+from q7.backends import backend_kind
+
+# ImageNet labels, bundled next to this file (line i is class i)
+LABELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imagenet_classes.txt")
 
 with open(LABELS_PATH, "r") as f:
     idx_to_labels = [line.strip() for line in f.readlines()]
 
-# Identify dog-related classes from ImageNet
-dog_classes = [label.lower() for label in idx_to_labels if any(x in label.lower() for x in [
-    "dog", "retriever", "terrier", "spaniel", "sheepdog", "poodle", "hound", "husky", "dachshund"
-])]
+# Identify dog-related classes from ImageNet, once, as class indices so
+# predictions can be checked on the model output instead of label text
+DOG_KEYWORDS = ["dog", "retriever", "terrier", "spaniel", "sheepdog", "poodle", "hound", "husky", "dachshund"]
+dog_indices = [i for i, label in enumerate(idx_to_labels) if any(x in label.lower() for x in DOG_KEYWORDS)]
+dog_mask = torch.zeros(len(idx_to_labels), dtype=torch.bool)
+dog_mask[dog_indices] = True
+dog_classes = {idx_to_labels[i].lower() for i in dog_indices}
+
+def dog_scores(logits):
+    # For a (batch, classes) logits tensor: whether each top-1 class is a
+    # dog class, and the total probability on dog classes
+    mask = dog_mask.to(logits.device)
+    top1_is_dog = mask[logits.argmax(dim=1)]
+    dog_probability = torch.softmax(logits, dim=1)[:, mask].sum(dim=1)
+    return top1_is_dog, dog_probability
 
 # Preprocessing pipeline for ResNet
 transform = transforms.Compose([
@@ -31,15 +44,35 @@ transform = transforms.Compose([
     )
 ])
 
-# Load pre-trained ResNet18 model
-model = models.resnet18(weights=models.ResNet18_Weights.IMAGENET1K_V1)
-model.eval()
-
-def classify_image(image_path):
-    img = Image.open(image_path).convert("RGB")
-    input_tensor = transform(img).unsqueeze(0)
-    with torch.no_grad():
-        output = model(input_tensor)
+# Inference backend for ResNet18, one of q7/backends.py's BACKENDS: "eager"
+# (FP32), "dynamic_int8", "static_int8", "torchscript", "compile" or "onnx".
+# "static_int8" is torchvision's pre-quantized ResNet18, not a quantization
+# of the weights "eager" loads. The Q7_BACKEND environment variable
+# overrides the default.
+CONFIG = {
+    "backend": os.environ.get("Q7_BACKEND", "eager"),
+}
+
+# Pre-trained ResNet18 model, loaded (in eval mode) on first use
+model = lazy_model("resnet18", kind=backend_kind(CONFIG["backend"]))
+
+def use_backend(backend):
+    # Switches the model classify_image and the batch classifier use
+    global model
+    model = lazy_model("resnet18", kind=backend_kind(backend))
+    CONFIG["backend"] = backend
+    return model
+
+def image_logits(image_path):
+    with metrics.stage("q7.decode"):
+        img = Image.open(image_path).convert("RGB")
+        input_tensor = transform(img).unsqueeze(0)
+    with metrics.stage("q7.inference"), torch.no_grad():
+        return model(input_tensor)
+
+def print_top5(image_path, output):
+    # Prints the top-5 predictions for a (1, classes) output and returns the
+    # lowercase top-1 label
     probabilities = torch.nn.functional.softmax(output[0], dim=0)
     top5 = torch.topk(probabilities, 5)
 
@@ -51,15 +84,20 @@ def classify_image(image_path):
 
     return idx_to_labels[top5.indices[0]].lower()
 
+def classify_image(image_path):
+    return print_top5(image_path, image_logits(image_path))
+
 def test_images_in_folder(folder_path):
     misclassified = []
     dog_files = [f for f in os.listdir(folder_path) if "dog" in f.lower()]
 
     for filename in dog_files:
         img_path = os.path.join(folder_path, filename)
-        top1_label = classify_image(img_path)
+        output = image_logits(img_path)
+        top1_label = print_top5(img_path, output)
+        top1_is_dog, _ = dog_scores(output)
 
-        if top1_label not in dog_classes:
+        if not top1_is_dog[0]:
             misclassified.append((filename, top1_label))
 
     print("\n📊 Misclassified Dog Images:")
@@ -68,6 +106,7 @@ def test_images_in_folder(folder_path):
 
     print(f"\nTotal Dog Images Tested: {len(dog_files)}")
     print(f"Misclassified Dogs: {len(misclassified)}")
+    metrics.report()
 
     return misclassified
 
@@ -0,0 +1,46 @@
+# test_anonymize.py
+
+import cv2
+import numpy as np
+import pytest
+
+from program4.anonymize import ANONYMIZERS, anonymize
+
+FACES = [(40, 30, 120, 100), (200, 150, 60, 60)]
+
+def frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+
+def outside_faces(image):
+    mask = np.ones(image.shape[:2], bool)
+    for x, y, w, h in FACES:
+        mask[y:y+h, x:x+w] = False
+    return image[mask]
+
+def test_gaussian_matches_the_original_copy_back_blur():
+    expected = frame()
+    for (x, y, w, h) in FACES:
+        expected[y:y+h, x:x+w] = cv2.GaussianBlur(expected[y:y+h, x:x+w], (99, 99), 30)
+    assert np.array_equal(anonymize(frame(), FACES), expected)
+
+@pytest.mark.parametrize("method", sorted(ANONYMIZERS))
+def test_methods_change_only_the_faces_in_place(method):
+    original = frame()
+    image = original.copy()
+    out = anonymize(image, FACES, method=method)
+    assert out is image
+    assert np.array_equal(outside_faces(image), outside_faces(original))
+    for x, y, w, h in FACES:
+        face, before = image[y:y+h, x:x+w], original[y:y+h, x:x+w]
+        assert face.std() < before.std() / 2  # detail is gone
+
+def test_method_options_and_empty_boxes():
+    image = anonymize(frame(), FACES + [(10, 10, 0, 5)], method="mask", color=(1, 2, 3))
+    assert (image[30:130, 40:160] == (1, 2, 3)).all()
+    pixelated = anonymize(frame(), [(0, 0, 120, 120)], method="pixelate", blocks=4)
+    assert len(np.unique(pixelated[:120, :120].reshape(-1, 3), axis=0)) <= 16
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        anonymize(frame(), FACES, method="swirl")
@@ -0,0 +1,68 @@
+# test_batch_classifier.py
+
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+models = pytest.importorskip("torchvision.models")
+
+from common import model_registry
+from common.model_registry import lazy_model
+from q7 import cat_dog_classifier
+from q7.batch_classifier import classify_images, list_images
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "q7", "test_images")
+
+def untrained_resnet18(name):
+    torch.manual_seed(0)
+    return models.resnet18(weights=None).eval()
+
+@pytest.fixture
+def model(monkeypatch):
+    # Random weights: the comparison needs the same network, not ImageNet accuracy
+    monkeypatch.setitem(model_registry.LOADERS, "resnet18-test", untrained_resnet18)
+    monkeypatch.setattr(cat_dog_classifier, "model", lazy_model("resnet18", kind="resnet18-test"))
+    yield
+    model_registry.clear()
+
+@pytest.fixture
+def paths(tmp_path):
+    # The sample images with an unreadable file in the middle
+    images = list_images(IMAGES)
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    return images[:4] + [str(broken)] + images[4:]
+
+@pytest.mark.parametrize("batch_size, workers", [(2, 0), (4, 0), (5, 1)])
+def test_batches_match_single_image_classification(model, paths, batch_size, workers, capsys):
+    threads = torch.get_num_threads()
+    results = list(classify_images(paths, batch_size=batch_size, workers=workers))
+    assert torch.get_num_threads() == threads
+
+    assert [r.path for r in results] == paths
+    assert len(paths) % batch_size != 0
+    for path, result in zip(paths, results):
+        if path.endswith("broken.jpg"):
+            assert result.error and result.label is None
+            continue
+        logits = cat_dog_classifier.image_logits(path)
+        probabilities = torch.softmax(logits, dim=1)[0]
+        top = torch.topk(probabilities, 5)
+        is_dog, dog_probability = cat_dog_classifier.dog_scores(logits)
+
+        assert result.error is None
+        assert result.label == cat_dog_classifier.classify_image(path)
+        assert result.top_indices == top.indices.tolist()
+        assert result.top_probs == pytest.approx(top.values.tolist(), rel=1e-4)
+        assert result.is_dog == is_dog.item()
+        assert result.dog_probability == pytest.approx(dog_probability.item(), rel=1e-4)
+
+def test_consumer_runs_outside_inference_mode_and_keeps_its_threads(model, paths, monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)  # so inference would use more threads than the caller
+    threads = torch.get_num_threads()
+    assert threads != 8
+    for result in classify_images(paths, batch_size=2, workers=0):
+        assert not torch.is_inference_mode_enabled()
+        assert torch.get_num_threads() == threads
+        assert torch.ones(1, requires_grad=True).sum().requires_grad
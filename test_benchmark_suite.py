@@ -0,0 +1,69 @@
+# test_benchmark_suite.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+import suite
+from stub_models import StubYolo
+from common import model_registry
+
+def run_record(commit, timings, models=None):
+    return {
+        "commit": commit,
+        "time": "2025-09-20T10:00:00",
+        "benchmarks": {name: {"models": models, "min": t, "median": t, "stages": {"decode": t / 2}}
+                       for name, t in timings.items()},
+    }
+
+def test_stub_yolo_runs_q1_analyzer(monkeypatch):
+    monkeypatch.setitem(model_registry.LOADERS, "yolo", StubYolo)
+    model_registry.clear()
+    try:
+        from q1.vehicle_attribute import VehicleSceneAnalyzer
+        result = VehicleSceneAnalyzer().analyze(np.full((800, 1000, 3), 90, np.uint8))
+    finally:
+        model_registry.clear()
+    assert result["vehicle_count"] == 2
+    assert [v["type"] for v in result["vehicles"]] == ["car", "truck"]
+    assert all(v["license_plate_present"] and v["make"] == "toyota" for v in result["vehicles"])
+
+def test_stub_plate_passes_q1_code_plate_filter():
+    from assignment_part_a.Q1_code import plate_boxes
+    img = np.zeros((1600, 2048, 3), np.uint8)
+    assert len(plate_boxes(StubYolo("LP-detection.pt")(img)[0], img.shape)) == 1
+
+def test_baseline_prefers_other_commits():
+    history = [run_record("aaa", {}), run_record("bbb", {}), run_record("ccc", {})]
+    assert suite.find_baseline(history, "ccc")["commit"] == "bbb"
+    assert suite.find_baseline(history, "ddd")["commit"] == "ccc"
+    assert suite.find_baseline(history[2:], "ccc")["commit"] == "ccc"
+    assert suite.find_baseline(history, "ccc", against="aa")["commit"] == "aaa"
+    assert suite.find_baseline(history, "ccc", against="zzz") is None
+    assert suite.find_baseline([], "ccc") is None
+
+def test_compare_flags_regressions_with_the_same_models():
+    baseline = run_record("aaa", {"fast": 0.010, "same": 0.010, "slow": 0.010})
+    current = run_record("bbb", {"fast": 0.005, "same": 0.011, "slow": 0.013})
+    rows = {name: (ratio, flag) for name, _, _, ratio, flag in suite.compare(current, baseline, threshold=0.2)}
+    assert rows["fast"][1] == "faster"
+    assert rows["same"][1] == ""
+    assert rows["slow"] == (pytest.approx(1.3), "REGRESSION")
+    assert rows["  decode"][1] == "REGRESSION"  # the slow benchmark's stage row comes last
+
+    # Results from other models are never compared
+    other = run_record("aaa", {"slow": 0.001}, models="stub")
+    assert suite.compare(current, other)[-2] == ("slow", 0.013, None, None, "")
+
+def test_run_benchmark_and_history(tmp_path):
+    result = suite.run_benchmark(suite.setup_compare_strings, {}, repeats=2)
+    assert result["items"] > 0 and result["models"] is None
+    assert 0 < result["min"] <= result["median"]
+
+    path = str(tmp_path / "results" / "machine.jsonl")
+    suite.save_run(path, run_record("aaa", {"q5.compare_strings": result["min"]}))
+    suite.save_run(path, run_record("bbb", {"q5.compare_strings": result["min"]}))
+    assert [r["commit"] for r in suite.load_history(path)] == ["aaa", "bbb"]
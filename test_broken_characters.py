@@ -0,0 +1,92 @@
+# test_broken_characters.py
+
+import glob
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from assignment_part_a.Q1_code import CONFIG, detect_broken_characters, detect_broken_characters_batch
+
+SAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "assignment_part_a", "output", "*.jpg")))
+
+def contour_broken_characters(plate_img):
+    # The findContours loop detect_broken_characters used to run
+    gray = cv2.cvtColor(plate_img, cv2.COLOR_BGR2GRAY)
+    thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    broken_count = 0
+    annotated_plate = plate_img.copy()
+    for cnt in contours:
+        x, y, w, h = cv2.boundingRect(cnt)
+        area = cv2.contourArea(cnt)
+        if (CONFIG["broken_area"][0] < area < CONFIG["broken_area"][1]
+                and CONFIG["broken_width"][0] < w < CONFIG["broken_width"][1]
+                and CONFIG["broken_height"][0] < h < CONFIG["broken_height"][1]):
+            broken_count += 1
+            cv2.rectangle(annotated_plate, (x, y), (x + w, y + h), (0, 0, 255), 2)
+    return broken_count, annotated_plate
+
+def sample_crops(img):
+    # The fallback plate region of each half of a stitched sample, plus a
+    # grid of plate-sized tiles over the whole image
+    h, w = img.shape[:2]
+    crops = []
+    for left in (0, w // 2):
+        half_w = w // 2
+        crops.append(img[int(h * 0.7):int(h * 0.85), left + int(half_w * 0.3):left + int(half_w * 0.7)])
+    for y in range(0, h - 120, 400):
+        for x in range(0, w - 360, 700):
+            crops.append(img[y:y + 120, x:x + 360])
+    return crops
+
+@pytest.mark.skipif(not SAMPLES, reason="no output/ samples")
+@pytest.mark.parametrize("path", SAMPLES, ids=os.path.basename)
+def test_counts_match_contour_loop_on_samples(path):
+    crops = sample_crops(cv2.imread(path))
+    expected = [contour_broken_characters(crop)[0] for crop in crops]
+
+    assert [detect_broken_characters(crop)[0] for crop in crops] == expected
+    assert [count for count, _ in detect_broken_characters_batch(crops)] == expected
+
+@pytest.mark.skipif(not SAMPLES, reason="no output/ samples")
+def test_whole_sample_and_annotation_match():
+    img = cv2.imread(SAMPLES[0])
+    expected_count, expected_annotated = contour_broken_characters(img)
+    count, annotated = detect_broken_characters(img, annotate=True)
+
+    assert count == expected_count
+    assert np.array_equal(annotated, expected_annotated)
+
+def test_nested_and_hollow_shapes():
+    # A ring whose hole holds another blob is one external contour, and its
+    # area is the polygon area, not the pixel count
+    mask = np.full((80, 120), 255, np.uint8)
+    cv2.rectangle(mask, (10, 10), (40, 50), 0, 2)    # hollow 31x41 ring
+    cv2.rectangle(mask, (20, 20), (28, 36), 0, -1)   # blob inside the ring
+    cv2.line(mask, (60, 10), (60, 40), 0, 1)          # 1 px line, zero area
+    cv2.rectangle(mask, (80, 20), (92, 40), 0, -1)   # solid 13x21 block
+    plate = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+
+    # Only the solid block counts; the nested blob would if it were labelled on its own
+    assert contour_broken_characters(plate)[0] == 1
+    assert detect_broken_characters(plate)[0] == 1
+
+def test_batch_keeps_crops_apart_and_skips_annotation():
+    img = cv2.imread(SAMPLES[0]) if SAMPLES else np.random.default_rng(0).integers(0, 255, (400, 900, 3), np.uint8)
+    crops = [img[:120, :360], img[:5, :5], img[:0, :0], img[200:330, 400:800]]
+    results = detect_broken_characters_batch(crops)
+
+    assert [count for count, _ in results] == [detect_broken_characters(c)[0] if c.size else 0 for c in crops]
+    assert all(annotated is None for _, annotated in results)
+    assert detect_broken_characters_batch([]) == []
+
+@pytest.mark.skipif(not SAMPLES, reason="no output/ samples")
+def test_batch_annotations_land_on_their_own_crop():
+    img = cv2.imread(SAMPLES[1])
+    crops = [img[y:y + 120, x:x + 360] for y in (300, 900) for x in (200, 1400, 2600)]
+    for crop, (count, annotated) in zip(crops, detect_broken_characters_batch(crops, annotate=True)):
+        expected_count, expected_annotated = contour_broken_characters(crop)
+        assert count == expected_count
+        assert np.array_equal(annotated, expected_annotated)
@@ -0,0 +1,46 @@
+# test_color_modes.py
+
+import numpy as np
+import pytest
+
+from q1.color import COLOR_MODES, dominant_color, rgb_to_name
+
+def solid(bgr, shape=(60, 90)):
+    return np.full((*shape, 3), bgr, np.uint8)
+
+def noisy(bgr, shape=(120, 200), sigma=12):
+    rng = np.random.default_rng(0)
+    return np.clip(rng.normal(bgr, sigma, (*shape, 3)), 0, 255).astype(np.uint8)
+
+@pytest.mark.parametrize("roi, tolerance", [
+    (solid((30, 40, 200)), 1),
+    (solid((240, 240, 240)), 1),
+    (noisy((30, 40, 200)), 2),
+    (noisy((150, 90, 60)), 2),
+])
+def test_mean_matches_kmeans(roi, tolerance):
+    mean, reference = dominant_color(roi, "mean"), dominant_color(roi, "kmeans")
+    assert max(abs(a - b) for a, b in zip(mean, reference)) <= tolerance
+
+def test_histogram_returns_the_fullest_bin():
+    # 60% red in two shades of the same bin, 40% blue
+    roi = solid((200, 40, 30), (100, 100))
+    roi[:30] = (30, 40, 200)
+    roi[30:60] = (30, 40, 210)
+    assert dominant_color(roi, "histogram") == (205, 40, 30)
+    assert rgb_to_name(dominant_color(roi, "mean")) != "red"
+
+def test_cluster_ignores_border_and_dark_pixels():
+    # Red body in the centre, grey road around it and a black window on the body
+    roi = solid((170, 170, 170), (100, 100))
+    roi[20:80, 20:80] = (30, 30, 220)
+    roi[30:50, 30:50] = (10, 10, 10)
+    assert rgb_to_name(dominant_color(roi, "cluster")) == "red"
+    assert rgb_to_name(dominant_color(roi, "mean")) != "red"
+
+@pytest.mark.parametrize("mode", list(COLOR_MODES))
+def test_tiny_rois_behave_the_same_in_every_mode(mode):
+    assert dominant_color(solid((10, 20, 30), (1, 1)), mode) == (30, 20, 10)
+    for shape in [(0, 0), (0, 5), (5, 0)]:
+        with pytest.raises(ValueError, match="empty crop"):
+            dominant_color(np.zeros((*shape, 3), np.uint8), mode)
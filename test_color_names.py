@@ -0,0 +1,32 @@
+# test_color_names.py
+
+import pytest
+from q1.color import rgb_to_name, rgb_to_names
+
+# --------- Original branch-based implementation ---------
+
+def rgb_to_name_branches(rgb):
+    r, g, b = rgb
+    if r > 200 and g > 200 and b > 200:
+        return "white"
+    elif r > 150 and g < 100 and b < 100:
+        return "red"
+    elif b > 150 and r < 100 and g < 100:
+        return "blue"
+    elif g > 150 and r < 100 and b < 100:
+        return "green"
+    else:
+        return f"rgb{rgb}"
+
+# Every threshold edge (99/100, 150/151, 200/201) plus the extremes
+EDGE_VALUES = [0, 50, 99, 100, 101, 150, 151, 175, 200, 201, 255]
+test_colors = [(r, g, b) for r in EDGE_VALUES for g in EDGE_VALUES for b in EDGE_VALUES]
+
+# --------- Tests ---------
+
+@pytest.mark.parametrize("rgb", test_colors)
+def test_lut_matches_branches(rgb):
+    assert rgb_to_name(rgb) == rgb_to_name_branches(rgb)
+
+def test_vectorized_matches_scalar():
+    assert rgb_to_names(test_colors) == [rgb_to_name(c) for c in test_colors]
@@ -0,0 +1,33 @@
+# test_dog_classes.py
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from q7.cat_dog_classifier import idx_to_labels, dog_classes, dog_indices, dog_mask, dog_scores
+
+KEYWORDS = ["dog", "retriever", "terrier", "spaniel", "sheepdog", "poodle", "hound", "husky", "dachshund"]
+
+def test_labels_are_bundled():
+    assert len(idx_to_labels) == 1000
+    assert idx_to_labels[207] == "golden retriever"
+
+def test_dog_indices_match_label_keywords():
+    expected = [label.lower() for label in idx_to_labels if any(x in label.lower() for x in KEYWORDS)]
+    assert sorted(dog_classes) == sorted(set(expected))
+    assert [idx_to_labels[i].lower() for i in dog_indices] == expected
+    assert dog_mask.sum().item() == len(dog_indices)
+
+def test_dog_scores_match_top1_label_check():
+    logits = torch.randn(64, 1000)
+    logits[:8, dog_indices[0]] += 20  # make sure some rows are dogs
+    top1_is_dog, dog_probability = dog_scores(logits)
+
+    labels = [idx_to_labels[i].lower() for i in logits.argmax(dim=1).tolist()]
+    assert top1_is_dog.tolist() == [label in dog_classes for label in labels]
+    assert top1_is_dog[:8].all()
+
+    probabilities = torch.softmax(logits, dim=1)
+    expected = probabilities[:, dog_indices].sum(dim=1)
+    assert torch.allclose(dog_probability, expected)
@@ -0,0 +1,118 @@
+# test_face_blur_pipeline.py
+
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+if not hasattr(cv2, "CascadeClassifier"):
+    pytest.skip("this OpenCV build has no Haar cascades", allow_module_level=True)
+
+from program4.face_detection_blur import BlurPipeline, RingBuffer, blur_faces
+from common.face_detection import FaceDetector
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "program3", "images")
+
+# --------- Helpers ---------
+
+def write_face_video(path, frames=12):
+    # A face photo sliding across a gray background
+    face = cv2.resize(cv2.imread(os.path.join(IMAGES, "person2.jpg")), (160, 190))
+    out = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 25.0, (480, 320))
+    for i in range(frames):
+        frame = np.full((320, 480, 3), 128, dtype=np.uint8)
+        frame[60:250, 20 + 10 * i:180 + 10 * i] = face
+        out.write(frame)
+    out.release()
+
+def read_frames(path):
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+# --------- Tests ---------
+
+def test_ring_buffer_drops_oldest_when_full():
+    buf = RingBuffer(2, drop_oldest=True)
+    for i in range(5):
+        buf.put(i)
+    buf.close()
+    assert (buf.get(), buf.get(), buf.get()) == (3, 4, None)
+    assert buf.dropped == 3
+
+def test_ring_buffer_close_wakes_a_waiting_consumer():
+    buf = RingBuffer(2)
+    buf.close()
+    assert buf.get(timeout=1) is None
+    assert buf.put(1) is False
+
+def test_file_is_processed_in_full_and_matches_sequential_blur(tmp_path):
+    video = tmp_path / "faces.avi"
+    write_face_video(video)
+    finished = []
+    report = BlurPipeline(str(video), output_path=str(tmp_path / "out.avi"),
+                          on_frame=lambda f: finished.append(f.image.copy())).run()
+
+    assert report["frames_read"] == report["frames_processed"] == report["frames_written"] == 12
+    assert report["dropped"] == 0
+    assert {"capture", "detect", "blur", "write", "end_to_end"} <= set(report["stages"])
+    assert len(read_frames(tmp_path / "out.avi")) == 12
+
+    detector = FaceDetector(max_side=640, min_size=(40, 40))
+    for expected, got in zip(read_frames(video), finished):
+        faces = detector.detect(expected)
+        assert len(faces) == 1
+        assert np.array_equal(blur_faces(expected, faces), got)
+
+def test_max_frames_and_no_output(tmp_path):
+    video = tmp_path / "faces.avi"
+    write_face_video(video)
+    report = BlurPipeline(str(video), max_frames=5).run()
+    assert (report["frames_read"], report["frames_written"]) == (5, 0)
+
+def test_unopenable_source_raises(tmp_path):
+    with pytest.raises(IOError):
+        BlurPipeline(str(tmp_path / "missing.avi")).run()
+
+def test_realtime_file_drops_frames_detection_cannot_keep_up_with(tmp_path):
+    class SlowDetector:
+        def detect(self, image):
+            time.sleep(0.1)
+            return np.zeros((0, 4), np.int32)
+
+    video = tmp_path / "faces.avi"
+    write_face_video(video, frames=25)  # 1 s at 25 fps; detection manages ~10
+    report = BlurPipeline(str(video), detector=SlowDetector(), queue_size=2, realtime=True).run()
+    assert report["frames_read"] == 25
+    assert report["dropped"] > 0
+    assert report["frames_processed"] == 25 - report["dropped"]
+
+def test_stage_error_stops_the_pipeline_and_is_raised_from_join(tmp_path):
+    class BrokenDetector:
+        def __init__(self):
+            self.calls = 0
+
+        def detect(self, image):
+            self.calls += 1
+            if self.calls == 3:
+                raise RuntimeError("detector failed")
+            return np.zeros((0, 4), np.int32)
+
+    video = tmp_path / "faces.avi"
+    write_face_video(video, frames=25)
+    pipeline = BlurPipeline(str(video), output_path=str(tmp_path / "out.avi"),
+                            detector=BrokenDetector(), queue_size=1)
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="detector failed"):
+        pipeline.run()
+    assert time.perf_counter() - start < 5
+    assert not pipeline.running()
+    assert pipeline.frames_read < 25
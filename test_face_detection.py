@@ -0,0 +1,58 @@
+# test_face_detection.py
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+if not hasattr(cv2, "CascadeClassifier"):
+    pytest.skip("this OpenCV build has no Haar cascades", allow_module_level=True)
+
+from common.face_detection import FaceDetector, HAAR_FACE_PATH, downscale, remap_boxes
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "program3", "images")
+
+def photos():
+    return [cv2.imread(os.path.join(IMAGES, f)) for f in sorted(os.listdir(IMAGES))]
+
+def test_downscale_only_shrinks():
+    image = np.zeros((300, 400, 3), np.uint8)
+    assert downscale(image, 640) == (image, 1.0)
+    small, scale = downscale(image, 200)
+    assert small.shape == (150, 200, 3) and scale == 0.5
+
+def test_remap_boxes_scales_and_clips():
+    boxes = remap_boxes([[10, 20, 30, 40], [180, 0, 40, 10]], 0.5, (100, 400))
+    assert boxes.tolist() == [[20, 40, 60, 60], [360, 0, 40, 20]]
+    assert remap_boxes([], 0.5, (100, 100)).shape == (0, 4)
+
+def test_small_images_match_the_plain_cascade():
+    cascade = cv2.CascadeClassifier(HAAR_FACE_PATH)
+    detector = FaceDetector(max_side=640)
+    for image in photos():
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        expected = np.asarray(cascade.detectMultiScale(gray, 1.3, 5)).reshape(-1, 4)
+        assert detector.detect(image).tolist() == expected.tolist()
+        assert detector.detect(gray).tolist() == expected.tolist()
+
+def test_downscaled_boxes_land_on_the_full_resolution_faces():
+    image = photos()[1]
+    big = cv2.resize(image, None, fx=6, fy=6, interpolation=cv2.INTER_CUBIC)
+    full = FaceDetector(max_side=None, min_size=(200, 200)).detect(big)
+    fast = FaceDetector(max_side=480, min_size=(200, 200)).detect(big)
+    assert len(full) == len(fast) == 1
+    (x1, y1, w1, h1), (x2, y2, w2, h2) = full[0], fast[0]
+    inter = max(0, min(x1 + w1, x2 + w2) - max(x1, x2)) * max(0, min(y1 + h1, y2 + h2) - max(y1, y2))
+    assert inter / (w1 * h1 + w2 * h2 - inter) > 0.7
+
+def test_size_bounds_exclude_faces():
+    image = photos()[1]
+    assert len(FaceDetector(min_size=(200, 200)).detect(image)) == 0
+    assert len(FaceDetector(max_size=(50, 50)).detect(image)) == 0
+
+def test_backend_errors():
+    with pytest.raises(ValueError):
+        FaceDetector(backend="hog")
+    with pytest.raises(FileNotFoundError):
+        FaceDetector(backend="dnn", prototxt="missing.prototxt")
@@ -0,0 +1,69 @@
+# test_face_detection_app.py
+
+import os
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+if not hasattr(cv2, "CascadeClassifier"):
+    pytest.skip("this OpenCV build has no Haar cascades", allow_module_level=True)
+
+from program3 import face_detection_app
+from program3.face_detection_app import FaceDetectionApp, LRUCache, annotate_folder, detect_features, list_images, load_cached_image
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "program3", "images")
+
+def test_lru_cache_drops_least_recently_used():
+    cache = LRUCache(capacity=2)
+    cache.put(0, "a")
+    cache.put(1, "b")
+    assert cache.get(0) == "a"  # 1 is now the least recently used
+    cache.put(2, "c")
+    assert 1 not in cache
+    assert (cache.get(0), cache.get(2), len(cache)) == ("a", "c", 2)
+
+def test_cached_image_matches_direct_detection():
+    path = os.path.join(IMAGES, list_images(IMAGES)[0])
+    cached = load_cached_image(path, max_size=300)
+    image = cv2.imread(path)
+    assert np.array_equal(cached.image, image)
+    assert np.array_equal(cached.processed, detect_features(image.copy()))
+    assert max(cached.input_thumb.size) <= 300 and cached.input_thumb.size == cached.output_thumb.size
+
+def test_unreadable_image_is_not_cached(tmp_path):
+    path = tmp_path / "broken.jpg"
+    path.write_bytes(b"not a jpeg")
+    assert load_cached_image(str(path)) is None
+
+def test_headless_folder_matches_sequential_detection(tmp_path):
+    results = annotate_folder(IMAGES, str(tmp_path), workers=4)
+    assert [f for f, _ in results] == list_images(IMAGES)
+    for filename, save_path in results:
+        name, ext = os.path.splitext(filename)
+        assert save_path == os.path.join(str(tmp_path), f"{name}_output{ext}")
+        expected = detect_features(cv2.imread(os.path.join(IMAGES, filename)))
+        assert np.array_equal(cv2.imread(save_path), cv2.imdecode(cv2.imencode(ext, expected)[1], cv2.IMREAD_COLOR))
+
+class FakeRoot:
+    # Records what the app asks of its Tk window
+    def __init__(self):
+        self.protocols = {}
+        self.destroyed = False
+
+    def title(self, text):
+        pass
+
+    def protocol(self, name, callback):
+        self.protocols[name] = callback
+
+    def destroy(self):
+        self.destroyed = True
+
+def test_closing_the_window_shuts_down_the_prefetch_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(face_detection_app, "messagebox", SimpleNamespace(showerror=lambda *args: None))
+    root = FakeRoot()
+    app = FaceDetectionApp(root, input_dir=str(tmp_path))  # no images, so it closes itself
+    assert root.destroyed and app.pool._shutdown
+    assert root.protocols["WM_DELETE_WINDOW"] == app.close
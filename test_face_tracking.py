@@ -0,0 +1,62 @@
+# test_face_tracking.py
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+if not hasattr(cv2, "CascadeClassifier"):
+    pytest.skip("this OpenCV build has no Haar cascades", allow_module_level=True)
+
+from common.face_detection import FaceDetector
+from program4.face_tracking import TrackingDetector, pad_boxes
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "program3", "images")
+
+def sliding_face(frames, step=4):
+    face = cv2.resize(cv2.imread(os.path.join(IMAGES, "person2.jpg")), (160, 190))
+    for i in range(frames):
+        frame = np.full((360, 640, 3), 110, dtype=np.uint8)
+        frame[80:270, 40 + step * i:200 + step * i] = face
+        yield frame
+
+def test_pad_boxes_grows_and_clips():
+    boxes = pad_boxes([[10, 10, 100, 50], [0, 0, 20, 20]], 0.2, (100, 120))
+    assert boxes.tolist() == [[0, 0, 120, 70], [0, 0, 24, 24]]
+    assert pad_boxes([], 0.2, (100, 100)).shape == (0, 4)
+
+class CountingDetector:
+    def __init__(self):
+        self.detector = FaceDetector(max_side=640)
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        return self.detector.detect(image)
+
+def test_tracked_boxes_keep_covering_a_moving_face():
+    inner = CountingDetector()
+    tracker = TrackingDetector(inner, every=10, pad=0.2)
+    reference = FaceDetector(max_side=640)
+    for frame in sliding_face(30):
+        boxes = tracker.detect(frame)
+        (x, y, w, h), = reference.detect(frame)
+        assert len(boxes) == 1
+        bx, by, bw, bh = boxes[0]
+        assert bx <= x and by <= y and bx + bw >= x + w and by + bh >= y + h
+    assert inner.calls == tracker.detections == 3
+
+def test_motion_outside_faces_triggers_detection():
+    inner = CountingDetector()
+    tracker = TrackingDetector(inner, every=100)
+    frames = list(sliding_face(6))
+    for frame in frames[:3]:
+        tracker.detect(frame)
+    assert inner.calls == 1
+
+    # Something appears away from the tracked face
+    changed = frames[3].copy()
+    changed[:, 450:] = 255
+    tracker.detect(changed)
+    assert inner.calls == 2
@@ -0,0 +1,35 @@
+# test_image_index.py
+
+import os
+import datetime
+from q1.image_index import parse_filename, build_index, filter_index, ground_truth_plates
+
+TRAFFIC_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "q1", "traffic_images")
+
+def test_parse_filename():
+    fields = parse_filename("20250917.071629.915.J001A1.SL.FR.JUM5353.NaN.jpg")
+    assert fields == {
+        "timestamp": datetime.datetime(2025, 9, 17, 7, 16, 29, 915000),
+        "camera": "J001A1",
+        "lane": "SL",
+        "direction": "FR",
+        "plate": "JUM5353",
+    }
+    assert parse_filename("20250901.153410.209.J001A1.SL.FR.NaN.NaN.jpg")["plate"] is None
+    assert parse_filename("person1.jpg") is None
+
+def test_index_walks_subfolders():
+    index = build_index(TRAFFIC_IMAGES)
+    assert {r.folder for r in index} == {"car", "truck images"}
+    assert all(r.camera == "J001A1" for r in index)
+
+def test_filters():
+    index = build_index(TRAFFIC_IMAGES)
+    rear = filter_index(index, directions="RE")
+    assert rear and all(r.direction == "RE" for r in rear)
+
+    day = filter_index(index, start=datetime.datetime(2025, 9, 17), end=datetime.datetime(2025, 9, 18))
+    assert day and all(r.timestamp.date() == datetime.date(2025, 9, 17) for r in day)
+
+    truth = ground_truth_plates(filter_index(index, has_plate=True))
+    assert truth["truck images/20250917.090445.972.J001A1.FL.FR.BPE4281.NaN.jpg"] == "BPE4281"
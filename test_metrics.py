@@ -0,0 +1,97 @@
+# test_metrics.py
+
+import json
+
+from common.metrics import BUCKETS, NULL_TIMER, Histogram, Metrics
+
+def test_disabled_records_nothing():
+    m = Metrics(enabled=False)
+    assert m.stage("a") is NULL_TIMER
+    with m.stage("a"):
+        pass
+    m.observe("b", 0.1)
+    m.count("c")
+    assert m.to_dict() == {"stages": {}, "counters": {}}
+
+def test_stage_and_count_when_enabled():
+    m = Metrics(enabled=True)
+    for _ in range(3):
+        with m.stage("decode"):
+            pass
+    m.count("images")
+    m.count("vehicles", 4)
+    data = m.to_dict()
+    assert data["stages"]["decode"]["count"] == 3
+    assert data["counters"] == {"images": 1, "vehicles": 4}
+
+    m.reset()
+    assert m.to_dict() == {"stages": {}, "counters": {}}
+
+def test_stage_records_when_the_block_raises():
+    m = Metrics(enabled=True)
+    try:
+        with m.stage("fails"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert m.to_dict()["stages"]["fails"]["count"] == 1
+
+def test_timed_decorator():
+    m = Metrics(enabled=True)
+
+    @m.timed("double")
+    def double(x):
+        return 2 * x
+
+    assert double(4) == 8
+    assert double.__name__ == "double"
+    assert m.to_dict()["stages"]["double"]["count"] == 1
+
+def test_histogram_buckets_and_quantiles():
+    h = Histogram()
+    for ms in range(1, 101):
+        h.observe(ms / 1000)
+    data = h.to_dict()
+    assert data["count"] == 100
+    assert abs(data["sum"] - 5.05) < 1e-9
+    assert sum(data["buckets"].values()) == 100
+    assert data["min"] == 0.001 and data["max"] == 0.1
+    # Bucket estimates land in the right bucket
+    assert 0.025 < data["p50"] <= 0.05
+    assert 0.05 < data["p95"] <= 0.1
+    assert len(data["buckets"]) == len(BUCKETS)
+
+def test_quantile_of_the_overflow_bucket_stays_within_max():
+    h = Histogram()
+    h.observe(30.0)
+    assert h.quantile(0.5) == 30.0
+    assert h.to_dict()["buckets"]["+Inf"] == 1
+
+def test_prometheus_text():
+    m = Metrics(enabled=True)
+    m.observe("q1.decode", 0.003)
+    m.observe("q1.decode", 0.2)
+    m.count("q1.images", 2)
+    text = m.to_prometheus()
+    assert "# TYPE vision_stage_seconds histogram" in text
+    assert 'vision_stage_seconds_bucket{stage="q1.decode",le="0.005"} 1' in text
+    assert 'vision_stage_seconds_bucket{stage="q1.decode",le="+Inf"} 2' in text
+    assert 'vision_stage_seconds_count{stage="q1.decode"} 2' in text
+    assert 'vision_events_total{name="q1.images"} 2' in text
+
+def test_report_writes_json_and_prometheus(tmp_path, capsys, monkeypatch):
+    m = Metrics(enabled=True)
+    m.observe("q7.inference", 0.04)
+    m.report(str(tmp_path / "run.json"))
+    data = json.loads((tmp_path / "run.json").read_text())
+    assert data["stages"]["q7.inference"]["count"] == 1
+    assert "q7.inference" in capsys.readouterr().out
+
+    monkeypatch.setenv("VISION_METRICS_OUT", str(tmp_path / "run.prom"))
+    m.report()
+    assert "vision_stage_seconds_sum" in (tmp_path / "run.prom").read_text()
+
+def test_report_is_silent_when_disabled(tmp_path, capsys):
+    Metrics(enabled=False).report(str(tmp_path / "run.json"))
+    assert capsys.readouterr().out == ""
+    assert not (tmp_path / "run.json").exists()
@@ -0,0 +1,120 @@
+# test_pipeline.py
+
+import os
+import sys
+import glob
+import shutil
+import threading
+
+import cv2
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+from stub_models import StubYolo
+from common import model_registry
+from common.image_loader import ScaledImage
+from q1 import pipeline
+from q1.pipeline import analyze_folder_pipelined, analyze_folder_sharded
+from q1.vehicle_attribute import analyze_folder
+
+CARS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "q1", "traffic_images", "car")
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    # Fixed boxes from benchmarks/stub_models.py in place of the YOLO weights
+    monkeypatch.setitem(model_registry.LOADERS, "yolo", StubYolo)
+    model_registry.clear()
+    yield
+    model_registry.clear()
+
+@pytest.fixture
+def images(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for path in sorted(glob.glob(os.path.join(CARS, "*.jpg")))[:4]:
+        shutil.copy(path, folder)
+    (folder / "corrupt.jpg").write_bytes(b"not a jpeg")
+    return str(folder)
+
+def run(fn, images, out, capsys, **options):
+    fn(images, save_json=True, json_folder=str(out / "json"), annotated_folder=str(out / "annotated"),
+       result_store=str(out / "vehicles.csv"), **options)
+    return capsys.readouterr().out
+
+def outputs(out):
+    # Every file written, relative path -> bytes
+    files = {}
+    for path in sorted(glob.glob(str(out / "**" / "*"), recursive=True)):
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, out)] = f.read()
+    return files
+
+@pytest.mark.parametrize("decode_reduce", [1, 2])
+def test_pipelined_matches_serial(stub_models, images, tmp_path, capsys, decode_reduce):
+    serial = run(analyze_folder, images, tmp_path / "serial", capsys, decode_reduce=decode_reduce)
+    pipelined = run(analyze_folder_pipelined, images, tmp_path / "pipelined", capsys,
+                    decode_reduce=decode_reduce, decode_workers=3, write_workers=2, queue_size=2)
+
+    assert pipelined == serial
+    assert "Warning: Could not read" in serial
+    serial_files, pipelined_files = outputs(tmp_path / "serial"), outputs(tmp_path / "pipelined")
+    assert len(serial_files) == 2 * 4 + 1  # JSON and annotated image per readable image, plus the CSV
+    assert pipelined_files == serial_files
+    if decode_reduce > 1:
+        first = sorted(os.listdir(images))[0]
+        assert cv2.imread(str(tmp_path / "pipelined" / "annotated" / first)).shape[1] == 2048 // decode_reduce
+
+def test_sharded_matches_serial(stub_models, images, tmp_path, capsys):
+    serial = run(analyze_folder, images, tmp_path / "serial", capsys)
+    sharded = run(analyze_folder_sharded, images, tmp_path / "sharded", capsys,
+                  processes=2, start_method="fork", chunksize=1)
+
+    # imap hands results back in input order
+    assert sharded == serial
+    assert outputs(tmp_path / "sharded") == outputs(tmp_path / "serial")
+
+def test_sharded_skips_a_file_that_fails_in_a_worker(stub_models, images, tmp_path, capsys, monkeypatch):
+    def fragile_decode(path, *args, **kwargs):
+        if path.endswith("corrupt.jpg"):
+            raise OSError("corrupt JPEG data")
+        return ScaledImage(path, *args, **kwargs)
+
+    # Forked workers inherit the patched decoder
+    monkeypatch.setattr(pipeline, "ScaledImage", fragile_decode)
+    out = run(analyze_folder_sharded, images, tmp_path / "sharded", capsys,
+              processes=2, start_method="fork", chunksize=1)
+
+    assert "Warning: Could not analyze" in out and "OSError: corrupt JPEG data" in out
+    assert out.count("Results for ") == 4
+    assert len(glob.glob(str(tmp_path / "sharded" / "json" / "*.json"))) == 4
+
+class FailingStore:
+    def write(self, filename, result):
+        raise OSError("No space left on device")
+
+    def close(self):
+        pass
+
+def test_pipelined_raises_when_the_store_fails(stub_models, images, tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "open_store", lambda store, filenames, resume: (FailingStore(), filenames))
+    raised = []
+
+    def call():
+        try:
+            analyze_folder_pipelined(images, json_folder=str(tmp_path / "json"), save_annotated=False,
+                                     print_results=False, result_store="unused", queue_size=1, write_workers=1)
+        except OSError as e:
+            raised.append(e)
+
+    # A dead writer thread used to leave the other stages blocked for good
+    t = threading.Thread(target=call, daemon=True)
+    t.start()
+    t.join(timeout=60)
+    assert not t.is_alive()
+    assert [str(e) for e in raised] == ["No space left on device"]
+
+@pytest.mark.parametrize("fn", [analyze_folder_pipelined, analyze_folder_sharded])
+def test_cache_path_is_rejected(fn, images, tmp_path):
+    with pytest.raises(ValueError, match="cache_path"):
+        fn(images, cache_path=str(tmp_path / "cache.sqlite"))
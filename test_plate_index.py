@@ -0,0 +1,59 @@
+# test_plate_index.py
+
+import random
+
+import pytest
+
+from q5.plate_index import PlateIndex, levenshtein, similarity
+from q5.string_similarity import compare_strings
+
+def random_plate(rng):
+    return "".join(rng.choices("ABCDEF0123", k=rng.randint(5, 9)))
+
+def linear_search(watchlist, query, threshold, metric):
+    scored = [(i, similarity(query, p, metric)) for i, p in enumerate(watchlist)]
+    scored = [(i, s) for i, s in scored if s >= threshold]
+    scored.sort(key=lambda x: (-x[1], x[0]))
+    return [(watchlist[i], s) for i, s in scored]
+
+@pytest.fixture(scope="module")
+def watchlist():
+    rng = random.Random(0)
+    return [random_plate(rng) for _ in range(1000)]
+
+@pytest.fixture(scope="module")
+def queries(watchlist):
+    rng = random.Random(1)
+    dropped = [p[:2] + p[3:] for p in watchlist[:15]]
+    extended = [p + "Z" for p in watchlist[15:30]]
+    return [random_plate(rng) for _ in range(30)] + dropped + extended + ["AAAAAAAAAAAA", "AB CD"]
+
+@pytest.mark.parametrize("metric", ["positional", "edit"])
+@pytest.mark.parametrize("threshold", [50, 70, 85, 100])
+def test_index_matches_linear_scan(watchlist, queries, metric, threshold):
+    index = PlateIndex(watchlist, metric)
+    for q in queries:
+        assert index.search(q, threshold) == linear_search(watchlist, q, threshold, metric)
+
+def test_positional_scores_are_compare_strings():
+    index = PlateIndex(["JUM5353", "JUM5358", "WA1234B"])
+    assert index.search("JUM535", threshold=0) == [
+        (p, compare_strings("JUM535", p)[4]) for p in ["JUM5353", "JUM5358", "WA1234B"]]
+
+def test_edit_metric_forgives_a_dropped_character():
+    watchlist = ["PUTRAJAYA9558", "VMY6667"]
+    assert PlateIndex(watchlist, "positional").search("PUTRJAYA9558", threshold=80) == []
+    assert PlateIndex(watchlist, "edit").search("PUTRJAYA9558", threshold=80) == [
+        ("PUTRAJAYA9558", (12 / 13) * 100)]
+
+def test_levenshtein():
+    assert levenshtein("KITTEN", "SITTING") == 3
+    assert levenshtein("", "ABC") == 3
+    assert levenshtein("ABC", "ABC") == 0
+
+def test_edge_cases():
+    index = PlateIndex(["ABC123"], "edit")
+    assert index.search("") == []
+    assert PlateIndex([]).search("ABC123") == []
+    with pytest.raises(ValueError):
+        PlateIndex(["ABC123"], "hamming")
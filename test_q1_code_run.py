@@ -0,0 +1,86 @@
+# test_q1_code_run.py
+
+import os
+import sys
+import shutil
+
+import cv2
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+from stub_models import StubYolo
+from assignment_part_a import Q1_code
+
+@pytest.fixture(autouse=True)
+def stub_model(monkeypatch):
+    # Fixed plate boxes from benchmarks/stub_models.py in place of LP-detection.pt
+    monkeypatch.setattr(Q1_code, "model", StubYolo(Q1_code.model_path))
+
+def serial_run(front_dir, rear_dir, output_dir):
+    # The one-pair-at-a-time loop Q1_code.py used to run; returns the report
+    # CSV text and the lines it printed
+    rows, printed = ["Car Image,Broken Front,Broken Rear"], []
+    for f_file, r_file in Q1_code.list_pairs(front_dir, rear_dir):
+        front_img = cv2.imread(os.path.join(front_dir, f_file))
+        rear_img = cv2.imread(os.path.join(rear_dir, r_file))
+        if front_img is None or rear_img is None:
+            printed.append(f"Skipping {f_file} or {r_file} due to load error.")
+            continue
+
+        broken = []
+        for img in (front_img, rear_img):
+            boxes = Q1_code.detect_license_plate(Q1_code.preprocess_image(img))
+            bbox, label = Q1_code.plate_region(img, boxes)
+            count, _ = Q1_code.detect_broken_characters(Q1_code.crop_plate(img, bbox))
+            if boxes:
+                cv2.rectangle(img, bbox[:2], bbox[2:], (0, 255, 0), 2)
+            cv2.putText(img, label.format(count), (bbox[0], bbox[1] - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+            broken.append(count)
+
+        if broken[0] > 0 or broken[1] > 0:
+            cv2.imwrite(os.path.join(output_dir, f"broken_{f_file}"), Q1_code.stitch_images(front_img, rear_img))
+            rows.append(f"{f_file},{'Yes' if broken[0] > 0 else 'No'},{'Yes' if broken[1] > 0 else 'No'}")
+            printed.append(f"Saved stitched broken plate for {f_file}: Front={broken[0]}, Rear={broken[1]}")
+    return "\n".join(rows) + "\n", printed
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def printed_lines(out):
+    return [line for line in out.splitlines() if line.startswith(("Saved", "Skipping"))]
+
+def test_run_matches_the_serial_loop(tmp_path, capsys):
+    os.makedirs(tmp_path / "serial")
+    expected_csv, expected_printed = serial_run(Q1_code.front_folder, Q1_code.rear_folder, str(tmp_path / "serial"))
+    capsys.readouterr()
+    assert len(expected_printed) > 1
+
+    out = str(tmp_path / "run")
+    for _ in range(2):  # the second run answers from the cache
+        stats = Q1_code.run(Q1_code.front_folder, Q1_code.rear_folder, out, workers=3, batch_pairs=2)
+        assert read(stats["report_path"]).decode() == expected_csv
+    assert stats["pairs"] == len(Q1_code.list_pairs(Q1_code.front_folder, Q1_code.rear_folder))
+
+    # Saved lines come from the first run only, in pair order
+    assert printed_lines(capsys.readouterr().out) == expected_printed
+    for name in os.listdir(tmp_path / "serial"):
+        assert read(os.path.join(out, name)) == read(tmp_path / "serial" / name)
+
+def test_unreadable_pair_is_skipped(tmp_path, capsys):
+    front, rear = tmp_path / "front", tmp_path / "rear"
+    front.mkdir()
+    rear.mkdir()
+    for f_file, r_file in Q1_code.list_pairs(Q1_code.front_folder, Q1_code.rear_folder)[:2]:
+        shutil.copy(os.path.join(Q1_code.front_folder, f_file), front)
+        shutil.copy(os.path.join(Q1_code.rear_folder, r_file), rear)
+    # A directory with an image name makes read_bytes raise IsADirectoryError
+    (front / "zz.jpg").mkdir()
+    shutil.copy(os.path.join(Q1_code.rear_folder, r_file), rear / "zz.jpg")
+
+    stats = Q1_code.run(str(front), str(rear), str(tmp_path / "out"), workers=2, batch_pairs=1, use_cache=False)
+    assert stats["pairs"] == 3
+    assert "Skipping zz.jpg or zz.jpg due to load error." in capsys.readouterr().out
+    with open(stats["report_path"]) as f:
+        assert len(f.readlines()) == 3
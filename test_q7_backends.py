@@ -0,0 +1,93 @@
+# test_q7_backends.py
+
+import os
+
+import pytest
+
+torch = pytest.importorskip("torch")
+models = pytest.importorskip("torchvision.models")
+
+from PIL import Image
+
+from common.model_registry import LOADERS
+from q7 import backends
+from q7.backends import BACKENDS, CONVERSIONS, backend_kind, to_dynamic_int8, top1_dog_parity
+from q7 import cat_dog_classifier
+from q7.batch_classifier import list_images
+
+IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "q7", "test_images")
+
+# Libraries a backend needs beyond torch
+REQUIRES = {"onnx": ["onnx", "onnxruntime"]}
+
+@pytest.fixture(scope="module")
+def fp32():
+    torch.manual_seed(0)
+    return models.resnet18(weights=None).eval()
+
+def test_every_backend_is_registered():
+    for backend in BACKENDS:
+        assert backend_kind(backend) in LOADERS
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        cat_dog_classifier.use_backend("fp4")
+
+def test_use_backend_switches_the_model():
+    old = cat_dog_classifier.model
+    try:
+        model = cat_dog_classifier.use_backend("torchscript")
+        assert cat_dog_classifier.model is model
+        assert model.kind == "resnet18-torchscript" and not model.loaded
+    finally:
+        cat_dog_classifier.model = old
+        cat_dog_classifier.CONFIG["backend"] = "eager"
+
+@pytest.fixture(scope="module")
+def sample_batch():
+    images = torch.stack([cat_dog_classifier.transform(Image.open(p).convert("RGB")) for p in list_images(IMAGES)])
+    return torch.cat([images, images.flip(3)])
+
+@pytest.fixture
+def onnx_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(backends, "ONNX_DIR", str(tmp_path))
+    return tmp_path
+
+@pytest.mark.parametrize("backend", list(CONVERSIONS))
+def test_backend_keeps_top1_class(fp32, sample_batch, onnx_dir, backend):
+    # Every backend that converts the eager model, on the sample images.
+    # static_int8 loads separate pre-quantized weights, so it can't be
+    # compared with the untrained model used here.
+    for module in REQUIRES.get(backend, []):
+        pytest.importorskip(module)
+    candidate = CONVERSIONS[backend](fp32)
+    with torch.inference_mode():
+        expected = fp32(sample_batch).argmax(dim=1)
+        got = candidate(sample_batch).argmax(dim=1)
+    assert got.tolist() == expected.tolist()
+
+    agree, total, disagree = top1_dog_parity(fp32, candidate, [sample_batch])
+    assert (agree, disagree) == (total, [])
+
+def test_onnx_export_follows_the_weights(fp32, onnx_dir):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    first = backends.onnx_path(fp32)
+    backends.to_onnx(fp32)
+    assert os.path.exists(first)
+
+    changed = models.resnet18(weights=None).eval()
+    changed.load_state_dict(fp32.state_dict())
+    with torch.no_grad():
+        changed.fc.bias += 1
+    assert backends.onnx_path(changed) != first
+
+    with torch.inference_mode():
+        batch = torch.randn(2, 3, 224, 224)
+        assert torch.allclose(backends.to_onnx(changed)(batch), changed(batch), atol=1e-3)
+    assert len(list(onnx_dir.glob("resnet18-*.onnx"))) == 2
+
+def test_dynamic_int8_returns_logits(fp32):
+    with torch.inference_mode():
+        logits = to_dynamic_int8(fp32)(torch.randn(2, 3, 224, 224))
+    assert logits.shape == (2, 1000) and logits.dtype == torch.float32
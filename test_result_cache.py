@@ -0,0 +1,52 @@
+# test_result_cache.py
+
+from common.result_cache import ResultCache, fingerprint
+
+def test_hits_misses_and_time_saved(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with ResultCache(path, "fp1") as cache:
+        assert cache.get("img-a") is None
+        cache.put("img-a", {"vehicle_count": 2}, elapsed=1.5)
+
+    # A new run (new connection) picks up what the last one stored
+    with ResultCache(path, "fp1") as cache:
+        assert cache.get("img-a") == {"vehicle_count": 2}
+        assert cache.get("img-b") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.time_saved == 1.5
+
+def test_new_fingerprint_only_misses_its_own_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with ResultCache(path, "old") as cache:
+        cache.put("img-a", [1, 0], elapsed=0.1)
+
+    with ResultCache(path, "new") as cache:
+        assert cache.get("img-a") is None
+        cache.put("img-a", [2, 0], elapsed=0.1)
+
+    with ResultCache(path, "old") as cache:
+        assert cache.get("img-a") == [1, 0]
+        assert cache.prune() == 1
+
+def test_fingerprint_tracks_weights_and_config(tmp_path):
+    weights = tmp_path / "model.pt"
+    weights.write_bytes(b"v1")
+    base = fingerprint([str(weights)], {"conf": 0.25})
+
+    assert fingerprint([str(weights)], {"conf": 0.25}) == base
+    assert fingerprint([str(weights)], {"conf": 0.5}) != base
+    weights.write_bytes(b"v2")
+    assert fingerprint([str(weights)], {"conf": 0.25}) != base
+
+def test_other_fingerprints_are_kept_apart_and_not_counted(tmp_path):
+    with ResultCache(str(tmp_path / "cache.sqlite"), "result") as cache:
+        cache.put("img-a", [[10, 20]], 0.0, "stage")
+        assert cache.get("img-a") is None
+        assert cache.get("img-a", "stage") == [[10, 20]]
+        assert cache.get("img-b", "stage") is None
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        cache.put("img-a", {"vehicle_count": 1}, elapsed=0.5)
+        cache.put("img-a", [], 0.0, "old-stage")
+        assert cache.prune(keep=["stage"]) == 1
+        assert cache.get("img-a", "stage") == [[10, 20]]
@@ -0,0 +1,67 @@
+# test_result_store.py
+
+import csv
+
+import pytest
+
+from q1.result_store import CsvResultWriter, ParquetResultWriter, COLUMNS, processed_images
+
+def make_result(vehicle_count):
+    vehicles = [{
+        "type": "car", "bbox": [0, 0, 10, 10], "color": "white", "lane": "Left",
+        "make": None, "logo_bbox": None, "license_plate_present": False,
+        "license_plate_bbox": None, "license_plate_color": None,
+    } for _ in range(vehicle_count)]
+    return {"vehicle_count": vehicle_count, "vehicles": vehicles}
+
+def test_csv_rows_and_resume(tmp_path):
+    path = str(tmp_path / "vehicles.csv")
+    with CsvResultWriter(path, batch_size=2) as writer:
+        writer.write("a.jpg", make_result(3))
+        writer.write("empty.jpg", make_result(0))
+
+    # Appending keeps the existing rows and writes no second header
+    with CsvResultWriter(path, append=True) as writer:
+        writer.write("b.jpg", make_result(1))
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert list(rows[0]) == COLUMNS
+    assert [r["image"] for r in rows] == ["a.jpg"] * 3 + ["empty.jpg", "b.jpg"]
+    assert rows[3]["vehicle_index"] == "-1"
+    assert processed_images(path) == {"a.jpg", "empty.jpg", "b.jpg"}
+
+def test_overwrite_without_append(tmp_path):
+    path = str(tmp_path / "vehicles.csv")
+    with CsvResultWriter(path) as writer:
+        writer.write("a.jpg", make_result(1))
+    with CsvResultWriter(path, append=False) as writer:
+        writer.write("b.jpg", make_result(1))
+
+    assert processed_images(path) == {"b.jpg"}
+
+def test_parquet_round_trip_with_all_none_batches(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "vehicles")
+
+    # The first batch has no logo or plate at all, the second has both
+    with_logo = make_result(1)
+    with_logo["vehicles"][0].update({"make": "toyota", "logo_bbox": [1.5, 2, 3, 4],
+                                     "license_plate_present": True, "license_plate_bbox": [5, 6, 7, 8],
+                                     "license_plate_color": "yellow"})
+    with ParquetResultWriter(path, batch_size=1) as writer:
+        writer.write("a.jpg", make_result(1))
+        writer.write("empty.jpg", make_result(0))
+        writer.write("b.jpg", with_logo)
+
+    table = pq.read_table(path)
+    assert table.column_names == COLUMNS
+    rows = table.to_pylist()
+    assert [r["image"] for r in rows] == ["a.jpg", "empty.jpg", "b.jpg"]
+    assert rows[0]["make"] is None and rows[0]["logo_x1"] is None
+    assert rows[1]["vehicle_index"] == -1
+    assert rows[2]["make"] == "toyota"
+    assert [rows[2][c] for c in ["logo_x1", "logo_y1", "plate_x2", "plate_y2"]] == [1.5, 2.0, 7.0, 8.0]
+    assert rows[2]["license_plate_present"] is True
+    assert processed_images(path) == {"a.jpg", "empty.jpg", "b.jpg"}
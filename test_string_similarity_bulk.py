@@ -0,0 +1,48 @@
+# test_string_similarity_bulk.py
+
+import random
+import string
+
+import numpy as np
+import pytest
+
+from q5.string_similarity import compare_strings, compare_strings_bulk
+from test_license_plate_similarity import test_cases
+
+def assert_same_as_pairwise(strings1, strings2, **kwargs):
+    matches, similarity, lines = compare_strings_bulk(strings1, strings2, match_lines=True, **kwargs)
+    for i, (s1, s2) in enumerate(zip(strings1, strings2)):
+        _, _, match_line, expected_matches, expected_similarity = compare_strings(s1, s2)
+        assert matches[i] == expected_matches
+        assert similarity[i] == expected_similarity  # bit-for-bit, not approx
+        assert lines[i] == match_line
+
+def test_matches_compare_strings_on_plate_pairs():
+    strings1 = [s1 for s1, _, _ in test_cases]
+    strings2 = [s2 for _, s2, _ in test_cases]
+    assert_same_as_pairwise(strings1, strings2)
+
+def test_matches_across_chunks_lengths_and_spaces():
+    rng = random.Random(0)
+    alphabet = string.ascii_uppercase + string.digits + " "
+    strings1 = [''.join(rng.choices(alphabet, k=rng.randint(1, 12))) for _ in range(3000)]
+    strings2 = [''.join(rng.choices(alphabet, k=rng.randint(0, 12))) for _ in range(3000)]
+    assert_same_as_pairwise(strings1, strings2, chunk_size=700)
+
+def test_non_ascii_falls_back_to_code_points():
+    assert_same_as_pairwise(["ÄBC123", "JUM5353"], ["ÄBD123", "JUM 535"])
+
+def test_match_lines_are_optional():
+    result = compare_strings_bulk(["ABC123"], ["ABD124"])
+    assert len(result) == 2
+    matches, similarity = result
+    assert matches.tolist() == [4]
+    assert np.isclose(similarity[0], 4 / 6 * 100)
+
+def test_bad_input():
+    with pytest.raises(ValueError):
+        compare_strings_bulk(["A"], ["A", "B"])
+    with pytest.raises(ZeroDivisionError):
+        compare_strings_bulk([""], [""])
+    matches, similarity = compare_strings_bulk([], [])
+    assert len(matches) == len(similarity) == 0
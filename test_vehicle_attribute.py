@@ -0,0 +1,148 @@
+# test_vehicle_attribute.py
+
+import os
+import sys
+import glob
+import shutil
+from collections import Counter
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+from stub_models import StubBoxes, StubResult, StubYolo
+from common import model_registry
+from common.image_loader import ScaledImage
+from q1 import vehicle_attribute
+from q1.vehicle_attribute import VehicleSceneAnalyzer, analyze_folder, letterbox, model_path, unletterbox_bbox
+
+Q1 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "q1")
+
+class CountingYolo(StubYolo):
+    # Counts calls per weight file name
+    calls = Counter()
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.name = os.path.basename(name)
+
+    def __call__(self, source, **kwargs):
+        CountingYolo.calls[self.name] += 1
+        return super().__call__(source, **kwargs)
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    monkeypatch.setitem(model_registry.LOADERS, "yolo", CountingYolo)
+    model_registry.clear()
+    CountingYolo.calls.clear()
+    yield CountingYolo.calls
+    model_registry.clear()
+
+@pytest.fixture
+def images(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for path in sorted(glob.glob(os.path.join(Q1, "traffic_images", "car", "*.jpg")))[:2]:
+        shutil.copy(path, folder)
+    return str(folder)
+
+def test_model_paths_do_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert model_path("best.pt") == os.path.join(Q1, "traffic_images", "best.pt")
+    assert model_path("yolov8n.pt") == os.path.join(Q1, "yolov8n.pt")
+    assert model_path("missing.pt") == "missing.pt"
+    for path in vehicle_attribute.MODEL_FILES:
+        assert os.path.isabs(path) and os.path.exists(path)
+
+def test_new_logo_weights_only_rerun_the_logo_model(stub_models, images, tmp_path, monkeypatch, capsys):
+    weights = tmp_path / "yolo11n.pt"
+    weights.write_bytes(b"v1")
+    monkeypatch.setattr(vehicle_attribute, "LOGO_MODEL", str(weights))
+    cache = str(tmp_path / "cache.sqlite")
+
+    def run():
+        stub_models.clear()
+        analyze_folder(images, save_annotated=False, cache_path=cache)
+        return capsys.readouterr().out
+
+    first = run()
+    assert stub_models["yolov8n.pt"] == 2
+    assert run().splitlines()[:-1] == first.splitlines()[:-1]  # all but the cache summary
+    assert sum(stub_models.values()) == 0
+
+    weights.write_bytes(b"v2")
+    assert run().splitlines()[:-1] == first.splitlines()[:-1]
+    assert stub_models["yolo11n.pt"] > 0
+    assert stub_models["yolov8n.pt"] == stub_models["best.pt"] == 0
+
+# Non-square rois (h, w) with a bright box (x1, y1, x2, y2) in each
+ROIS = [((120, 300), (40, 30, 210, 95)),
+        ((300, 90), (10, 150, 80, 290)),
+        ((37, 641), (500, 0, 641, 20)),
+        ((900, 500), (0, 0, 499, 17))]
+
+def roi_with_box(shape, bbox):
+    roi = np.zeros((*shape, 3), np.uint8)
+    x1, y1, x2, y2 = bbox
+    roi[y1:y2, x1:x2] = 255
+    return roi
+
+def bright_box(img):
+    # (x1, y1, x2, y2) around the pixels brighter than the letterbox padding
+    ys, xs = np.nonzero(img[:, :, 0] > 185)
+    return xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+
+def within_one_pixel(a, b):
+    return max(abs(u - v) for u, v in zip(a, b)) <= 1
+
+@pytest.mark.parametrize("size", [640, 320])
+@pytest.mark.parametrize("shape, bbox", ROIS)
+def test_letterbox_round_trip(shape, bbox, size):
+    canvas, scale, pad = letterbox(roi_with_box(shape, bbox), size)
+    assert canvas.shape == (size, size, 3)
+    back = unletterbox_bbox(bright_box(canvas), scale, pad, shape)
+    assert within_one_pixel(back, bbox)
+    assert all(type(v) is int for v in back)
+
+class BrightBoxModel:
+    # Finds the bright box in each (letterboxed) input, as a detector would
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, images, **kwargs):
+        self.batches.append([img.shape for img in images])
+        return [StubResult(StubBoxes(np.array([bright_box(img)], np.float32), np.zeros(1), np.ones(1)))
+                for img in images]
+
+def test_detect_batched_maps_boxes_back_to_each_roi():
+    analyzer = VehicleSceneAnalyzer(batched=True, batch_size=3, imgsz=320)
+    model = BrightBoxModel()
+    boxes = analyzer.detect_batched(model, [roi_with_box(shape, bbox) for shape, bbox in ROIS])
+
+    assert model.batches == [[(320, 320, 3)] * 3, [(320, 320, 3)]]
+    for (xyxy, cls_id), (_, bbox) in zip(boxes, ROIS):
+        assert cls_id == 0 and within_one_pixel(xyxy, bbox)
+
+@pytest.mark.parametrize("imgsz, crop_scale", [(200, 4), (640, 1)])
+def test_reduced_decode_boxes_are_full_resolution_ints(stub_models, tmp_path, imgsz, crop_scale):
+    # imgsz=200 crops the vehicles from the 1/4 frame, imgsz=640 from a full decode
+    path = str(tmp_path / "frame.jpg")
+    cv2.imwrite(path, np.random.default_rng(0).integers(0, 255, (1500, 2000, 3), np.uint8))
+    analyzer = VehicleSceneAnalyzer(imgsz=imgsz)
+    expected = analyzer.analyze(cv2.imread(path))
+
+    scaled = ScaledImage(path, reduce=4)
+    vehicles = [(cls_name, scaled.to_full(bbox)) for cls_name, bbox in analyzer.detect_vehicles(scaled.image)]
+    rois, scales = scaled.crops([bbox for _, bbox in vehicles], min_side=imgsz)
+    assert scales == [crop_scale] * len(vehicles)
+    for (_, (x1, y1, x2, y2)), roi in zip(vehicles, rois):
+        assert abs(roi.shape[1] * crop_scale - (x2 - x1)) <= 4 and abs(roi.shape[0] * crop_scale - (y2 - y1)) <= 4
+
+    result = analyzer.analyze_scaled(scaled)
+    assert result["vehicle_count"] == expected["vehicle_count"] == 2
+    for got, want in zip(result["vehicles"], expected["vehicles"]):
+        for field in ("bbox", "logo_bbox", "license_plate_bbox"):
+            assert all(type(v) is int for v in got[field])
+            assert all(abs(u - v) <= 2 * 4 for u, v in zip(got[field], want[field]))
+        assert got["bbox"][2] <= 2000 and got["bbox"][3] <= 1500
@@ -0,0 +1,71 @@
+# test_yolo_postprocess.py
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from common.yolo_postprocess import box_mask, best_box, bbox_tuples, class_ids, postprocess
+
+class Boxes:
+    def __init__(self, rows):
+        self.xyxy, self.cls, self.conf = rows[:, :4], rows[:, 4], rows[:, 5]
+
+    def __len__(self):
+        return len(self.xyxy)
+
+def result(rows):
+    # A YOLO-like result from (x1, y1, x2, y2, cls, conf) rows
+    return SimpleNamespace(boxes=Boxes(np.asarray(rows, np.float32).reshape(-1, 6)))
+
+def test_box_mask_filters():
+    xyxy = np.array([[0, 0, 100, 20], [0, 0, 30, 30], [0, 0, 60, 0], [0, 0, 50, 10]], np.float32)
+    cls = np.array([1, 2, 1, 1])
+    conf = np.array([0.9, 0.8, 0.7, 0.3], np.float32)
+
+    assert box_mask(xyxy).tolist() == [True] * 4
+    assert box_mask(xyxy, cls, allowed_classes=[1]).tolist() == [True, False, True, True]
+    assert box_mask(xyxy, conf=conf, min_conf=0.5).tolist() == [True, True, True, False]
+    # Aspect bounds are inclusive; a zero-height box has an infinite aspect
+    assert box_mask(xyxy, min_aspect=1, max_aspect=5).tolist() == [True, True, False, True]
+    assert box_mask(xyxy, min_aspect=2).tolist() == [True, False, True, True]
+    # Minimum sizes are strict
+    assert box_mask(xyxy, min_width=50, min_height=10).tolist() == [True, False, False, False]
+
+def test_postprocess_sorts_by_confidence_and_keeps_ties_in_order():
+    r = result([
+        (10, 10, 50, 50, 2, 0.5),
+        (20, 20, 60, 60, 7, 0.9),
+        (30, 30, 70, 70, 2, 0.5),
+    ])
+    out = postprocess(r)
+    assert out["conf"].tolist() == [np.float32(0.9), np.float32(0.5), np.float32(0.5)]
+    assert bbox_tuples(out) == [(20, 20, 60, 60), (10, 10, 50, 50), (30, 30, 70, 70)]
+    assert bbox_tuples(postprocess(r, allowed_classes=[2], top_k=1)) == [(10, 10, 50, 50)]
+
+def test_postprocess_truncates_then_clips_before_filtering():
+    # A box running off the image is clipped first, so its width and aspect
+    # ratio are judged on the part inside the image
+    r = result([(-20.7, 5.9, 80.2, 25.5, 0, 0.8)])
+    out = postprocess(r, img_shape=(100, 60, 3))
+    assert bbox_tuples(out) == [(0, 5, 60, 25)]
+    assert len(postprocess(r, img_shape=(100, 60, 3), min_width=70)) == 0
+    assert len(postprocess(r, min_width=70)) == 1  # unclipped, it is 100 wide
+
+def test_postprocess_empty_result():
+    out = postprocess(result([]), img_shape=(10, 10, 3))
+    assert len(out) == 0 and bbox_tuples(out) == []
+
+def test_best_box():
+    r = result([
+        (0, 0, 40, 10, 0, 0.4),
+        (0, 0, 10, 10, 1, 0.95),
+        (5, 5, 65, 25, 0, 0.6),
+    ])
+    assert best_box(r) == ((0, 0, 10, 10), 1)
+    assert best_box(r, min_aspect=2) == ((5, 5, 65, 25), 0)
+    assert best_box(r, min_conf=0.99) == (None, None)
+    bbox, cls_id = best_box(r)
+    assert all(type(v) is int for v in bbox) and type(cls_id) is int
+
+def test_class_ids():
+    assert class_ids({0: "person", 2: "car", 7: "truck"}, ["car", "truck", "bus"]) == [2, 7]